@@ -0,0 +1,116 @@
+import collections
+import itertools
+
+from typing import Dict, Iterable, List, Optional
+
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.imports import ObjectImport
+from python_object_extractor.references import make_name_from_object_reference
+from python_object_extractor.references import ObjectReference
+
+
+# Same sequence of requests always gets the same names.
+class NameAllocator:
+    __slots__ = ['taken', ]
+
+    def __init__(self):
+        self.taken = set()
+
+    def __repr__(self) -> str:
+        return f"<NameAllocator(taken={len(self.taken)})>"
+
+    def allocate(self, *candidates: str) -> str:
+        for name in candidates:
+            if name not in self.taken:
+                self.taken.add(name)
+                return name
+
+        for i in itertools.count(2):
+            name = f"{candidates[-1]}_{i}"
+            if name not in self.taken:
+                self.taken.add(name)
+                return name
+
+
+class ImportsAggregation:
+    __slots__ = ['imports', 'references_to_aliases', ]
+
+    def __init__(
+        self,
+        imports: List[ObjectImport],
+        references_to_aliases: Dict[ObjectReference, str],
+    ):
+        self.imports = imports
+        self.references_to_aliases = references_to_aliases
+
+    def __repr__(self) -> str:
+        return (
+            f"<ImportsAggregation("
+            f"imports={len(self.imports)}, "
+            f"references={len(self.references_to_aliases)})>"
+        )
+
+
+def aggregate_imports(
+    descriptors: Iterable[ObjectDescriptor],
+    object_reference: ObjectReference,
+    output_object_name: Optional[str] = None,
+    constants: Optional[Dict[ObjectReference, str]] = None,
+) -> ImportsAggregation:
+    constants = constants or {}
+    references_to_aliases = dict()
+    extracted_references = []
+
+    for descriptor in descriptors:
+        extracted_references.append(descriptor.object_reference)
+
+        for item in descriptor.iter_imports():
+            reference = item.object_reference
+            alias = item.alias or reference.object_name
+
+            if reference not in references_to_aliases:
+                references_to_aliases[reference] = alias
+            elif references_to_aliases[reference] != alias:
+                # Object imported under different aliases keeps none of them.
+                references_to_aliases[reference] = None
+
+    aliases_counts = collections.Counter(references_to_aliases.values())
+    allocator = NameAllocator()
+    results = dict()
+
+    results[object_reference] = allocator.allocate(
+        output_object_name or object_reference.object_name,
+    )
+
+    for reference in sorted(extracted_references):
+        if reference not in results:
+            results[reference] = allocator.allocate(
+                make_name_from_object_reference(reference),
+            )
+
+    imports = []
+
+    for reference in sorted(references_to_aliases):
+        if reference in results:
+            continue
+
+        if reference in constants:
+            results[reference] = constants[reference]
+            continue
+
+        alias = references_to_aliases[reference]
+        candidates = [make_name_from_object_reference(reference), ]
+
+        if alias is not None and aliases_counts[alias] == 1:
+            candidates.insert(0, alias)
+
+        results[reference] = allocator.allocate(*candidates)
+        imports.append(ObjectImport(
+            object_reference=reference,
+            alias=results[reference],
+        ))
+
+    return ImportsAggregation(
+        imports=imports,
+        references_to_aliases=results,
+    )
@@ -0,0 +1,260 @@
+import ast
+import builtins
+
+from typing import Dict, List, Optional, Set
+
+from python_object_extractor.attributes import AttributesAccessChain
+from python_object_extractor.attributes import traverse_attribute
+from python_object_extractor.imports import get_imports_from_node
+from python_object_extractor.imports import ObjectImport
+
+
+BUILTINS = set(dir(builtins) + ['__class__', ])
+
+
+class SourceAnalysis:
+    __slots__ = [
+        'symbols',
+        'imports',
+        'import_nodes',
+        'access_chains',
+    ]
+
+    def __init__(
+        self,
+        symbols: List[str],
+        imports: List[ObjectImport],
+        import_nodes: List[ast.stmt],
+        access_chains: List[AttributesAccessChain],
+    ):
+        self.symbols = symbols
+        self.imports = imports
+        self.import_nodes = import_nodes
+        self.access_chains = access_chains
+
+    def __repr__(self) -> str:
+        return (
+            f"<SourceAnalysis("
+            f"symbols={self.symbols}, "
+            f"imports={len(self.imports)}, "
+            f"access_chains={len(self.access_chains)})>"
+        )
+
+
+class _Scope:
+    __slots__ = ['bound', 'referenced', 'children', ]
+
+    def __init__(self):
+        self.bound = set()
+        self.referenced = dict()
+        self.children = list()
+
+
+class _SourceVisitor(ast.NodeVisitor):
+
+    def __init__(self):
+        self.root = _Scope()
+        self.scope = self.root
+        self.imported_names = set()
+        self.imports = list()
+        self.import_nodes = list()
+        self.access_chains = dict()
+
+    def _bind(self, name: Optional[str]) -> None:
+        if name:
+            self.scope.bound.add(name)
+
+    def _reference(self, name: str) -> None:
+        self.scope.referenced[name] = None
+
+    def _visit_all(self, nodes: List[Optional[ast.AST]]) -> None:
+        for node in nodes:
+            if node is not None:
+                self.visit(node)
+
+    def _enter_scope(self) -> _Scope:
+        parent = self.scope
+        self.scope = _Scope()
+        parent.children.append(self.scope)
+        return parent
+
+    def _bind_arguments(self, args: ast.arguments) -> None:
+        for arg in [
+            *getattr(args, 'posonlyargs', []),
+            *args.args,
+            args.vararg,
+            *args.kwonlyargs,
+            args.kwarg,
+        ]:
+            if arg is not None:
+                self._bind(arg.arg)
+
+    def _visit_arguments_defaults(self, args: ast.arguments) -> None:
+        self._visit_all(args.defaults)
+        self._visit_all(args.kw_defaults)
+
+    def _visit_arguments_annotations(self, args: ast.arguments) -> None:
+        self._visit_all([
+            arg.annotation
+            for arg in [
+                *getattr(args, 'posonlyargs', []),
+                *args.args,
+                args.vararg,
+                *args.kwonlyargs,
+                args.kwarg,
+            ]
+            if arg is not None
+        ])
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._bind(node.name)
+        self._visit_all(node.decorator_list)
+        self._visit_arguments_defaults(node.args)
+        self._visit_arguments_annotations(node.args)
+        self._visit_all([node.returns, ])
+
+        parent = self._enter_scope()
+        self._bind_arguments(node.args)
+        self._visit_all(node.body)
+        self.scope = parent
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        self._visit_arguments_defaults(node.args)
+
+        parent = self._enter_scope()
+        self._bind_arguments(node.args)
+        self.visit(node.body)
+        self.scope = parent
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._bind(node.name)
+        self._visit_all(node.decorator_list)
+        self._visit_all(node.bases)
+        self._visit_all(node.keywords)
+
+        parent = self._enter_scope()
+        self._visit_all(node.body)
+        self.scope = parent
+
+    def _visit_comprehension(
+        self,
+        node: ast.AST,
+        elements: List[ast.AST],
+    ) -> None:
+        generators = node.generators
+        self.visit(generators[0].iter)
+
+        parent = self._enter_scope()
+        for i, generator in enumerate(generators):
+            if i:
+                self.visit(generator.iter)
+            self.visit(generator.target)
+            self._visit_all(generator.ifs)
+        self._visit_all(elements)
+        self.scope = parent
+
+    def visit_ListComp(self, node: ast.ListComp) -> None:
+        self._visit_comprehension(node, [node.elt, ])
+
+    visit_SetComp = visit_ListComp
+    visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node: ast.DictComp) -> None:
+        self._visit_comprehension(node, [node.key, node.value, ])
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self._reference(node.id)
+        else:
+            self._bind(node.id)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        chain = traverse_attribute(node)
+
+        if not chain:
+            self.generic_visit(node)
+            return
+
+        self._reference(chain[0])
+        access_chain = AttributesAccessChain(
+            object_name=chain[0],
+            sequence=chain[1:],
+        )
+        self.access_chains[access_chain] = None
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        self._bind(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node: ast.AST) -> None:
+        self._bind(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node: ast.AST) -> None:
+        self._bind(node.name)
+
+    def visit_MatchMapping(self, node: ast.AST) -> None:
+        self._bind(node.rest)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for item in node.names:
+            name = item.asname or item.name.split('.', 1)[0]
+            self._bind(name)
+            self.imported_names.add(name)
+
+        self.imports.extend(get_imports_from_node(node))
+        self.import_nodes.append(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        for item in node.names:
+            if item.name == '*':
+                continue
+
+            name = item.asname or item.name
+            self._bind(name)
+            self.imported_names.add(name)
+
+        self.imports.extend(get_imports_from_node(node))
+        self.import_nodes.append(node)
+
+
+def _collect_free_names(
+    scope: _Scope,
+    enclosing_names: Set[str],
+    results: Dict[str, None],
+) -> None:
+    for name in scope.referenced:
+        if (
+                name not in scope.bound
+            and name not in enclosing_names
+            and name not in BUILTINS
+        ):
+            results[name] = None
+
+    if scope.children:
+        own_names = enclosing_names | scope.bound
+        for child in scope.children:
+            _collect_free_names(child, own_names, results)
+
+
+def analyze_source(source: str) -> SourceAnalysis:
+    visitor = _SourceVisitor()
+    visitor.visit(ast.parse(source))
+
+    free_names = dict()
+    _collect_free_names(visitor.root, set(), free_names)
+
+    access_chains = [
+        x for x in visitor.access_chains
+        if x.object_name in free_names or x.object_name in visitor.imported_names
+    ]
+
+    return SourceAnalysis(
+        symbols=list(free_names),
+        imports=visitor.imports,
+        import_nodes=visitor.import_nodes,
+        access_chains=access_chains,
+    )
@@ -1,6 +1,6 @@
 import ast
 
-from typing import Any, List
+from typing import Any, List, Optional
 
 
 class AttributesAccessChain:
@@ -36,29 +36,11 @@ class AttributesAccessChain:
         return hash(str(self))
 
 
-def _traverse_attribute(node: ast.AST) -> List[str]:
+def traverse_attribute(node: ast.AST) -> Optional[List[str]]:
     if isinstance(node, ast.Name):
         return [node.id, ]
     elif isinstance(node, ast.Attribute):
-        symbols = _traverse_attribute(node.value)
+        symbols = traverse_attribute(node.value)
         if symbols:
             symbols.append(node.attr)
             return symbols
-
-
-def extract_attributes_access_chains(
-    source: str,
-) -> List[AttributesAccessChain]:
-    tree = ast.parse(source)
-    results = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Attribute):
-            chain = _traverse_attribute(node)
-            if chain:
-                results.append(AttributesAccessChain(
-                    object_name=chain[0],
-                    sequence=chain[1:],
-                ))
-
-    return results
@@ -0,0 +1,396 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from python_object_extractor.dependents import DependentsIndex
+
+
+def load_args() -> argparse.Namespace:
+    from python_object_extractor.main import add_extraction_arguments
+    from python_object_extractor.main import check_extraction_arguments
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Extract many Python objects from local project in parallel."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        'targets_path',
+        type=str,
+        help=(
+            "path to file listing references to objects to extract, one per "
+            "line, optionally followed by output object name. Use '-' to "
+            "read from STDIN"
+        ),
+    )
+    add_extraction_arguments(parser)
+    parser.add_argument(
+        '-o', '--output_dir',
+        dest='output_dir',
+        type=Path,
+        default='build',
+        help=(
+            "path to directory to output targets to. Every target gets its "
+            "own subdirectory named after its reference"
+        ),
+    )
+    parser.add_argument(
+        '--module_name',
+        dest='module_name',
+        type=str,
+        default='main.py',
+        help="file name of output module of every target",
+    )
+    parser.add_argument(
+        '--requirements_name',
+        dest='requirements_name',
+        type=str,
+        default='requirements.txt',
+        help="file name of output requirements file of every target",
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes",
+    )
+    parser.add_argument(
+        '--cache_path',
+        dest='cache_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to directory with analysis results shared by workers and "
+            "by consecutive runs. Defaults to a directory in user's cache"
+        ),
+    )
+    parser.add_argument(
+        '--report_path',
+        dest='report_path',
+        type=str,
+        default='-',
+        help=(
+            "path to output JSON lines describing finished targets as they "
+            "finish. Use '-' to output to STDOUT"
+        ),
+    )
+    args = parser.parse_args()
+    check_extraction_arguments(parser, args)
+    return args
+
+
+class BatchTarget:
+    __slots__ = ['object_reference', 'output_object_name', ]
+
+    def __init__(
+        self,
+        object_reference: str,
+        output_object_name: Optional[str] = None,
+    ):
+        self.object_reference = object_reference
+        self.output_object_name = output_object_name
+
+    def __repr__(self) -> str:
+        return (
+            f"<BatchTarget("
+            f"object_reference='{self.object_reference}', "
+            f"output_object_name={repr(self.output_object_name)})>"
+        )
+
+    def get_module_name(self) -> str:
+        return self.object_reference.split(':', 1)[0]
+
+    def get_output_dir_name(self) -> str:
+        return self.object_reference.replace(':', '.')
+
+
+def parse_targets(lines: Iterable[str]) -> List[BatchTarget]:
+    results = []
+    known = set()
+
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+
+        if not line:
+            continue
+
+        parts = line.split()
+        if parts[0] in known:
+            continue
+
+        known.add(parts[0])
+        results.append(BatchTarget(
+            object_reference=parts[0],
+            output_object_name=parts[1] if len(parts) > 1 else None,
+        ))
+
+    return results
+
+
+# Targets of nearby modules share a batch, so that a worker reuses its
+# caches. There are several batches per worker to balance the load.
+def make_batches(
+    targets: Iterable[BatchTarget],
+    jobs: int,
+    batches_per_job: int = 4,
+) -> List[List[BatchTarget]]:
+    targets = sorted(
+        targets,
+        key=lambda x: (x.get_module_name().split('.'), x.object_reference),
+    )
+    batches_count = max(1, min(len(targets), jobs * batches_per_job))
+    results = []
+
+    for i in range(batches_count):
+        start = len(targets) * i // batches_count
+        end = len(targets) * (i + 1) // batches_count
+        if start < end:
+            results.append(targets[start:end])
+
+    return results
+
+
+def _run_worker(
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    args: argparse.Namespace,
+    cache_path: Path,
+) -> None:
+    from python_object_extractor.boundaries import make_traversal_boundaries
+    from python_object_extractor.caches import configure_disk_cache
+    from python_object_extractor.dependents import make_target_record
+    from python_object_extractor.extraction import extract_object
+    from python_object_extractor.inlining import make_helpers_inlining
+    from python_object_extractor.minification import MinificationOptions
+    from python_object_extractor.modules import add_project_to_sys_path
+    from python_object_extractor.modules import get_importer
+    from python_object_extractor.modules import set_importer
+    from python_object_extractor.output import output
+    from python_object_extractor.references import parse_object_reference
+    from python_object_extractor.resolution import configure_requirements_resolver
+    from python_object_extractor.shaking import make_methods_shaking
+
+    project_path = add_project_to_sys_path(args.project_path)
+    configure_disk_cache(cache_path)
+    configure_requirements_resolver()
+
+    if args.project_index_path:
+        from python_object_extractor.project_index import IndexedImporter
+        from python_object_extractor.project_index import load_project_index
+
+        project_index = load_project_index(args.project_index_path)
+        if project_index is not None:
+            set_importer(IndexedImporter(project_index, get_importer()))
+
+    minification = (
+        MinificationOptions(
+            strip_docstrings=not args.keep_docstrings,
+            strip_annotations=args.strip_annotations,
+        )
+        if args.minify
+        else None
+    )
+    boundaries = make_traversal_boundaries(args)
+    runtime_profile = None
+
+    if args.runtime_profile:
+        from python_object_extractor.runtimes import apply_runtime_profile
+        from python_object_extractor.runtimes import load_runtime_profile
+
+        runtime_profile = load_runtime_profile(args.runtime_profile)
+
+    while True:
+        batch = tasks.get()
+
+        if batch is None:
+            break
+
+        for target in batch:
+            started_at = time.perf_counter()
+            output_dir = args.output_dir / target.get_output_dir_name()
+            result = {
+                'object_reference': target.object_reference,
+                'output_dir': str(output_dir),
+                'worker': os.getpid(),
+            }
+
+            inlining = make_helpers_inlining(args)
+
+            try:
+                extraction = extract_object(
+                    object_reference=parse_object_reference(target.object_reference),
+                    project_path=project_path,
+                    output_object_name=target.output_object_name,
+                    minification=minification,
+                    boundaries=boundaries,
+                    shaking=make_methods_shaking(args),
+                    constants=dict() if args.inline_constants else None,
+                    inlining=inlining,
+                )
+                requirements = extraction.requirements
+
+                if inlining is not None:
+                    result['inlining'] = inlining.to_dict()
+
+                if runtime_profile is not None:
+                    runtime_requirements = apply_runtime_profile(
+                        requirements,
+                        runtime_profile,
+                    )
+                    requirements = runtime_requirements.requirements
+                    result['runtime'] = runtime_requirements.to_dict()
+
+                output(
+                    module_path=str(output_dir / args.module_name),
+                    requirements_path=str(output_dir / args.requirements_name),
+                    module_source=extraction.module_source,
+                    requirements=requirements,
+                )
+                if args.dependents_index_path:
+                    result['record'] = make_target_record(
+                        extraction.descriptors,
+                        project_path,
+                    )
+            except Exception as e:
+                result['status'] = 'failed'
+                result['error'] = f"{type(e).__name__}: {e}"
+            else:
+                result['status'] = 'done'
+                result['requirements'] = requirements
+
+            result['duration'] = time.perf_counter() - started_at
+            results.put(result)
+
+
+def run_batch(
+    targets: List[BatchTarget],
+    args: argparse.Namespace,
+    cache_path: Path,
+) -> Iterator[Dict[str, object]]:
+    context = multiprocessing.get_context('spawn')
+    tasks = context.Queue()
+    results = context.Queue()
+    batches = make_batches(targets, args.jobs)
+    workers = [
+        context.Process(
+            target=_run_worker,
+            args=(tasks, results, args, cache_path),
+            daemon=True,
+        )
+        for _ in range(max(1, min(args.jobs, len(batches))))
+    ]
+
+    for batch in batches:
+        tasks.put(batch)
+
+    for _ in workers:
+        tasks.put(None)
+
+    for worker in workers:
+        worker.start()
+
+    pending = {x.object_reference for x in targets}
+
+    try:
+        while pending:
+            try:
+                result = results.get(timeout=1)
+            except queue.Empty:
+                if any(x.is_alive() for x in workers):
+                    continue
+
+                for object_reference in sorted(pending):
+                    yield {
+                        'object_reference': object_reference,
+                        'status': 'failed',
+                        'error': "worker exited unexpectedly",
+                    }
+                break
+
+            pending.discard(result['object_reference'])
+            yield result
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.kill()
+
+
+def output_results(
+    output_stream: io.TextIOBase,
+    results: Iterable[Dict[str, object]],
+    index: Optional['DependentsIndex'] = None,
+) -> int:
+    failures = 0
+
+    for result in results:
+        record = result.pop('record', None)
+
+        if result['status'] != 'done':
+            failures += 1
+        elif index is not None and record is not None:
+            index.update_target(result['object_reference'], record)
+
+        output_stream.write(json.dumps(result))
+        output_stream.write("\n")
+        output_stream.flush()
+
+    return failures
+
+
+def main() -> None:
+    args = load_args()
+
+    from python_object_extractor.caches import get_user_cache_path
+
+    if args.targets_path == '-':
+        targets = parse_targets(sys.stdin)
+    else:
+        with open(args.targets_path) as f:
+            targets = parse_targets(f)
+
+    if args.runtime_profile:
+        from python_object_extractor.runtimes import load_runtime_profile
+
+        # Fail before workers start, rather than in every one of them.
+        load_runtime_profile(args.runtime_profile)
+
+    cache_path = args.cache_path or get_user_cache_path() / 'analysis'
+    results = run_batch(targets, args, cache_path)
+    index = None
+
+    if args.dependents_index_path:
+        from python_object_extractor.dependents import load_dependents_index
+
+        index = load_dependents_index(args.dependents_index_path)
+
+    if args.report_path == '-':
+        failures = output_results(sys.stdout, results, index)
+    else:
+        report_path = Path(args.report_path)
+        report_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with report_path.open('wt') as f:
+            failures = output_results(f, results, index)
+
+    if index is not None:
+        from python_object_extractor.dependents import save_dependents_index
+
+        save_dependents_index(index, args.dependents_index_path)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
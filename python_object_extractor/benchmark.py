@@ -0,0 +1,548 @@
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+from typing import Any, List, Optional
+
+from python_object_extractor.exceptions import PythonObjectExtractorException
+from python_object_extractor.references import make_name_from_object_reference
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.references import parse_object_reference
+
+
+# Instances are dumped as names of their types along with their attributes,
+# and values which can be told apart only by identity are marked as not
+# comparable. Keys are the same as in runner below.
+TYPE_KEY = '__type__'
+ATTRIBUTES_KEY = '__dict__'
+NOT_COMPARABLE_KEY = '__not_comparable__'
+
+
+# Runner is passed to interpreters as a string rather than run from a file of
+# this package, so that neither this package nor its modules, which shadow
+# some of standard ones, are importable by benchmarked code.
+RUNNER_SOURCE = """\
+import copy
+import importlib
+import importlib.util
+import json
+import sys
+import time
+
+TYPE_KEY = '__type__'
+ATTRIBUTES_KEY = '__dict__'
+NOT_COMPARABLE_KEY = '__not_comparable__'
+
+request = json.load(sys.stdin)
+sys.path.insert(0, request['path'])
+
+started_at = time.perf_counter()
+if request['module_path']:
+    spec = importlib.util.spec_from_file_location(
+        request['module_name'],
+        request['module_path'],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[request['module_name']] = module
+    spec.loader.exec_module(module)
+else:
+    module = importlib.import_module(request['module_name'])
+target = getattr(module, request['object_name'])
+import_time = time.perf_counter() - started_at
+
+
+def describe(value):
+    attributes = getattr(value, '__dict__', None)
+    if isinstance(attributes, dict):
+        return {
+            TYPE_KEY: [type(value).__module__, type(value).__qualname__],
+            ATTRIBUTES_KEY: attributes,
+        }
+    text = repr(value)
+    if ' at 0x' in text:
+        return {NOT_COMPARABLE_KEY: type(value).__qualname__}
+    return text
+
+
+def dump(value):
+    try:
+        return json.loads(json.dumps(value, sort_keys=True, default=describe))
+    except Exception:
+        return {NOT_COMPARABLE_KEY: type(value).__qualname__}
+
+
+results = []
+latencies = []
+
+for sample in request['samples']:
+    args, kwargs = sample.get('args', []), sample.get('kwargs', {})
+
+    try:
+        result = {'value': dump(target(*copy.deepcopy(args), **copy.deepcopy(kwargs)))}
+    except Exception as e:
+        result = {'error': {
+            TYPE_KEY: [type(e).__module__, type(e).__qualname__],
+            'args': dump(list(e.args)),
+        }}
+    results.append(result)
+
+    sample_latencies = []
+    for i in range(request['warmup'] + request['repeat']):
+        call_args, call_kwargs = copy.deepcopy(args), copy.deepcopy(kwargs)
+        started_at = time.perf_counter_ns()
+        try:
+            target(*call_args, **call_kwargs)
+        except Exception:
+            pass
+        elapsed = time.perf_counter_ns() - started_at
+        if i >= request['warmup']:
+            sample_latencies.append(elapsed)
+    latencies.append(sample_latencies)
+
+with open(request['result_path'], 'wt') as f:
+    json.dump({
+        'import_time': import_time,
+        'results': results,
+        'latencies': latencies,
+    }, f)
+"""
+
+
+class InvalidSample(PythonObjectExtractorException):
+
+    def __init__(self, path: Path, line_number: int, details: str):
+        super().__init__(
+            f"invalid sample at line {line_number} of '{path}': {details}"
+        )
+
+
+class RunnerFailed(PythonObjectExtractorException):
+
+    def __init__(self, name: str, details: str):
+        super().__init__(f"{name} object failed to run: {details}")
+
+
+def load_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Check that an extracted object behaves as the original one and "
+            "compare latencies of their calls. Both are run in fresh "
+            "interpreters."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        'object_reference',
+        type=str,
+        help=(
+            "reference to original object. "
+            "Example: 'importable.module:object'"
+        ),
+    )
+    parser.add_argument(
+        'samples_path',
+        type=Path,
+        help=(
+            "path to JSON lines file with arguments of calls, one call per "
+            "line, e.g. '{\"args\": [1], \"kwargs\": {\"key\": \"value\"}}'"
+        ),
+    )
+    parser.add_argument(
+        '-p', '--project_path',
+        dest='project_path',
+        type=Path,
+        default='.',
+        help="path to local project directory",
+    )
+    parser.add_argument(
+        '-m', '--extracted_module_path',
+        dest='extracted_module_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to module with extracted object. Object is extracted with "
+            "default options if omitted"
+        ),
+    )
+    parser.add_argument(
+        '-n', '--output_object_name',
+        dest='output_object_name',
+        type=str,
+        default=None,
+        help=(
+            "name of object in extracted module, if it differs from name of "
+            "original object"
+        ),
+    )
+    parser.add_argument(
+        '--repeat',
+        dest='repeat',
+        type=int,
+        default=100,
+        help="number of timed calls per sample",
+    )
+    parser.add_argument(
+        '--warmup',
+        dest='warmup',
+        type=int,
+        default=5,
+        help="number of untimed calls per sample made before timed ones",
+    )
+    parser.add_argument(
+        '--python',
+        dest='python',
+        type=str,
+        default=sys.executable,
+        help="path to interpreter to run objects with",
+    )
+    parser.add_argument(
+        '-o', '--output_path',
+        dest='output_path',
+        type=str,
+        default='-',
+        help="path to output report file. Use '-' to output to STDOUT",
+    )
+    return parser.parse_args()
+
+
+def load_samples(samples_path: Path) -> List[dict]:
+    results = []
+
+    with Path(samples_path).open('rt') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                sample = json.loads(line)
+            except ValueError as e:
+                raise InvalidSample(samples_path, line_number, str(e))
+
+            if (
+                   not isinstance(sample, dict)
+                or not isinstance(sample.get('args', []), list)
+                or not isinstance(sample.get('kwargs', {}), dict)
+            ):
+                raise InvalidSample(
+                    samples_path,
+                    line_number,
+                    "expected object with 'args' list and 'kwargs' object",
+                )
+
+            results.append(sample)
+
+    return results
+
+
+# Results are read from a file, so that output of called code does not
+# get mixed with them.
+def run_object(
+    name: str,
+    python: str,
+    path: str,
+    module_name: str,
+    object_name: str,
+    samples: List[dict],
+    repeat: int,
+    warmup: int,
+    module_path: Optional[str] = None,
+) -> dict:
+    with tempfile.TemporaryDirectory() as temp_path:
+        result_path = os.path.join(temp_path, 'result.json')
+        request = {
+            'path': path,
+            'module_name': module_name,
+            'module_path': module_path,
+            'object_name': object_name,
+            'samples': samples,
+            'repeat': repeat,
+            'warmup': warmup,
+            'result_path': result_path,
+        }
+        environment = dict(os.environ)
+        environment['PYTHONHASHSEED'] = '0'
+
+        process = subprocess.run(
+            [python, '-c', RUNNER_SOURCE],
+            input=json.dumps(request),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            cwd=path,
+            env=environment,
+            universal_newlines=True,
+        )
+        if process.returncode != 0:
+            raise RunnerFailed(name, process.stderr.strip())
+
+        with open(result_path, 'rt') as f:
+            return json.load(f)
+
+
+def summarize_latencies(latencies: List[int]) -> dict:
+    if not latencies:
+        return {}
+
+    values = sorted(latencies)
+
+    def get_percentile(percent: int) -> float:
+        index = min(len(values) - 1, (len(values) * percent) // 100)
+        return values[index] / 1000
+
+    return {
+        'calls': len(values),
+        'min': values[0] / 1000,
+        'median': statistics.median(values) / 1000,
+        'mean': statistics.mean(values) / 1000,
+        'p90': get_percentile(90),
+        'p99': get_percentile(99),
+        'max': values[-1] / 1000,
+    }
+
+
+def is_comparable(value: Any) -> bool:
+    if isinstance(value, dict):
+        return NOT_COMPARABLE_KEY not in value and all(
+            is_comparable(x)
+            for x in value.values()
+        )
+    if isinstance(value, list):
+        return all(is_comparable(x) for x in value)
+
+    return True
+
+
+def _is_same_type(
+    original: List[str],
+    extracted: List[str],
+    object_reference: ObjectReference,
+    output_object_name: str,
+) -> bool:
+    module_name, name = original
+    head, _, tail = name.partition('.')
+    reference = ObjectReference(module_name=module_name, object_name=head)
+    names = {head, make_name_from_object_reference(reference), }
+
+    if reference == object_reference:
+        names.add(output_object_name)
+
+    extracted_head, _, extracted_tail = extracted[1].partition('.')
+    return extracted_head in names and extracted_tail == tail
+
+
+# Types are compared by names, as extraction renames and moves them.
+def is_same_result(
+    original: Any,
+    extracted: Any,
+    object_reference: ObjectReference,
+    output_object_name: str,
+) -> bool:
+    if isinstance(original, dict) and isinstance(extracted, dict):
+        if TYPE_KEY in original or TYPE_KEY in extracted:
+            if not (
+                    TYPE_KEY in original
+                and TYPE_KEY in extracted
+                and _is_same_type(
+                    original[TYPE_KEY],
+                    extracted[TYPE_KEY],
+                    object_reference,
+                    output_object_name,
+                )
+            ):
+                return False
+
+            original = {k: v for k, v in original.items() if k != TYPE_KEY}
+            extracted = {k: v for k, v in extracted.items() if k != TYPE_KEY}
+
+            return is_same_result(
+                original,
+                extracted,
+                object_reference,
+                output_object_name,
+            )
+
+        return original.keys() == extracted.keys() and all(
+            is_same_result(
+                original[key],
+                extracted[key],
+                object_reference,
+                output_object_name,
+            )
+            for key in original
+        )
+
+    if isinstance(original, list) and isinstance(extracted, list):
+        return len(original) == len(extracted) and all(
+            is_same_result(x, y, object_reference, output_object_name)
+            for x, y in zip(original, extracted)
+        )
+
+    return original == extracted
+
+
+def make_report(
+    object_reference: ObjectReference,
+    output_object_name: str,
+    samples: List[dict],
+    original: dict,
+    extracted: dict,
+) -> dict:
+    mismatches = []
+    not_comparable = []
+
+    for i, (original_result, extracted_result) in enumerate(zip(
+        original['results'],
+        extracted['results'],
+    )):
+        if not (
+                is_comparable(original_result)
+            and is_comparable(extracted_result)
+        ):
+            not_comparable.append(i)
+        elif not is_same_result(
+            original_result,
+            extracted_result,
+            object_reference,
+            output_object_name,
+        ):
+            mismatches.append({
+                'sample': i,
+                'original': original_result,
+                'extracted': extracted_result,
+            })
+
+    runs = {}
+
+    for name, run in [('original', original), ('extracted', extracted)]:
+        runs[name] = {
+            'import_time': run['import_time'],
+            'latency': summarize_latencies([
+                x
+                for sample_latencies in run['latencies']
+                for x in sample_latencies
+            ]),
+            'samples_latencies': [
+                summarize_latencies(x)
+                for x in run['latencies']
+            ],
+        }
+
+    original_median = runs['original']['latency'].get('median')
+    extracted_median = runs['extracted']['latency'].get('median')
+
+    return {
+        'object_reference': str(object_reference),
+        'samples': len(samples),
+        'is_equivalent': not mismatches,
+        'mismatches': mismatches,
+        'not_comparable': not_comparable,
+        'speedup': (
+            original_median / extracted_median
+            if original_median and extracted_median
+            else None
+        ),
+        **runs,
+    }
+
+
+def write_report(output_stream: io.TextIOBase, report: dict) -> None:
+    json.dump(report, output_stream, indent=2)
+    output_stream.write("\n")
+    output_stream.flush()
+
+
+def extract_module(
+    object_reference: ObjectReference,
+    project_path: str,
+    output_object_name: str,
+    module_path: Path,
+) -> None:
+    from python_object_extractor.extraction import extract_object
+    from python_object_extractor.modules import add_project_to_sys_path
+    from python_object_extractor.modules import get_importer
+
+    project_path = add_project_to_sys_path(project_path)
+
+    try:
+        extraction = extract_object(
+            object_reference=object_reference,
+            project_path=project_path,
+            output_object_name=output_object_name,
+        )
+    finally:
+        get_importer().close()
+
+    with module_path.open('wt') as f:
+        f.write(extraction.module_source)
+
+
+def main() -> None:
+    args = load_args()
+
+    object_reference = parse_object_reference(args.object_reference)
+    output_object_name = args.output_object_name or object_reference.object_name
+    samples = load_samples(args.samples_path)
+
+    with tempfile.TemporaryDirectory() as temp_path:
+        module_path = args.extracted_module_path
+
+        if module_path is None:
+            module_path = Path(temp_path) / 'extracted.py'
+            extract_module(
+                object_reference=object_reference,
+                project_path=args.project_path,
+                output_object_name=output_object_name,
+                module_path=module_path,
+            )
+
+        module_path = Path(module_path).resolve()
+        original = run_object(
+            name='original',
+            python=args.python,
+            path=str(Path(args.project_path).resolve()),
+            module_name=object_reference.module_name,
+            object_name=object_reference.object_name,
+            samples=samples,
+            repeat=args.repeat,
+            warmup=args.warmup,
+        )
+        extracted = run_object(
+            name='extracted',
+            python=args.python,
+            path=str(module_path.parent),
+            module_name=module_path.stem,
+            object_name=output_object_name,
+            samples=samples,
+            repeat=args.repeat,
+            warmup=args.warmup,
+            module_path=str(module_path),
+        )
+
+    report = make_report(
+        object_reference=object_reference,
+        output_object_name=output_object_name,
+        samples=samples,
+        original=original,
+        extracted=extracted,
+    )
+
+    if args.output_path == '-':
+        write_report(sys.stdout, report)
+    else:
+        output_path = Path(args.output_path)
+        output_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with output_path.open('wt') as f:
+            write_report(f, report)
+
+    if not report['is_equivalent']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
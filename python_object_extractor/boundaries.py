@@ -0,0 +1,95 @@
+import argparse
+
+from typing import Iterable, Optional, Tuple
+
+from python_object_extractor.references import ObjectReference
+
+
+# Objects beyond boundaries are imported by output module, like
+# third-party ones.
+class TraversalBoundaries:
+    __slots__ = [
+        'module_prefixes',
+        'max_depth',
+        'max_objects',
+        'project_requirement',
+    ]
+
+    def __init__(
+        self,
+        module_prefixes: Iterable[Tuple[str, Optional[str]]] = (),
+        max_depth: Optional[int] = None,
+        max_objects: Optional[int] = None,
+        project_requirement: Optional[str] = None,
+    ):
+        self.module_prefixes = tuple(module_prefixes)
+        self.max_depth = max_depth
+        self.max_objects = max_objects
+        self.project_requirement = project_requirement
+
+    def __repr__(self) -> str:
+        return (
+            f"<TraversalBoundaries("
+            f"module_prefixes={repr([x for x, _ in self.module_prefixes])}, "
+            f"max_depth={self.max_depth}, "
+            f"max_objects={self.max_objects})>"
+        )
+
+    def __bool__(self) -> bool:
+        return bool(
+               self.module_prefixes
+            or self.max_depth is not None
+            or self.max_objects is not None
+        )
+
+    def _match_prefix(self, module_name: str) -> Optional[Tuple[str, Optional[str]]]:
+        matches = [
+            x
+            for x in self.module_prefixes
+            if module_name == x[0] or module_name.startswith(x[0] + '.')
+        ]
+        return max(matches, key=lambda x: len(x[0]), default=None)
+
+    def is_beyond(
+        self,
+        object_reference: ObjectReference,
+        depth: int,
+        objects_count: int,
+    ) -> bool:
+        return (
+               self._match_prefix(object_reference.module_name) is not None
+            or (self.max_depth is not None and depth > self.max_depth)
+            or (self.max_objects is not None and objects_count >= self.max_objects)
+        )
+
+    def get_requirement(self, module_name: str) -> Optional[str]:
+        match = self._match_prefix(module_name)
+
+        if match is not None and match[1]:
+            return match[1]
+
+        return self.project_requirement
+
+
+def parse_module_prefix(value: str) -> Tuple[str, Optional[str]]:
+    prefix, _, requirement = value.partition('=')
+    prefix = prefix.strip().rstrip('.')
+
+    if not prefix:
+        raise argparse.ArgumentTypeError(
+            f"module prefix is empty: '{value}'"
+        )
+
+    return (prefix, requirement.strip() or None)
+
+
+def make_traversal_boundaries(
+    args: argparse.Namespace,
+) -> Optional[TraversalBoundaries]:
+    boundaries = TraversalBoundaries(
+        module_prefixes=args.boundaries or (),
+        max_depth=args.max_depth,
+        max_objects=args.max_objects,
+        project_requirement=args.project_requirement,
+    )
+    return boundaries or None
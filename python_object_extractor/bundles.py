@@ -0,0 +1,403 @@
+import email.parser
+import hashlib
+import json
+import re
+import shutil
+import tempfile
+import zipfile
+
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from python_object_extractor.caches import get_user_cache_path
+from python_object_extractor.exceptions import PythonObjectExtractorException
+
+
+PRUNED_DIRECTORIES = {'__pycache__', 'test', 'tests', }
+PRUNED_SUFFIXES = {'.pyc', '.pyo', }
+
+
+class BundleException(PythonObjectExtractorException):
+    pass
+
+
+class DistributionNotFound(BundleException):
+
+    def __init__(self, name: str, version: Optional[str], source: str):
+        version = f"=={version}" if version else ""
+        super().__init__(
+            f"distribution '{name}{version}' is not found in {source}"
+        )
+
+
+class UnsafeWheelMember(BundleException):
+
+    def __init__(self, wheel_path: Path, name: str):
+        super().__init__(
+            f"member '{name}' of wheel '{wheel_path}' points outside of "
+            f"directory it is installed into"
+        )
+
+
+class Distribution:
+    __slots__ = ['name', 'version', 'wheel_path', ]
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        wheel_path: Optional[Path] = None,
+    ):
+        self.name = name
+        self.version = version
+        self.wheel_path = wheel_path
+
+    def __repr__(self) -> str:
+        return (
+            f"<Distribution("
+            f"name='{self.name}', "
+            f"version='{self.version}')>"
+        )
+
+    def __str__(self) -> str:
+        return f"{self.name}=={self.version}"
+
+    def get_requires(self) -> List[str]:
+        if self.wheel_path is not None:
+            with zipfile.ZipFile(self.wheel_path) as f:
+                metadata_path = next(
+                    x
+                    for x in f.namelist()
+                    if x.endswith('.dist-info/METADATA')
+                )
+                metadata = email.parser.Parser().parsestr(
+                    f.read(metadata_path).decode()
+                )
+            return metadata.get_all('Requires-Dist') or []
+
+        from importlib import metadata
+
+        return metadata.distribution(self.name).requires or []
+
+    def install(self, target_path: Path, prune: bool) -> None:
+        if self.wheel_path is not None:
+            _install_wheel(self.wheel_path, target_path, prune)
+        else:
+            _install_installed_distribution(self.name, target_path, prune)
+
+
+def normalize_distribution_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirement(requirement: str) -> Tuple[str, Optional[str], Optional[str]]:
+    requirement, _, marker = requirement.partition(';')
+    match = re.match(
+        r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*\(?\s*(==\s*([^,\s)]+))?",
+        requirement,
+    )
+    if not match:
+        raise BundleException(f"failed to parse requirement '{requirement}'")
+
+    return (match.group(1), match.group(4), marker.strip() or None)
+
+
+# None if 'packaging' is not installed.
+def is_marker_satisfied(marker: Optional[str]) -> Optional[bool]:
+    if not marker:
+        return True
+
+    try:
+        from packaging.markers import Marker
+    except ImportError:
+        return False if 'extra' in marker else None
+
+    return Marker(marker).evaluate({'extra': ''})
+
+
+def _is_pruned(path: PurePosixPath) -> bool:
+    return (
+           any(x in PRUNED_DIRECTORIES for x in path.parts[:-1])
+        or path.suffix in PRUNED_SUFFIXES
+    )
+
+
+def _install_wheel(wheel_path: Path, target_path: Path, prune: bool) -> None:
+    root_path = target_path.resolve()
+
+    with zipfile.ZipFile(wheel_path) as f:
+        for item in f.infolist():
+            if item.is_dir():
+                continue
+
+            path = PurePosixPath(item.filename)
+
+            if path.parts[0].endswith('.data'):
+                if len(path.parts) < 3 or path.parts[1] not in ('purelib', 'platlib'):
+                    continue
+                path = PurePosixPath(*path.parts[2:])
+
+            if prune and _is_pruned(path):
+                continue
+
+            destination = target_path.joinpath(*path.parts)
+            if (
+                   path.is_absolute()
+                or '..' in path.parts
+                or not _is_path_under(destination, root_path)
+            ):
+                raise UnsafeWheelMember(wheel_path, item.filename)
+
+            destination.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+            with f.open(item) as source, destination.open('wb') as output:
+                shutil.copyfileobj(source, output)
+
+            mode = (item.external_attr >> 16) & 0o777
+            if mode:
+                destination.chmod(mode)
+
+
+def _is_path_under(path: Path, root_path: Path) -> bool:
+    path = path.resolve()
+    return path == root_path or root_path in path.parents
+
+
+def _install_installed_distribution(
+    name: str,
+    target_path: Path,
+    prune: bool,
+) -> None:
+    from importlib import metadata
+
+    distribution = metadata.distribution(name)
+
+    for item in distribution.files or []:
+        path = PurePosixPath(item.as_posix())
+
+        if path.parts[0] == '..':
+            continue
+
+        if prune and _is_pruned(path):
+            continue
+
+        source = Path(distribution.locate_file(item))
+        if not source.is_file():
+            continue
+
+        destination = target_path.joinpath(*path.parts)
+        destination.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        shutil.copy2(source, destination)
+
+
+class DistributionsFinder:
+    __slots__ = ['wheelhouse_path', '_wheels', ]
+
+    def __init__(self, wheelhouse_path: Optional[Path] = None):
+        self.wheelhouse_path = wheelhouse_path
+        self._wheels = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<DistributionsFinder("
+            f"wheelhouse_path='{self.wheelhouse_path}')>"
+        )
+
+    def get_source_name(self) -> str:
+        if self.wheelhouse_path is None:
+            return "site-packages"
+
+        return f"wheelhouse '{self.wheelhouse_path}'"
+
+    def get_cache_key(self) -> str:
+        if self.wheelhouse_path is None:
+            return 'site-packages'
+
+        return str(Path(self.wheelhouse_path).resolve())
+
+    def find(self, name: str, version: Optional[str]) -> Distribution:
+        if self.wheelhouse_path is None:
+            return self._find_installed(name, version)
+
+        return self._find_wheel(name, version)
+
+    def _find_installed(self, name: str, version: Optional[str]) -> Distribution:
+        from importlib import metadata
+
+        try:
+            distribution = metadata.distribution(name)
+        except metadata.PackageNotFoundError:
+            raise DistributionNotFound(name, version, self.get_source_name())
+
+        if version and distribution.version != version:
+            raise DistributionNotFound(name, version, self.get_source_name())
+
+        return Distribution(
+            name=distribution.metadata['Name'],
+            version=distribution.version,
+        )
+
+    def _get_wheels(self) -> Dict[str, List[Tuple[str, Path]]]:
+        if self._wheels is None:
+            self._wheels = dict()
+
+            for path in sorted(Path(self.wheelhouse_path).glob('*.whl')):
+                name, version = path.name.split('-')[:2]
+                self._wheels.setdefault(
+                    normalize_distribution_name(name),
+                    [],
+                ).append((version, path))
+
+        return self._wheels
+
+    def _find_wheel(self, name: str, version: Optional[str]) -> Distribution:
+        candidates = self._get_wheels().get(normalize_distribution_name(name), [])
+
+        if version:
+            candidates = [x for x in candidates if x[0] == version]
+        else:
+            installed_version = _get_installed_version(name)
+            preferred = [x for x in candidates if x[0] == installed_version]
+            candidates = preferred or sorted(
+                candidates,
+                key=lambda x: _get_version_sorting_key(x[0]),
+            )
+
+        if not candidates:
+            raise DistributionNotFound(name, version, self.get_source_name())
+
+        version, wheel_path = candidates[-1]
+        return Distribution(name=name, version=version, wheel_path=wheel_path)
+
+
+def _get_installed_version(name: str) -> Optional[str]:
+    from importlib import metadata
+
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _get_version_sorting_key(version: str) -> Tuple:
+    return tuple(
+        (int(x), '') if x.isdigit() else (-1, x)
+        for x in re.split(r"[.+-]", version)
+    )
+
+
+def resolve_distributions(
+    requirements: Iterable[str],
+    finder: DistributionsFinder,
+    provided: Iterable[str] = (),
+) -> List[Distribution]:
+    results = dict()
+    provided = set(provided)
+    stack = [(x, True, True) for x in requirements]
+
+    while stack:
+        requirement, is_required, is_direct = stack.pop()
+        name, version, marker = parse_requirement(requirement)
+        is_satisfied = is_marker_satisfied(marker)
+
+        if is_satisfied is False:
+            continue
+
+        key = normalize_distribution_name(name)
+        if key in results:
+            continue
+
+        if not is_direct and key in provided:
+            continue
+
+        try:
+            distribution = finder.find(name, version)
+        except DistributionNotFound:
+            if is_required and is_satisfied:
+                raise
+            continue
+
+        results[key] = distribution
+        stack.extend(
+            (x, is_satisfied is True, False)
+            for x in distribution.get_requires()
+        )
+
+    return [results[x] for x in sorted(results)]
+
+
+def get_default_cache_path() -> Path:
+    return get_user_cache_path() / 'bundles'
+
+
+def make_cache_key(
+    requirements: Iterable[str],
+    finder: DistributionsFinder,
+    prune: bool,
+    provided: Iterable[str] = (),
+) -> str:
+    value = json.dumps({
+        'requirements': sorted(set(requirements)),
+        'source': finder.get_cache_key(),
+        'prune': prune,
+        'provided': sorted(set(provided)),
+    })
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+# Targets with identical requirements share a staging directory.
+def install_requirements(
+    requirements: Iterable[str],
+    finder: DistributionsFinder,
+    cache_path: Path,
+    prune: bool = False,
+    provided: Iterable[str] = (),
+) -> Path:
+    requirements = list(requirements)
+    provided = list(provided)
+    staging_path = cache_path / make_cache_key(
+        requirements,
+        finder,
+        prune,
+        provided,
+    )
+
+    if staging_path.is_dir():
+        return staging_path
+
+    cache_path.mkdir(mode=0o755, parents=True, exist_ok=True)
+    temporary_path = Path(tempfile.mkdtemp(dir=cache_path, prefix='.staging-'))
+
+    try:
+        for distribution in resolve_distributions(requirements, finder, provided):
+            distribution.install(temporary_path, prune)
+
+        try:
+            temporary_path.rename(staging_path)
+        except OSError:
+            if not staging_path.is_dir():
+                raise
+    finally:
+        if temporary_path.exists():
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+    return staging_path
+
+
+def output_bundle(
+    bundle_path: str,
+    staging_path: Path,
+    module_name: str,
+    module_source: str,
+) -> None:
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+
+    if bundle_path.suffix == '.zip':
+        with zipfile.ZipFile(bundle_path, 'w', zipfile.ZIP_DEFLATED) as f:
+            for path in sorted(staging_path.rglob('*')):
+                if path.is_file():
+                    f.write(path, path.relative_to(staging_path).as_posix())
+            f.writestr(module_name, module_source)
+    else:
+        shutil.copytree(staging_path, bundle_path, dirs_exist_ok=True)
+        (bundle_path / module_name).write_text(module_source)
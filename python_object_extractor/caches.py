@@ -0,0 +1,282 @@
+import collections
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    __slots__ = [
+        'name',
+        'max_entries',
+        'max_size',
+        'get_size',
+        'size',
+        'hits',
+        'misses',
+        'evictions',
+        '_items',
+        '_lock',
+    ]
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        max_size: Optional[int] = None,
+        get_size: Optional[Callable[[Any], int]] = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.get_size = get_size or (lambda value: 1)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<LRUCache("
+            f"name='{self.name}', "
+            f"entries={len(self._items)}, "
+            f"size={self.size})>"
+        )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+
+            if item is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._items.move_to_end(key)
+            return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+
+            size = self.get_size(value)
+            self._items[key] = (value, size)
+            self.size += size
+            self._evict()
+
+    def grow(self, key: Hashable, size: int) -> None:
+        with self._lock:
+            item = self._items.get(key)
+
+            if item is None:
+                return
+
+            self._items[key] = (item[0], item[1] + size)
+            self.size += size
+            self._evict()
+
+    def configure(
+        self,
+        max_entries: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def _evict(self) -> None:
+        while self._items and (
+               (self.max_entries is not None and len(self._items) > self.max_entries)
+            or (self.max_size is not None and self.size > self.max_size)
+        ):
+            _, (_, size) = self._items.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Optional[int]]:
+        return {
+            'entries': len(self._items),
+            'size': self.size,
+            'max_entries': self.max_entries,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+__registry = dict()
+__budget = {
+    'max_entries': None,
+    'max_size': None,
+}
+
+
+def get_cache(
+    name: str,
+    get_size: Optional[Callable[[Any], int]] = None,
+) -> LRUCache:
+    cache = __registry.get(name)
+
+    if cache is None:
+        cache = LRUCache(name=name, get_size=get_size, **__budget)
+        __registry[name] = cache
+
+    return cache
+
+
+def configure_caches(
+    max_entries: Optional[int] = None,
+    max_size: Optional[int] = None,
+) -> None:
+    __budget['max_entries'] = max_entries
+    __budget['max_size'] = max_size
+
+    for cache in __registry.values():
+        cache.configure(max_entries=max_entries, max_size=max_size)
+
+
+def get_caches_stats() -> Dict[str, Dict[str, Optional[int]]]:
+    results = {
+        name: cache.get_stats()
+        for name, cache in sorted(__registry.items())
+    }
+
+    if __disk_cache is not None:
+        results['disk'] = __disk_cache.get_stats()
+
+    return results
+
+
+def get_package_version() -> str:
+    from importlib import metadata
+
+    try:
+        return metadata.version('python-object-extractor')
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+# Keys include interpreter and package versions, so entries never go
+# stale. Increase version of a namespace whenever meaning of its values
+# changes.
+class DiskCache:
+    __slots__ = ['path', 'hits', 'misses', '_prefix', ]
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._prefix = f"{sys.version}\0{get_package_version()}\0".encode()
+
+    def __repr__(self) -> str:
+        return (
+            f"<DiskCache("
+            f"path='{self.path}', "
+            f"hits={self.hits}, "
+            f"misses={self.misses})>"
+        )
+
+    def _get_entry_path(self, namespace: str, source: str, version: int) -> Path:
+        digest = hashlib.sha256()
+        digest.update(self._prefix)
+        digest.update(f"{namespace}\0{version}\0".encode())
+        digest.update(source.encode())
+        key = digest.hexdigest()
+        return self.path / namespace / key[:2] / key
+
+    def get(self, namespace: str, source: str, version: int = 1) -> Any:
+        path = self._get_entry_path(namespace, source, version)
+
+        try:
+            with path.open('rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        namespace: str,
+        source: str,
+        value: Any,
+        version: int = 1,
+    ) -> None:
+        path = self._get_entry_path(namespace, source, version)
+        path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=path.parent)
+
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+__disk_cache = None
+
+
+def get_user_cache_path() -> Path:
+    root = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(root) / 'python-object-extractor'
+
+
+def configure_disk_cache(path: Optional[Path]) -> None:
+    global __disk_cache
+    __disk_cache = DiskCache(path) if path else None
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    return __disk_cache
+
+
+def load_or_make(
+    namespace: str,
+    source: str,
+    make: Callable[[str], Any],
+    version: int = 1,
+) -> Any:
+    disk_cache = __disk_cache
+
+    if disk_cache is None:
+        return make(source)
+
+    value = disk_cache.get(namespace, source, version)
+
+    if value is None:
+        value = make(source)
+        disk_cache.set(namespace, source, value, version)
+
+    return value
@@ -0,0 +1,197 @@
+import ast
+import re
+
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from python_object_extractor.caches import load_or_make
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.sources import get_module_definitions
+
+
+# Longer literals are not copied to every place they are used at.
+MAX_CONSTANT_LENGTH = 200
+
+
+def _is_literal(node: ast.expr) -> bool:
+    if isinstance(node, ast.Constant):
+        return True
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        return (
+                isinstance(node.operand, ast.Constant)
+            and isinstance(node.operand.value, (int, float, complex))
+            and not isinstance(node.operand.value, bool)
+        )
+
+    if isinstance(node, ast.Tuple):
+        return all(_is_literal(x) for x in node.elts)
+
+    return (
+            isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == 'frozenset'
+        and not node.keywords
+        and len(node.args) <= 1
+        and all(
+                isinstance(x, (ast.Set, ast.Tuple, ast.List))
+            and all(_is_literal(y) for y in x.elts)
+            for x in node.args
+        )
+    )
+
+
+def _needs_parentheses(node: ast.expr, text: str) -> bool:
+    if isinstance(node, ast.Tuple):
+        return not text.startswith('(')
+
+    return isinstance(node, ast.UnaryOp)
+
+
+def get_constant_literal(source: str) -> Optional[str]:
+    return load_or_make('constant_literals', source, _get_constant_literal)
+
+
+def _get_constant_literal(source: str) -> Optional[str]:
+    try:
+        body = ast.parse(source).body
+    except SyntaxError:
+        return None
+
+    if len(body) != 1:
+        return None
+
+    node = body[0]
+
+    if isinstance(node, ast.Assign):
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            return None
+    elif not isinstance(node, ast.AnnAssign) or node.value is None:
+        return None
+
+    if not _is_literal(node.value):
+        return None
+
+    text = ast.get_source_segment(source, node.value)
+    if not text or len(text) > MAX_CONSTANT_LENGTH or '\n' in text:
+        return None
+
+    if _needs_parentheses(node.value, text):
+        text = f"({text})"
+
+    return text
+
+
+def get_rebound_names(source: str) -> FrozenSet[str]:
+    return load_or_make('rebound_names', source, _get_rebound_names)
+
+
+# Names of keyword arguments count too, as a literal can't stand there.
+def _get_rebound_names(source: str) -> FrozenSet[str]:
+    results = set()
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            results.add(node.id)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            results.update(node.names)
+        elif isinstance(node, ast.keyword) and node.arg:
+            results.add(node.arg)
+        elif isinstance(node, ast.arg):
+            results.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            results.add(node.name)
+
+    return frozenset(results)
+
+
+def get_attributes_owners_names(source: str) -> FrozenSet[str]:
+    return load_or_make(
+        'attributes_owners_names',
+        source,
+        _get_attributes_owners_names,
+    )
+
+
+def _get_attributes_owners_names(source: str) -> FrozenSet[str]:
+    return frozenset(
+        node.value.id
+        for node in ast.walk(ast.parse(source))
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+    )
+
+
+def get_names_in_strings(source: str) -> FrozenSet[str]:
+    return load_or_make('names_in_strings', source, _get_names_in_strings)
+
+
+def _get_names_in_strings(source: str) -> FrozenSet[str]:
+    results = set()
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.JoinedStr):
+            results.update(
+                x.id
+                for x in ast.walk(node)
+                if isinstance(x, ast.Name)
+            )
+        elif isinstance(node, ast.Constant) and isinstance(node.value, (str, bytes)):
+            value = node.value
+            if isinstance(value, bytes):
+                value = value.decode('latin-1')
+            results.update(re.findall(r"[^\W\d]\w*", value))
+
+    return frozenset(results)
+
+
+def _is_bare_number(literal: str) -> bool:
+    # Attributes of numbers written as is can't be accessed, e.g. '1.real'.
+    return literal[:1].isdigit() or literal[:1] == '.'
+
+
+def is_declared_global(object_reference: ObjectReference) -> bool:
+    source = get_module_definitions(object_reference.module_name).source
+    name = re.escape(object_reference.object_name)
+    return re.search(rf"\bglobal\b[^\n]*\b{name}\b", source) is not None
+
+
+def inline_constants(
+    references_to_descriptors: Dict[ObjectReference, ObjectDescriptor],
+    root_reference: ObjectReference,
+    constants: Dict[ObjectReference, str],
+) -> None:
+    users = dict()
+
+    for descriptor in references_to_descriptors.values():
+        for item in _iter_project_imports(descriptor):
+            users.setdefault(item.object_reference, []).append(
+                (descriptor, item.alias or item.object_reference.object_name)
+            )
+
+    for reference, descriptor in list(references_to_descriptors.items()):
+        if reference == root_reference or reference not in users:
+            continue
+
+        literal = get_constant_literal(str(descriptor.source))
+        if literal is None or is_declared_global(reference):
+            continue
+
+        is_bare_number = _is_bare_number(literal)
+        if any(
+               name in get_rebound_names(str(user.source))
+            or name in get_names_in_strings(str(user.source))
+            or (
+                    is_bare_number
+                and name in get_attributes_owners_names(str(user.source))
+            )
+            for user, name in users[reference]
+        ):
+            continue
+
+        constants[reference] = literal
+        del references_to_descriptors[reference]
+
+
+def _iter_project_imports(descriptor: ObjectDescriptor) -> Iterable:
+    if descriptor.global_imports and descriptor.global_imports.project:
+        yield from descriptor.global_imports.project
@@ -0,0 +1,397 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.imports import get_object_imports
+from python_object_extractor.modules import get_importer
+from python_object_extractor.sources import get_module_definitions
+from python_object_extractor.sources import make_module_definitions
+
+
+INDEX_VERSION = 1
+
+
+def load_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "List extracted targets affected by changes of project files."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        'index_path',
+        type=Path,
+        help=(
+            "path to dependents index written by extractor with "
+            "'--dependents_index_path'"
+        ),
+    )
+    parser.add_argument(
+        'changed_paths',
+        type=str,
+        nargs='*',
+        help=(
+            "paths to changed files, for example, output of "
+            "'git diff --name-only'. Read from STDIN if omitted"
+        ),
+    )
+    parser.add_argument(
+        '-p', '--project_path',
+        dest='project_path',
+        type=Path,
+        default='.',
+        help="path to local project directory relative paths start from",
+    )
+    parser.add_argument(
+        '-o', '--output_path',
+        dest='output_path',
+        type=str,
+        default='-',
+        help=(
+            "path to output file listing affected targets. "
+            "Use '-' to output to STDOUT"
+        ),
+    )
+    return parser.parse_args()
+
+
+def make_digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def get_imports_digest(source: str) -> str:
+    return make_digest("\n".join(sorted({
+        str(x)
+        for x in get_object_imports(source)
+    })))
+
+
+# Objects without digest are touched by any change of their module.
+class TargetRecord:
+    __slots__ = ['objects', 'modules', ]
+
+    def __init__(
+        self,
+        objects: Dict[str, Optional[str]],
+        modules: Dict[str, Dict[str, str]],
+    ):
+        self.objects = objects
+        self.modules = modules
+
+    def __repr__(self) -> str:
+        return (
+            f"<TargetRecord("
+            f"objects={len(self.objects)}, "
+            f"modules={len(self.modules)})>"
+        )
+
+
+def make_target_record(
+    descriptors: Iterable[ObjectDescriptor],
+    project_path: str,
+) -> TargetRecord:
+    importer = get_importer()
+    references = {x.object_reference: None for x in descriptors}
+    module_names = set()
+
+    for descriptor in descriptors:
+        # Imported objects without descriptors of their own, e.g. inlined
+        # constants, are recorded too, so that changes of them are seen.
+        for imports_group in [descriptor.local_imports, descriptor.global_imports]:
+            for object_import in (imports_group and imports_group.project) or []:
+                references.setdefault(object_import.object_reference)
+
+                # Module an access to an imported module was substituted
+                # with is recorded, the module it was accessed through is not.
+                item = object_import
+                while (
+                        item.substituted is not None
+                    and item.substituted.access_chain is None
+                ):
+                    item = item.substituted
+                if item.substituted is not None:
+                    module_names.add(item.object_reference.module_name)
+
+    objects = dict()
+
+    for reference in references:
+        module_names.add(reference.module_name)
+
+        source = get_module_definitions(reference.module_name).get_source(
+            reference.object_name,
+        )
+        objects[str(reference)] = source and make_digest(source)
+
+    modules = dict()
+
+    for module_name in sorted(module_names):
+        path = importer.get_module_path(module_name)
+        if not path:
+            continue
+
+        # Source is read from file, as source of an empty module can't be
+        # got from the module itself.
+        with open(path, 'rt') as f:
+            source = f.read()
+
+        modules[module_name] = {
+            'path': _make_relative_path(path, project_path),
+            'imports_digest': get_imports_digest(source),
+        }
+
+    return TargetRecord(objects=objects, modules=modules)
+
+
+def _make_relative_path(path: str, project_path: str) -> str:
+    path = os.path.realpath(path)
+    project_path = os.path.realpath(project_path)
+
+    if os.path.commonpath([path, project_path]) == project_path:
+        return os.path.relpath(path, project_path)
+
+    return path
+
+
+class DependentsIndex:
+    __slots__ = [
+        'targets',
+        'modules',
+        'objects',
+        '_paths_to_modules',
+        '_modules_to_objects',
+    ]
+
+    def __init__(self):
+        self.targets = dict()
+        self.modules = dict()
+        self.objects = dict()
+        self._paths_to_modules = None
+        self._modules_to_objects = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<DependentsIndex("
+            f"targets={len(self.targets)}, "
+            f"modules={len(self.modules)}, "
+            f"objects={len(self.objects)})>"
+        )
+
+    def remove_target(self, target: str) -> None:
+        record = self.targets.pop(target, None)
+
+        if record is None:
+            return
+
+        for module_name in record.modules:
+            entry = self.modules.get(module_name)
+            if entry:
+                entry['targets'].discard(target)
+                if not entry['targets']:
+                    del self.modules[module_name]
+
+        for reference in record.objects:
+            entry = self.objects.get(reference)
+            if entry:
+                entry['targets'].discard(target)
+                if not entry['targets']:
+                    del self.objects[reference]
+
+        self._reset_lookups()
+
+    def update_target(self, target: str, record: TargetRecord) -> None:
+        self.remove_target(target)
+        self.targets[target] = record
+
+        for module_name, module in record.modules.items():
+            entry = self.modules.setdefault(module_name, {'targets': set()})
+            entry['path'] = module['path']
+            entry['imports_digest'] = module['imports_digest']
+            entry['targets'].add(target)
+
+        for reference, digest in record.objects.items():
+            entry = self.objects.setdefault(reference, {'targets': set()})
+            entry['digest'] = digest
+            entry['targets'].add(target)
+
+        self._reset_lookups()
+
+    def _reset_lookups(self) -> None:
+        self._paths_to_modules = None
+        self._modules_to_objects = None
+
+    def _get_paths_to_modules(self) -> Dict[str, List[str]]:
+        if self._paths_to_modules is None:
+            self._paths_to_modules = dict()
+            for module_name, entry in self.modules.items():
+                self._paths_to_modules.setdefault(entry['path'], []).append(
+                    module_name,
+                )
+
+        return self._paths_to_modules
+
+    def _get_modules_to_objects(self) -> Dict[str, List[str]]:
+        if self._modules_to_objects is None:
+            self._modules_to_objects = dict()
+            for reference in self.objects:
+                module_name = reference.split(':', 1)[0]
+                self._modules_to_objects.setdefault(module_name, []).append(
+                    reference,
+                )
+
+        return self._modules_to_objects
+
+    def get_affected_targets(
+        self,
+        changed_paths: Iterable[str],
+        project_path: str,
+    ) -> List[str]:
+        paths_to_modules = self._get_paths_to_modules()
+        results = set()
+
+        for path in changed_paths:
+            absolute_path = os.path.join(project_path, path)
+            relative_path = _make_relative_path(absolute_path, project_path)
+
+            for module_name in paths_to_modules.get(relative_path, []):
+                results.update(self._get_module_affected_targets(
+                    module_name,
+                    absolute_path,
+                ))
+
+        return sorted(results)
+
+    def _get_module_affected_targets(
+        self,
+        module_name: str,
+        path: str,
+    ) -> Set[str]:
+        entry = self.modules[module_name]
+
+        try:
+            source = Path(path).read_text()
+            imports_digest = get_imports_digest(source)
+            definitions = make_module_definitions(source)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            return set(entry['targets'])
+
+        if imports_digest != entry['imports_digest']:
+            return set(entry['targets'])
+
+        results = set()
+
+        for reference in self._get_modules_to_objects().get(module_name, []):
+            object_entry = self.objects[reference]
+            digest = object_entry['digest']
+            source = definitions.get_source(reference.split(':', 1)[1])
+
+            if digest is None or source is None or make_digest(source) != digest:
+                results.update(object_entry['targets'])
+
+        return results
+
+    def to_dict(self) -> dict:
+        return {
+            'version': INDEX_VERSION,
+            'targets': {
+                target: {
+                    'objects': sorted(record.objects),
+                    'modules': sorted(record.modules),
+                }
+                for target, record in sorted(self.targets.items())
+            },
+            'modules': {
+                module_name: dict(entry, targets=sorted(entry['targets']))
+                for module_name, entry in sorted(self.modules.items())
+            },
+            'objects': {
+                reference: dict(entry, targets=sorted(entry['targets']))
+                for reference, entry in sorted(self.objects.items())
+            },
+        }
+
+
+def load_dependents_index(index_path: Path) -> DependentsIndex:
+    index = DependentsIndex()
+
+    try:
+        with Path(index_path).open('rt') as f:
+            value = json.load(f)
+    except FileNotFoundError:
+        return index
+
+    if value.get('version') != INDEX_VERSION:
+        return index
+
+    for module_name, entry in value['modules'].items():
+        index.modules[module_name] = dict(entry, targets=set(entry['targets']))
+
+    for reference, entry in value['objects'].items():
+        index.objects[reference] = dict(entry, targets=set(entry['targets']))
+
+    for target, entry in value['targets'].items():
+        index.targets[target] = TargetRecord(
+            objects={
+                x: index.objects[x]['digest']
+                for x in entry['objects']
+            },
+            modules={
+                x: {
+                    'path': index.modules[x]['path'],
+                    'imports_digest': index.modules[x]['imports_digest'],
+                }
+                for x in entry['modules']
+            },
+        )
+
+    return index
+
+
+def save_dependents_index(index: DependentsIndex, index_path: Path) -> None:
+    index_path = Path(index_path)
+    index_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=index_path.parent)
+
+    try:
+        with os.fdopen(descriptor, 'wt') as f:
+            json.dump(index.to_dict(), f, indent=2)
+            f.write("\n")
+        os.replace(temporary_path, index_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def main() -> None:
+    args = load_args()
+
+    changed_paths = args.changed_paths or [
+        x.strip()
+        for x in sys.stdin
+        if x.strip()
+    ]
+    index = load_dependents_index(args.index_path)
+    targets = index.get_affected_targets(
+        changed_paths=changed_paths,
+        project_path=str(Path(args.project_path).absolute()),
+    )
+    lines = [f"{x}\n" for x in targets]
+
+    if args.output_path == '-':
+        sys.stdout.writelines(lines)
+        sys.stdout.flush()
+    else:
+        output_path = Path(args.output_path)
+        output_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with output_path.open('wt') as f:
+            f.writelines(lines)
+
+
+if __name__ == '__main__':
+    main()
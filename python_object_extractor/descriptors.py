@@ -1,14 +1,17 @@
-from typing import Set, Optional
+from typing import Iterator, Set, Optional
 
+from python_object_extractor.analysis import SourceAnalysis
 from python_object_extractor.imports import ObjectImport
 from python_object_extractor.imports import ObjectImportsGroupped
 from python_object_extractor.references import ObjectReference
+from python_object_extractor.spans import ObjectSource
 
 
 class ObjectDescriptor:
     __slots__ = [
         'object_reference',
         'source',
+        'analysis',
         'local_imports',
         'global_imports',
     ]
@@ -16,12 +19,14 @@ class ObjectDescriptor:
     def __init__(
         self,
         object_reference: ObjectReference,
-        source: str,
+        source: ObjectSource,
+        analysis: Optional[SourceAnalysis] = None,
         local_imports: Optional[ObjectImportsGroupped] = None,
         global_imports: Optional[ObjectImportsGroupped] = None,
     ):
         self.object_reference = object_reference
         self.source = source
+        self.analysis = analysis
         self.local_imports = local_imports
         self.global_imports = global_imports
 
@@ -32,6 +37,24 @@ class ObjectDescriptor:
             f")>"
         )
 
+    def iter_imports(self) -> Iterator[ObjectImport]:
+        for imports_group in [self.local_imports, self.global_imports]:
+            yield from self._iter_imports_from_group(imports_group)
+
+    def iter_global_imports(self) -> Iterator[ObjectImport]:
+        yield from self._iter_imports_from_group(self.global_imports)
+
+    def _iter_imports_from_group(
+        self,
+        imports_group: Optional[ObjectImportsGroupped],
+    ) -> Iterator[ObjectImport]:
+        if not imports_group:
+            return
+
+        yield from imports_group.stdlib or []
+        yield from imports_group.third_party or []
+        yield from imports_group.project or []
+
     def gather_imports(self) -> Set[ObjectImport]:
         results = set()
 
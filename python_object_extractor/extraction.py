@@ -0,0 +1,224 @@
+from typing import Dict, List, Optional, Set
+
+from python_object_extractor.aggregation import aggregate_imports
+from python_object_extractor.boundaries import TraversalBoundaries
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.imports import group_imports_by_origin
+from python_object_extractor.inlining import HelpersInlining
+from python_object_extractor.inspection import inspect_object_with_children
+from python_object_extractor.minification import MinificationOptions
+from python_object_extractor.minification import MinificationReport
+from python_object_extractor.output import format_module
+from python_object_extractor.output import get_requirements
+from python_object_extractor.packages import format_package
+from python_object_extractor.profiling import measure_stage
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.shaking import MethodsShaking
+
+
+class Extraction:
+    __slots__ = [
+        'object_reference',
+        'descriptors',
+        'module_source',
+        'package_sources',
+        'requirements',
+        'minification_report',
+    ]
+
+    def __init__(
+        self,
+        object_reference: ObjectReference,
+        descriptors: List[ObjectDescriptor],
+        module_source: Optional[str],
+        requirements: List[str],
+        minification_report: Optional[MinificationReport] = None,
+        package_sources: Optional[Dict[str, str]] = None,
+    ):
+        self.object_reference = object_reference
+        self.descriptors = descriptors
+        self.module_source = module_source
+        self.package_sources = package_sources
+        self.requirements = requirements
+        self.minification_report = minification_report
+
+    def __repr__(self) -> str:
+        return (
+            f"<Extraction("
+            f"object_reference={repr(self.object_reference)}, "
+            f"descriptors={len(self.descriptors)}, "
+            f"requirements={len(self.requirements)})>"
+        )
+
+
+class Estimate:
+    __slots__ = [
+        'object_reference',
+        'descriptors_count',
+        'modules_count',
+        'requirements',
+        'estimated_size',
+    ]
+
+    def __init__(
+        self,
+        object_reference: ObjectReference,
+        descriptors_count: int,
+        modules_count: int,
+        requirements: List[str],
+        estimated_size: int,
+    ):
+        self.object_reference = object_reference
+        self.descriptors_count = descriptors_count
+        self.modules_count = modules_count
+        self.requirements = requirements
+        self.estimated_size = estimated_size
+
+    def __repr__(self) -> str:
+        return (
+            f"<Estimate("
+            f"object_reference={repr(self.object_reference)}, "
+            f"descriptors_count={self.descriptors_count}, "
+            f"estimated_size={self.estimated_size})>"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'object_reference': str(self.object_reference),
+            'descriptors_count': self.descriptors_count,
+            'modules_count': self.modules_count,
+            'requirements': self.requirements,
+            'estimated_size': self.estimated_size,
+        }
+
+
+def get_pinned_requirements(
+    external_references: Set[ObjectReference],
+    boundaries: Optional[TraversalBoundaries],
+) -> Dict[str, str]:
+    results = dict()
+
+    for reference in external_references:
+        requirement = boundaries and boundaries.get_requirement(
+            reference.module_name,
+        )
+        if requirement:
+            results[reference.module_name] = requirement
+
+    return results
+
+
+def estimate_object(
+    object_reference: ObjectReference,
+    project_path: str,
+    boundaries: Optional[TraversalBoundaries] = None,
+    shaking: Optional[MethodsShaking] = None,
+    constants: Optional[Dict[ObjectReference, str]] = None,
+) -> Estimate:
+    external_references = set()
+    descriptors = inspect_object_with_children(
+        object_reference=object_reference,
+        project_path=project_path,
+        boundaries=boundaries,
+        external_references=external_references,
+        shaking=shaking,
+        constants=constants,
+    )
+    imports = group_imports_by_origin(
+        aggregate_imports(descriptors, object_reference, constants=constants).imports,
+        project_path,
+        external_references,
+    )
+    estimated_size = sum(x.source.get_size() + 2 for x in descriptors)
+    estimated_size += sum(
+        len(str(x)) + 1
+        for x in (imports.stdlib or []) + (imports.third_party or [])
+    )
+
+    return Estimate(
+        object_reference=object_reference,
+        descriptors_count=len(descriptors),
+        modules_count=len({x.object_reference.module_name for x in descriptors}),
+        requirements=get_requirements(
+            imports,
+            get_pinned_requirements(external_references, boundaries),
+        ),
+        estimated_size=estimated_size,
+    )
+
+
+def extract_object(
+    object_reference: ObjectReference,
+    project_path: str,
+    output_object_name: Optional[str] = None,
+    minification: Optional[MinificationOptions] = None,
+    boundaries: Optional[TraversalBoundaries] = None,
+    split_package: bool = False,
+    shaking: Optional[MethodsShaking] = None,
+    constants: Optional[Dict[ObjectReference, str]] = None,
+    inlining: Optional[HelpersInlining] = None,
+) -> Extraction:
+    output_object_name = (
+           output_object_name
+        or object_reference.object_name
+    )
+    external_references = set()
+
+    if inlining is not None:
+        inlining.reset(object_reference)
+
+    with measure_stage('inspection'):
+        descriptors = inspect_object_with_children(
+            object_reference=object_reference,
+            project_path=project_path,
+            boundaries=boundaries,
+            external_references=external_references,
+            shaking=shaking,
+            constants=constants,
+        )
+
+    with measure_stage('imports_resolution'):
+        aggregation = aggregate_imports(
+            descriptors=descriptors,
+            object_reference=object_reference,
+            output_object_name=output_object_name,
+            constants=constants,
+        )
+        references_to_aliases = aggregation.references_to_aliases
+        imports = group_imports_by_origin(
+            aggregation.imports,
+            project_path,
+            external_references,
+        )
+
+    module_source = package_sources = None
+
+    with measure_stage('formatting'):
+        if split_package:
+            package_sources, minification_report = format_package(
+                descriptors=descriptors,
+                imports=imports,
+                references_to_aliases=references_to_aliases,
+                object_reference=object_reference,
+                minification=minification,
+            )
+        else:
+            module_source, minification_report = format_module(
+                descriptors=descriptors,
+                imports=imports,
+                references_to_aliases=references_to_aliases,
+                minification=minification,
+                inlining=inlining,
+            )
+
+    return Extraction(
+        object_reference=object_reference,
+        descriptors=descriptors,
+        module_source=module_source,
+        package_sources=package_sources,
+        requirements=get_requirements(
+            imports,
+            get_pinned_requirements(external_references, boundaries),
+        ),
+        minification_report=minification_report,
+    )
@@ -1,11 +1,14 @@
 import operator
 
-from typing import Iterable, List
+from typing import Callable, Iterable, List, TypeVar
 
 from python_object_extractor.descriptors import ObjectDescriptor
 from python_object_extractor.references import ObjectReference
 
 
+T = TypeVar('T')
+
+
 class GraphNode:
     __slots__ = [
         'descriptor',
@@ -24,6 +27,8 @@ class GraphNode:
 def sort_descriptors_topologically(
     descriptors: Iterable[ObjectDescriptor]
 ) -> List[ObjectDescriptor]:
+    descriptors = list(descriptors)
+    known_references = {x.object_reference for x in descriptors}
     nodes = [
         GraphNode(
             descriptor=descriptor,
@@ -34,6 +39,7 @@ def sort_descriptors_topologically(
                     and set([
                         x.object_reference
                         for x in descriptor.global_imports.project
+                        if x.object_reference in known_references
                     ])
                 )
                 or []
@@ -61,3 +67,55 @@ def sort_descriptors_topologically(
                     nodes.remove(node)
 
     return results
+
+
+# Every component follows components it has edges to.
+def find_strongly_connected_components(
+    nodes: Iterable[T],
+    get_successors: Callable[[T], Iterable[T]],
+) -> List[List[T]]:
+    indexes = dict()
+    low_links = dict()
+    stack = []
+    on_stack = set()
+    results = []
+
+    for root in nodes:
+        if root in indexes:
+            continue
+
+        work = [(root, iter(get_successors(root)))]
+        indexes[root] = low_links[root] = len(indexes)
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, successors = work[-1]
+            successor = next(successors, None)
+
+            if successor is not None:
+                if successor not in indexes:
+                    indexes[successor] = low_links[successor] = len(indexes)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(get_successors(successor))))
+                elif successor in on_stack:
+                    low_links[node] = min(low_links[node], indexes[successor])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low_links[parent] = min(low_links[parent], low_links[node])
+
+            if low_links[node] == indexes[node]:
+                component = []
+                while True:
+                    item = stack.pop()
+                    on_stack.discard(item)
+                    component.append(item)
+                    if item == node:
+                        break
+                results.append(component)
+
+    return results
@@ -1,21 +1,20 @@
 import ast
-import functools
-import inspect
-import threading
-
-from types import ModuleType
-from typing import Any, Callable, Iterable, List, Dict, Tuple, Optional, TypeVar
-
-from python_object_extractor.modules import get_module_by_name
-from python_object_extractor.modules import is_project_module
-from python_object_extractor.modules import is_stdlib_module
-from python_object_extractor.modules import is_third_party_module
-from python_object_extractor.references import make_name_from_object_reference
+import sys
+import weakref
+
+from typing import Any, Iterable, List, Dict, Tuple, Optional, TypeVar
+
+from python_object_extractor.caches import get_cache
+from python_object_extractor.caches import load_or_make
+from python_object_extractor.modules import get_importer
+from python_object_extractor.modules import ModuleOrigin
 from python_object_extractor.references import ObjectReference
 
 
-__caches = threading.local()
-__caches.modules_imports = dict()
+__modules_imports = get_cache(
+    name='modules_imports',
+    get_size=lambda imports: sys.getsizeof(imports) + len(imports) * 200,
+)
 
 
 ObjectImport = TypeVar(
@@ -24,20 +23,68 @@ ObjectImport = TypeVar(
 )
 
 
+# Equality and hash ignore 'substituted' and 'access_chain'.
 class ObjectImport:
-    __slots__ = ['object_reference', 'alias', 'substituted', 'access_chain', ]
+    __slots__ = [
+        'object_reference',
+        'alias',
+        'substituted',
+        'access_chain',
+        '_identity',
+        '_hash',
+        '_str',
+        '__weakref__',
+    ]
 
-    def __init__(
-        self,
+    __instances = weakref.WeakValueDictionary()
+
+    def __new__(
+        cls,
         object_reference: ObjectReference,
         alias: Optional[str] = None,
         substituted: Optional[ObjectImport] = None,
-        access_chain: Optional[List[str]] = None,
-    ):
-        self.object_reference = object_reference
-        self.alias = alias
-        self.substituted = substituted
-        self.access_chain = access_chain
+        access_chain: Optional[Iterable[str]] = None,
+    ) -> ObjectImport:
+        if access_chain is not None:
+            access_chain = tuple(access_chain)
+
+        identity = (
+            object_reference,
+            alias,
+            substituted and substituted._identity,
+            access_chain,
+        )
+        instance = cls.__instances.get(identity)
+
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, 'object_reference', object_reference)
+            object.__setattr__(instance, 'alias', alias)
+            object.__setattr__(instance, 'substituted', substituted)
+            object.__setattr__(instance, 'access_chain', access_chain)
+            object.__setattr__(instance, '_identity', identity)
+            object.__setattr__(instance, '_hash', hash((object_reference, alias)))
+            object.__setattr__(instance, '_str', instance._make_str())
+            cls.__instances[identity] = instance
+
+        return instance
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __reduce__(self) -> tuple:
+        return (
+            type(self),
+            (
+                self.object_reference,
+                self.alias,
+                self.substituted,
+                self.access_chain,
+            ),
+        )
 
     def __repr__(self) -> str:
         alias = f"'{self.alias}'" if self.alias else None
@@ -53,7 +100,7 @@ class ObjectImport:
     def is_import_from_module(self) -> bool:
         return not self.is_import_of_module()
 
-    def __str__(self) -> str:
+    def _make_str(self) -> str:
         s = f"import {self.object_reference.object_name}"
 
         if self.is_import_from_module():
@@ -64,10 +111,16 @@ class ObjectImport:
 
         return s
 
+    def __str__(self) -> str:
+        return self._str
+
     def __hash__(self) -> int:
-        return hash(str(self))
+        return self._hash
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+
         return (
                 isinstance(other, ObjectImport)
             and self.object_reference == other.object_reference
@@ -131,13 +184,21 @@ class ObjectImportsGroupped:
         )
 
 
-def get_module_imports(module: ModuleType) -> List[ObjectImport]:
-    results = __caches.modules_imports.get(module)
+def get_module_imports(module_name: str) -> List[ObjectImport]:
+    results = __modules_imports.get(module_name)
 
     if results is None:
-        source = inspect.getsource(module)
-        results = get_object_imports(source)
-        __caches.modules_imports[module] = results
+        importer = get_importer()
+        results = importer.get_module_imports(module_name)
+
+        if results is None:
+            results = load_or_make(
+                'module_imports',
+                importer.get_module_source(module_name),
+                get_object_imports,
+            )
+
+        __modules_imports.set(module_name, results)
 
     return results
 
@@ -147,28 +208,36 @@ def get_object_imports(source: str) -> List[ObjectImport]:
     tree = ast.parse(source)
 
     for node in ast.walk(tree):
-        if isinstance(node, ast.Import):
-            for item in node.names:
-                module_name = item.name
-                reference = ObjectReference(
-                    module_name=module_name,
-                    object_name=module_name,
-                )
-                results.append(ObjectImport(
-                    object_reference=reference,
-                    alias=item.asname,
-                ))
-        elif isinstance(node, ast.ImportFrom):
-            module_name = node.module
-            for item in node.names:
-                reference = ObjectReference(
-                    module_name=module_name,
-                    object_name=item.name,
-                )
-                results.append(ObjectImport(
-                    object_reference=reference,
-                    alias=item.asname,
-                ))
+        results.extend(get_imports_from_node(node))
+
+    return results
+
+
+def get_imports_from_node(node: ast.AST) -> List[ObjectImport]:
+    results = list()
+
+    if isinstance(node, ast.Import):
+        for item in node.names:
+            module_name = item.name
+            reference = ObjectReference(
+                module_name=module_name,
+                object_name=module_name,
+            )
+            results.append(ObjectImport(
+                object_reference=reference,
+                alias=item.asname,
+            ))
+    elif isinstance(node, ast.ImportFrom):
+        module_name = node.module
+        for item in node.names:
+            reference = ObjectReference(
+                module_name=module_name,
+                object_name=item.name,
+            )
+            results.append(ObjectImport(
+                object_reference=reference,
+                alias=item.asname,
+            ))
 
     return results
 
@@ -176,15 +245,29 @@ def get_object_imports(source: str) -> List[ObjectImport]:
 def group_imports_by_origin(
     imports: List[ObjectImport],
     project_path: str,
+    external_references: Iterable[ObjectReference] = (),
 ) -> ObjectImportsGroupped:
+    importer = get_importer()
+    external_references = set(external_references)
+    external_imports = [
+        x for x in imports
+        if x.object_reference in external_references
+    ]
+    if external_imports:
+        imports = [
+            x for x in imports
+            if x.object_reference not in external_references
+        ]
+
     module_names = {x.object_reference.module_name for x in imports}
-    modules = {
-        x: get_module_by_name(x)
+    origins = {
+        x: importer.get_module_origin(x, project_path)
         for x in module_names
     }
-    imports, stdlib_imports = split_stdlib_imports(imports, modules)
-    imports, third_party_imports = split_third_party_imports(imports, modules)
-    _, project_imports = split_project_imports(imports, modules, project_path)
+    imports, stdlib_imports = split_stdlib_imports(imports, origins)
+    imports, third_party_imports = split_third_party_imports(imports, origins)
+    _, project_imports = split_project_imports(imports, origins)
+    third_party_imports.extend(external_imports)
     return ObjectImportsGroupped(
         stdlib=stdlib_imports,
         third_party=third_party_imports,
@@ -194,36 +277,34 @@ def group_imports_by_origin(
 
 def split_stdlib_imports(
     imports: List[ObjectImport],
-    modules_map: Dict[str, ModuleType],
+    origins_map: Dict[str, Optional[ModuleOrigin]],
 ) -> Tuple[List[ObjectImport], List[ObjectImport]]:
-    return split_imports(imports, modules_map, is_stdlib_module)
+    return split_imports(imports, origins_map, ModuleOrigin.STDLIB)
 
 
 def split_third_party_imports(
     imports: List[ObjectImport],
-    modules_map: Dict[str, ModuleType],
+    origins_map: Dict[str, Optional[ModuleOrigin]],
 ) -> Tuple[List[ObjectImport], List[ObjectImport]]:
-    return split_imports(imports, modules_map, is_third_party_module)
+    return split_imports(imports, origins_map, ModuleOrigin.THIRD_PARTY)
 
 
 def split_project_imports(
     imports: List[ObjectImport],
-    modules_map: Dict[str, ModuleType],
-    project_path: str,
+    origins_map: Dict[str, Optional[ModuleOrigin]],
 ) -> Tuple[List[ObjectImport], List[ObjectImport]]:
-    condition = functools.partial(is_project_module, project_path=project_path)
-    return split_imports(imports, modules_map, condition)
+    return split_imports(imports, origins_map, ModuleOrigin.PROJECT)
 
 
 def split_imports(
     imports: List[ObjectImport],
-    modules_map: Dict[str, ModuleType],
-    condition: Callable[[ModuleType], bool],
+    origins_map: Dict[str, Optional[ModuleOrigin]],
+    origin: ModuleOrigin,
 ) -> Tuple[List[ObjectImport], List[ObjectImport]]:
     selected = {
         x
         for x in imports
-        if condition(modules_map[x.object_reference.module_name])
+        if origins_map[x.object_reference.module_name] is origin
     }
     rejected = {
         x
@@ -233,17 +314,6 @@ def split_imports(
     return (list(rejected), list(selected))
 
 
-def group_aliases_by_references(
-    references_to_aliases: Iterable[Tuple[ObjectReference, str]],
-) -> Dict[ObjectReference, List[str]]:
-    result = dict()
-
-    for reference, alias in references_to_aliases:
-        result.setdefault(reference, []).append(alias)
-
-    return result
-
-
 def group_references_by_aliases(
     references_to_aliases: Iterable[Tuple[ObjectReference, str]],
 ) -> Dict[str, List[ObjectReference]]:
@@ -253,42 +323,3 @@ def group_references_by_aliases(
         result.setdefault(alias, []).append(reference)
 
     return result
-
-
-def resolve_import_conflicts(
-    imports: Iterable[ObjectImport],
-) -> List[ObjectImport]:
-    references_to_alias_groupped = group_aliases_by_references([
-        (x.object_reference, x.alias or x.object_reference.object_name)
-        for x in imports
-    ])
-    references_to_aliases = [
-        (
-            reference,
-            (
-                alias_group[0]
-                if len(alias_group) == 1
-                else make_name_from_object_reference(reference)
-            ),
-        )
-        for reference, alias_group in references_to_alias_groupped.items()
-    ]
-    aliases_to_references_groupped = group_references_by_aliases(references_to_aliases)
-    results = []
-
-    for alias, references in aliases_to_references_groupped.items():
-        if len(references) == 1:
-            results.append(ObjectImport(
-                object_reference=references[0],
-                alias=alias,
-            ))
-        else:
-            results.extend([
-                ObjectImport(
-                    object_reference=reference,
-                    alias=make_name_from_object_reference(reference),
-                )
-                for reference in references
-            ])
-
-    return results
@@ -0,0 +1,483 @@
+import argparse
+import ast
+import io
+import json
+import sys
+
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Union
+
+from python_object_extractor.caches import load_or_make
+from python_object_extractor.constants import get_rebound_names
+from python_object_extractor.constants import is_declared_global
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.sources import get_lines_offsets
+from python_object_extractor.sources import get_node_span
+from python_object_extractor.spans import Edit
+from python_object_extractor.spans import ObjectSource
+
+
+DEFAULT_MAX_SIZE = 80
+
+# Calls of these depend on the frame they are made from, which inlining
+# changes.
+FRAME_DEPENDENT_NAMES = {
+    'locals',
+    'vars',
+    'globals',
+    'dir',
+    'eval',
+    'exec',
+    'super',
+    '__class__',
+}
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+SCOPE_NODES = (
+    ast.Lambda,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+)
+
+
+# Calls are inlined only if all arguments are names or constants, so
+# that arguments are evaluated as before.
+class HelpersInlining:
+    __slots__ = [
+        'max_size',
+        'object_reference',
+        'inlined_calls',
+        'refused_helpers',
+        'removed_references',
+    ]
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.object_reference = None
+        self.inlined_calls = dict()
+        self.refused_helpers = dict()
+        self.removed_references = []
+
+    def __repr__(self) -> str:
+        return (
+            f"<HelpersInlining("
+            f"max_size={self.max_size}, "
+            f"inlined_calls={sum(self.inlined_calls.values())}, "
+            f"removed_references={len(self.removed_references)})>"
+        )
+
+    def reset(self, object_reference: ObjectReference) -> None:
+        self.object_reference = object_reference
+        self.inlined_calls = dict()
+        self.refused_helpers = dict()
+        self.removed_references = []
+
+    def to_dict(self) -> dict:
+        return {
+            'inlined_calls': [
+                {
+                    'caller': str(caller),
+                    'helper': str(helper),
+                    'calls': calls,
+                }
+                for (caller, helper), calls in sorted(self.inlined_calls.items())
+            ],
+            'removed': [str(x) for x in self.removed_references],
+            'refused': [
+                {
+                    'helper': str(reference),
+                    'reason': reason,
+                }
+                for reference, reason in sorted(self.refused_helpers.items())
+            ],
+        }
+
+
+class InlinableHelper:
+    __slots__ = [
+        'object_reference',
+        'parameters',
+        'expression',
+        'parameters_uses',
+        'free_names',
+    ]
+
+    def __init__(
+        self,
+        object_reference: ObjectReference,
+        parameters: List[str],
+        expression: str,
+        parameters_uses: List[Edit],
+        free_names: FrozenSet[str],
+    ):
+        self.object_reference = object_reference
+        self.parameters = parameters
+        self.expression = expression
+        self.parameters_uses = parameters_uses
+        self.free_names = free_names
+
+    def __repr__(self) -> str:
+        return (
+            f"<InlinableHelper("
+            f"object_reference={repr(self.object_reference)}, "
+            f"parameters={self.parameters})>"
+        )
+
+
+def _get_returned_expression(node: FunctionNode) -> Optional[ast.expr]:
+    body = node.body
+
+    if (
+            body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    ):
+        body = body[1:]
+
+    if len(body) == 1 and isinstance(body[0], ast.Return):
+        return body[0].value
+
+
+def analyze_helper(
+    object_reference: ObjectReference,
+    name: str,
+    source: str,
+    max_size: int,
+) -> Union[InlinableHelper, str, None]:
+    body = ast.parse(source).body
+
+    if len(body) != 1 or not isinstance(body[0], (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return None
+
+    node = body[0]
+    expression = _get_returned_expression(node)
+    if expression is None:
+        return None
+
+    if isinstance(node, ast.AsyncFunctionDef):
+        return "coroutine"
+
+    arguments = node.args
+
+    if arguments.vararg or arguments.kwarg:
+        return "varargs"
+
+    if arguments.kwonlyargs or getattr(arguments, 'posonlyargs', None):
+        return "keyword-only or positional-only parameters"
+
+    if arguments.defaults:
+        return "default values of parameters"
+
+    if node.decorator_list:
+        return "decorated"
+
+    text = ast.get_source_segment(source, expression)
+    if len(text) > max_size:
+        return "too large"
+
+    parameters = [x.arg for x in arguments.args]
+    lines = source.splitlines(keepends=True)
+    offsets = get_lines_offsets(lines)
+    start = get_node_span(lines, offsets, expression)[0]
+    parameters_uses = []
+    free_names = set()
+
+    for child in ast.walk(expression):
+        if isinstance(child, SCOPE_NODES):
+            return "closure"
+
+        if isinstance(child, (ast.Yield, ast.YieldFrom, ast.Await)):
+            return "generator or coroutine"
+
+        if isinstance(child, ast.NamedExpr):
+            return "assignment expression"
+
+        if isinstance(child, ast.JoinedStr):
+            return "f-string"
+
+        if not isinstance(child, ast.Name):
+            continue
+
+        if child.id in FRAME_DEPENDENT_NAMES:
+            return "depends on calling frame"
+
+        if child.id == name:
+            return "recursive"
+
+        if child.id in parameters:
+            child_start, child_end = get_node_span(lines, offsets, child)
+            parameters_uses.append((
+                child_start - start,
+                child_end - start,
+                child.id,
+            ))
+        else:
+            free_names.add(child.id)
+
+    return InlinableHelper(
+        object_reference=object_reference,
+        parameters=parameters,
+        expression=text,
+        parameters_uses=parameters_uses,
+        free_names=frozenset(free_names),
+    )
+
+
+def _format_argument(source: str, node: ast.expr) -> str:
+    text = ast.get_source_segment(source, node)
+
+    # Numbers would not take attributes, e.g. '1.real'.
+    if isinstance(node, ast.Constant) and not isinstance(node.value, (str, bytes)):
+        text = f"({text})"
+
+    return text
+
+
+def _bind_arguments(
+    helper: InlinableHelper,
+    source: str,
+    call: ast.Call,
+) -> Optional[Dict[str, str]]:
+    if len(call.args) + len(call.keywords) != len(helper.parameters):
+        return None
+
+    results = dict()
+
+    for parameter, node in zip(helper.parameters, call.args):
+        if isinstance(node, ast.Starred):
+            return None
+        results[parameter] = node
+
+    for keyword in call.keywords:
+        if keyword.arg not in helper.parameters or keyword.arg in results:
+            return None
+        results[keyword.arg] = keyword.value
+
+    if any(not isinstance(x, (ast.Name, ast.Constant)) for x in results.values()):
+        return None
+
+    return {
+        parameter: _format_argument(source, node)
+        for parameter, node in results.items()
+    }
+
+
+def _render_inlined_call(helper: InlinableHelper, arguments: Dict[str, str]) -> str:
+    source = ObjectSource.from_text(helper.expression)
+    return "({})".format(source.render([
+        (start, end, arguments[parameter])
+        for start, end, parameter in helper.parameters_uses
+    ]))
+
+
+def inline_calls(
+    caller_reference: ObjectReference,
+    source: str,
+    names_to_helpers: Dict[str, InlinableHelper],
+    inlining: HelpersInlining,
+) -> str:
+    rebound_names = get_rebound_names(source)
+    lines = source.splitlines(keepends=True)
+    offsets = get_lines_offsets(lines)
+    edits = []
+
+    for node in ast.walk(ast.parse(source)):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)):
+            continue
+
+        helper = names_to_helpers.get(node.func.id)
+        if (
+               helper is None
+            or helper.object_reference == caller_reference
+            or node.func.id in rebound_names
+            or not helper.free_names.isdisjoint(rebound_names)
+        ):
+            continue
+
+        arguments = _bind_arguments(helper, source, node)
+        if arguments is None:
+            continue
+
+        start, end = get_node_span(lines, offsets, node)
+        edits.append((start, end, _render_inlined_call(helper, arguments)))
+
+        key = (caller_reference, helper.object_reference)
+        inlining.inlined_calls[key] = inlining.inlined_calls.get(key, 0) + 1
+
+    if not edits:
+        return source
+
+    return ObjectSource.from_text(source).render(edits)
+
+
+def get_loaded_names(source: str) -> FrozenSet[str]:
+    return frozenset(
+        node.id
+        for node in ast.walk(ast.parse(source))
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+    )
+
+
+def get_global_bound_names(source: str) -> FrozenSet[str]:
+    return load_or_make('global_bound_names', source, _get_global_bound_names)
+
+
+def _get_global_bound_names(source: str) -> FrozenSet[str]:
+    tree = ast.parse(source)
+    results = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Global):
+            results.update(node.names)
+
+    nodes = list(tree.body)
+
+    while nodes:
+        node = nodes.pop()
+
+        if isinstance(node, (FunctionNode, ast.ClassDef)):
+            results.add(node.name)
+            nodes.extend(node.decorator_list)
+            continue
+
+        if isinstance(node, SCOPE_NODES):
+            continue
+
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            results.add(node.id)
+
+        nodes.extend(ast.iter_child_nodes(node))
+
+    return frozenset(results)
+
+
+def _is_rebound_elsewhere(
+    names: Set[str],
+    references_to_sources: Dict[ObjectReference, str],
+    references_to_names: Dict[ObjectReference, str],
+) -> bool:
+    return any(
+        not names.isdisjoint(
+            get_global_bound_names(source) - {references_to_names[reference], }
+        )
+        for reference, source in references_to_sources.items()
+    )
+
+
+def inline_helpers(
+    descriptors: List[ObjectDescriptor],
+    sources: List[str],
+    references_to_names: Dict[ObjectReference, str],
+    inlining: HelpersInlining,
+) -> List[str]:
+    references_to_sources = {
+        x.object_reference: source
+        for x, source in zip(descriptors, sources)
+    }
+    names_to_references = {
+        references_to_names[reference]: reference
+        for reference in references_to_sources
+    }
+    names_to_helpers = dict()
+
+    for reference, source in references_to_sources.items():
+        if reference == inlining.object_reference:
+            continue
+
+        name = references_to_names[reference]
+        result = analyze_helper(reference, name, source, inlining.max_size)
+
+        if result is None:
+            continue
+
+        if isinstance(result, InlinableHelper) and (
+               any(
+                is_declared_global(names_to_references[x])
+                for x in {name, } | result.free_names
+                if x in names_to_references
+            )
+            or _is_rebound_elsewhere(
+                {name, } | result.free_names,
+                references_to_sources,
+                references_to_names,
+            )
+        ):
+            result = "reassigned global"
+
+        if isinstance(result, str):
+            inlining.refused_helpers[reference] = result
+        else:
+            names_to_helpers[name] = result
+
+    if not names_to_helpers:
+        return sources
+
+    for reference, source in references_to_sources.items():
+        references_to_sources[reference] = inline_calls(
+            caller_reference=reference,
+            source=source,
+            names_to_helpers=names_to_helpers,
+            inlining=inlining,
+        )
+
+    inlined_references = {helper for _, helper in inlining.inlined_calls}
+    references_to_loaded_names = {
+        reference: get_loaded_names(source)
+        for reference, source in references_to_sources.items()
+    }
+
+    # Dropping a helper may leave unreferenced helpers it was the only one
+    # to refer to.
+    while True:
+        removed = [
+            reference
+            for reference in references_to_sources
+            if (
+                    reference in inlined_references
+                and not any(
+                        other != reference
+                    and references_to_names[reference] in loaded_names
+                    for other, loaded_names in references_to_loaded_names.items()
+                )
+            )
+        ]
+        if not removed:
+            break
+
+        for reference in removed:
+            del references_to_sources[reference]
+            del references_to_loaded_names[reference]
+            inlining.removed_references.append(reference)
+
+    return list(references_to_sources.values())
+
+
+def make_helpers_inlining(args: argparse.Namespace) -> Optional[HelpersInlining]:
+    if not args.inline_helpers:
+        return None
+
+    return HelpersInlining(max_size=args.inline_max_size)
+
+
+def output_inlining_report(report_path: str, inlining: HelpersInlining) -> None:
+    if report_path == '-':
+        write_inlining_report(sys.stderr, inlining)
+    else:
+        report_path = Path(report_path)
+        report_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with report_path.open('wt') as f:
+            write_inlining_report(f, inlining)
+
+
+def write_inlining_report(
+    output_stream: io.TextIOBase,
+    inlining: HelpersInlining,
+) -> None:
+    json.dump(inlining.to_dict(), output_stream, indent=2)
+    output_stream.write("\n")
+    output_stream.flush()
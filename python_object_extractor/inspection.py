@@ -1,35 +1,68 @@
-import symtable
-
-from types import ModuleType
-from typing import Dict, List
+from typing import Dict, List, Optional, Set
 
+from python_object_extractor.analysis import analyze_source
+from python_object_extractor.boundaries import TraversalBoundaries
+from python_object_extractor.caches import load_or_make
+from python_object_extractor.constants import inline_constants
 from python_object_extractor.descriptors import ObjectDescriptor
 from python_object_extractor.graph import sort_descriptors_topologically
 from python_object_extractor.imports import get_module_imports
-from python_object_extractor.imports import get_object_imports
 from python_object_extractor.imports import group_imports_by_origin
 from python_object_extractor.imports import group_references_by_aliases
 from python_object_extractor.imports import ObjectImport
 from python_object_extractor.imports import ObjectImportsGroupped
-from python_object_extractor.modules import get_module_by_name
+from python_object_extractor.modules import DottedPathKind
+from python_object_extractor.modules import get_importer
+from python_object_extractor.profiling import measure_stage
 from python_object_extractor.references import ObjectReference
+from python_object_extractor.resolution import submit_modules
+from python_object_extractor.shaking import MethodsShaking
+from python_object_extractor.shaking import shake_methods
 from python_object_extractor.sources import get_object_source
 from python_object_extractor.substitutions import substitute_accesses_to_imported_modules
-from python_object_extractor.symbols import contains_import_symbols
-from python_object_extractor.symbols import exclude_import_symbols
-from python_object_extractor.symbols import extract_symbols_from_source
 
 
 def inspect_object_with_children(
     object_reference: ObjectReference,
     project_path: str,
+    boundaries: Optional[TraversalBoundaries] = None,
+    external_references: Optional[Set[ObjectReference]] = None,
+    shaking: Optional[MethodsShaking] = None,
+    constants: Optional[Dict[ObjectReference, str]] = None,
 ) -> List[ObjectDescriptor]:
-    references_to_descriptors = dict()
-    _inspect_object_with_children(
-        object_reference=object_reference,
-        known_objects=references_to_descriptors,
-        project_path=project_path,
-    )
+    if external_references is None:
+        external_references = set()
+
+    while True:
+        references_to_descriptors = dict()
+        external_references.clear()
+
+        if shaking is not None:
+            shaking.reset()
+
+        _inspect_object_with_children(
+            object_reference=object_reference,
+            known_objects=references_to_descriptors,
+            project_path=project_path,
+            boundaries=boundaries,
+            accepted_references={object_reference, },
+            external_references=external_references,
+            shaking=shaking,
+            depth=0,
+        )
+
+        # Methods pruned before code which uses them was seen are restored
+        # by walking again. Used names only grow, so walks do not loop.
+        if shaking is None or not shaking.is_stale():
+            break
+
+    if constants is not None:
+        inline_constants(
+            references_to_descriptors=references_to_descriptors,
+            root_reference=object_reference,
+            constants=constants,
+        )
+
     return sort_descriptors_topologically(references_to_descriptors.values())
 
 
@@ -37,6 +70,11 @@ def _inspect_object_with_children(
     object_reference: ObjectReference,
     known_objects: Dict[ObjectReference, ObjectDescriptor],
     project_path: str,
+    boundaries: Optional[TraversalBoundaries],
+    accepted_references: Set[ObjectReference],
+    external_references: Set[ObjectReference],
+    shaking: Optional[MethodsShaking],
+    depth: int,
 ) -> None:
     if object_reference in known_objects:
         return
@@ -44,44 +82,106 @@ def _inspect_object_with_children(
     descriptor = inspect_object(
         project_path=project_path,
         object_reference=object_reference,
+        shaking=shaking if depth else None,
     )
     known_objects[object_reference] = descriptor
 
-    if descriptor.global_imports and descriptor.global_imports.project:
-        for item in descriptor.global_imports.project:
-            _inspect_object_with_children(
-                object_reference=item.object_reference,
-                known_objects=known_objects,
-                project_path=project_path,
-            )
+    submit_modules(
+        x.object_reference.module_name
+        for imports in [descriptor.local_imports, descriptor.global_imports]
+        if imports
+        for x in imports.third_party or []
+    )
+
+    if shaking is not None:
+        shaking.use_source(str(descriptor.source))
+
+    if not descriptor.global_imports or not descriptor.global_imports.project:
+        return
+
+    if boundaries:
+        _move_external_imports(
+            imports=descriptor.global_imports,
+            boundaries=boundaries,
+            accepted_references=accepted_references,
+            external_references=external_references,
+            depth=depth + 1,
+        )
+
+    for item in descriptor.global_imports.project or []:
+        _inspect_object_with_children(
+            object_reference=item.object_reference,
+            known_objects=known_objects,
+            project_path=project_path,
+            boundaries=boundaries,
+            accepted_references=accepted_references,
+            external_references=external_references,
+            shaking=shaking,
+            depth=depth + 1,
+        )
+
+
+# Decided once per reference, so that an object is never both inlined
+# and left outside.
+def _move_external_imports(
+    imports: ObjectImportsGroupped,
+    boundaries: TraversalBoundaries,
+    accepted_references: Set[ObjectReference],
+    external_references: Set[ObjectReference],
+    depth: int,
+) -> None:
+    project_imports = []
+    external_imports = []
+
+    for item in imports.project:
+        reference = item.object_reference
+
+        if (
+                reference not in accepted_references
+            and reference not in external_references
+        ):
+            if boundaries.is_beyond(reference, depth, len(accepted_references)):
+                external_references.add(reference)
+            else:
+                accepted_references.add(reference)
+
+        if reference in external_references:
+            external_imports.append(item)
+        else:
+            project_imports.append(item)
+
+    if external_imports:
+        imports.project = project_imports or None
+        imports.third_party = (imports.third_party or []) + external_imports
 
 
 def inspect_object(
     project_path: str,
     object_reference: ObjectReference,
+    shaking: Optional[MethodsShaking] = None,
 ) -> ObjectDescriptor:
-    module = get_module_by_name(object_reference.module_name)
-    target = getattr(module, object_reference.object_name)
     source = get_object_source(
-        module,
-        target,
+        object_reference.module_name,
         object_reference.object_name,
     )
-    symbols = extract_symbols_from_source(source)
 
-    if contains_import_symbols(symbols):
+    if shaking is not None:
+        source = shake_methods(object_reference, source, shaking)
+
+    analysis = load_or_make('source_analysis', str(source), analyze_source)
+
+    if analysis.imports:
         local_imports = inspect_local_imports(
-            source=source,
+            imports=analysis.imports,
             project_path=project_path,
         )
-        symbols = exclude_import_symbols(symbols)
     else:
         local_imports = None
 
-    if symbols:
+    if analysis.symbols:
         global_imports = inspect_global_imports(
-            symbols=symbols,
-            module=module,
+            symbols=analysis.symbols,
+            module_name=object_reference.module_name,
             project_path=project_path,
         )
     else:
@@ -98,33 +198,36 @@ def inspect_object(
         local_imports.project = None
 
     if global_imports and global_imports.project:
-        global_imports.project = substitute_accesses_to_imported_modules(
-            source=source,
-            imports=global_imports.project,
-        )
+        with measure_stage('substitutions'):
+            global_imports.project = substitute_accesses_to_imported_modules(
+                source=source,
+                imports=global_imports.project,
+                access_chains=analysis.access_chains,
+            )
 
     return ObjectDescriptor(
         object_reference=object_reference,
         source=source,
+        analysis=analysis,
         local_imports=local_imports,
         global_imports=global_imports,
     )
 
 
 def inspect_local_imports(
-    source: str,
+    imports: List[ObjectImport],
     project_path: str,
 ) -> ObjectImportsGroupped:
-    imports = get_object_imports(source)
     return group_imports_by_origin(imports, project_path)
 
 
 def inspect_global_imports(
-    symbols: List[symtable.Symbol],
-    module: ModuleType,
+    symbols: List[str],
+    module_name: str,
     project_path: str,
 ) -> ObjectImportsGroupped:
-    module_imports = get_module_imports(module)
+    importer = get_importer()
+    module_imports = get_module_imports(module_name)
     aliases_to_references_groupped = group_references_by_aliases([
         (
             x.object_reference,
@@ -136,11 +239,8 @@ def inspect_global_imports(
     for alias, references in aliases_to_references_groupped.items():
         if len(references) > 1:
             for reference in references:
-                try:
-                    get_module_by_name(reference.module_name)
-                except ModuleNotFoundError:
-                    continue
-                else:
+                module_kind = importer.get_module_kind(reference.module_name)
+                if module_kind is not DottedPathKind.MISSING:
                     references[:] = [reference, ]
                     break
 
@@ -151,14 +251,13 @@ def inspect_global_imports(
 
     object_imports = list()
 
-    for symbol in symbols:
-        key = symbol.get_name()
+    for key in symbols:
         item = aliases_to_imports.get(key)
 
         is_sibling = item is None
         if is_sibling:
             reference = ObjectReference(
-                module_name=module.__name__,
+                module_name=module_name,
                 object_name=key,
             )
             item = ObjectImport(
@@ -0,0 +1,193 @@
+import multiprocessing
+import pickle
+import sys
+
+from multiprocessing.connection import Connection
+from typing import Any, Optional
+
+from python_object_extractor.exceptions import PythonObjectExtractorException
+from python_object_extractor.modules import add_project_to_sys_path
+from python_object_extractor.modules import DottedPathKind
+from python_object_extractor.modules import Importer
+from python_object_extractor.modules import ModuleOrigin
+from python_object_extractor.modules import ObjectKind
+from python_object_extractor.profiling import configure_memory_profiler
+from python_object_extractor.profiling import get_memory_profiler
+
+
+class WorkerException(PythonObjectExtractorException):
+
+    def __init__(self, method_name: str, details: str):
+        super().__init__(
+            f"isolated worker failed to execute '{method_name}': {details}"
+        )
+
+
+def get_process_memory() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def _run_worker(
+    connection: Connection,
+    project_path: str,
+    is_profiling: bool,
+) -> None:
+    add_project_to_sys_path(project_path)
+    importer = Importer()
+    profiler = configure_memory_profiler() if is_profiling else None
+
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+
+        if task is None:
+            break
+
+        method_name, args = task
+
+        try:
+            result = getattr(importer, method_name)(*args)
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = WorkerException(method_name, repr(e))
+            is_successful = False
+            result = e
+        else:
+            is_successful = True
+
+        connection.send((
+            is_successful,
+            result,
+            get_process_memory(),
+            profiler.pop_imports() if profiler else [],
+        ))
+
+    connection.close()
+
+
+class IsolatedImporter(Importer):
+
+    def __init__(
+        self,
+        project_path: str,
+        max_tasks: Optional[int] = None,
+        max_memory: Optional[int] = None,
+    ):
+        self.project_path = project_path
+        self.max_tasks = max_tasks
+        self.max_memory = max_memory
+        self.workers_started = 0
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._connection = None
+        self._tasks = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<IsolatedImporter("
+            f"project_path='{self.project_path}', "
+            f"workers_started={self.workers_started})>"
+        )
+
+    def _start_worker(self) -> None:
+        connection, worker_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_run_worker,
+            args=(
+                worker_connection,
+                self.project_path,
+                get_memory_profiler() is not None,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        worker_connection.close()
+        self._connection = connection
+        self._tasks = 0
+        self.workers_started += 1
+
+    def _stop_worker(self) -> None:
+        if self._process is None:
+            return
+
+        try:
+            self._connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+        self._connection.close()
+        self._process = None
+        self._connection = None
+
+    def _call(self, method_name: str, *args: Any) -> Any:
+        if self._process is None:
+            self._start_worker()
+
+        try:
+            self._connection.send((method_name, args))
+            is_successful, result, memory, imports = self._connection.recv()
+        except (EOFError, BrokenPipeError, OSError) as e:
+            self._stop_worker()
+            raise WorkerException(method_name, repr(e)) from e
+
+        profiler = get_memory_profiler()
+        if profiler is not None and imports:
+            profiler.merge_imports(imports)
+
+        self._tasks += 1
+        if (
+               (self.max_tasks is not None and self._tasks >= self.max_tasks)
+            or (self.max_memory is not None and memory >= self.max_memory)
+        ):
+            self._stop_worker()
+
+        if not is_successful:
+            raise result
+
+        return result
+
+    def get_module_source(self, module_name: str) -> str:
+        return self._call('get_module_source', module_name)
+
+    def get_object_kind(self, module_name: str, object_name: str) -> ObjectKind:
+        return self._call('get_object_kind', module_name, object_name)
+
+    def get_object_source(self, module_name: str, object_name: str) -> str:
+        return self._call('get_object_source', module_name, object_name)
+
+    def get_module_origin(
+        self,
+        module_name: str,
+        project_path: str,
+    ) -> Optional[ModuleOrigin]:
+        return self._call('get_module_origin', module_name, project_path)
+
+    def get_module_kind(self, module_name: str) -> DottedPathKind:
+        return self._call('get_module_kind', module_name)
+
+    def get_attribute_kind(self, module_name: str, name: str) -> DottedPathKind:
+        return self._call('get_attribute_kind', module_name, name)
+
+    def get_module_requirement(self, module_name: str) -> Optional[str]:
+        return self._call('get_module_requirement', module_name)
+
+    def get_module_path(self, module_name: str) -> Optional[str]:
+        return self._call('get_module_path', module_name)
+
+    def close(self) -> None:
+        self._stop_worker()
@@ -1,17 +1,204 @@
 import argparse
-import sys
 
 from pathlib import Path
+from typing import Optional, TYPE_CHECKING
 
-from python_object_extractor.collections import merge_sets
-from python_object_extractor.imports import group_imports_by_origin
-from python_object_extractor.imports import resolve_import_conflicts
-from python_object_extractor.inspection import inspect_object_with_children
-from python_object_extractor.output import output
-from python_object_extractor.references import make_name_from_object_reference
-from python_object_extractor.references import ObjectReference
-from python_object_extractor.substitutions import substitute_aliases_of_groupped_imports
-from python_object_extractor.substitutions import substitute_aliases_of_imports
+if TYPE_CHECKING:
+    from python_object_extractor.minification import MinificationReport
+
+
+def add_extraction_arguments(parser: argparse.ArgumentParser) -> None:
+    from python_object_extractor.boundaries import parse_module_prefix
+
+    parser.add_argument(
+        '-p', '--project_path',
+        dest='project_path',
+        type=Path,
+        default='.',
+        help="path to local project directory",
+    )
+    parser.add_argument(
+        '--boundary',
+        dest='boundaries',
+        type=parse_module_prefix,
+        action='append',
+        metavar='PREFIX[=REQUIREMENT]',
+        help=(
+            "prefix of project modules which are not inlined but imported "
+            "and required from distribution, for example, "
+            "'corelib=corelib==1.2.0'. Can be given many times"
+        ),
+    )
+    parser.add_argument(
+        '--max_depth',
+        dest='max_depth',
+        type=int,
+        default=None,
+        help=(
+            "maximal depth of project objects to inline. Deeper objects are "
+            "imported and required from project distribution"
+        ),
+    )
+    parser.add_argument(
+        '--max_objects',
+        dest='max_objects',
+        type=int,
+        default=None,
+        help=(
+            "maximal number of project objects to inline per target. "
+            "Remaining objects are imported and required from project "
+            "distribution"
+        ),
+    )
+    parser.add_argument(
+        '--project_requirement',
+        dest='project_requirement',
+        type=str,
+        default=None,
+        help=(
+            "requirement of project distribution, for example, "
+            "'project==2.0.1', to pin objects left outside of boundaries to "
+            "if their modules prefixes do not set requirements. Required "
+            "with '--max_depth', '--max_objects' and boundaries without "
+            "requirements"
+        ),
+    )
+    parser.add_argument(
+        '--shake_methods',
+        dest='shake_methods',
+        action='store_true',
+        help=(
+            "leave out methods of extracted classes which extracted code "
+            "never accesses as attributes, and dependencies only they use. "
+            "Special methods and methods with decorators other than "
+            "'property', 'staticmethod' and 'classmethod' are always kept"
+        ),
+    )
+    parser.add_argument(
+        '--keep_method',
+        dest='kept_methods',
+        type=str,
+        action='append',
+        metavar='[CLASS.]METHOD',
+        help=(
+            "name of method to keep when shaking methods, e.g. of a method "
+            "accessed with 'getattr' by computed name. Can be given many "
+            "times"
+        ),
+    )
+    parser.add_argument(
+        '--inline_constants',
+        dest='inline_constants',
+        action='store_true',
+        help=(
+            "put values of project constants bound to immutable literals, "
+            "e.g. to numbers, strings, tuples or frozensets, where they are "
+            "used instead of extracting them. Constants rebound or mentioned "
+            "in strings anywhere in extracted code, or declared global in "
+            "their modules are kept"
+        ),
+    )
+    parser.add_argument(
+        '--inline_helpers',
+        dest='inline_helpers',
+        action='store_true',
+        help=(
+            "put expressions which small project functions return in place "
+            "of their calls whose arguments are names or constants, and "
+            "leave out functions which are not referenced anymore"
+        ),
+    )
+    parser.add_argument(
+        '--inline_max_size',
+        dest='inline_max_size',
+        type=int,
+        default=80,
+        help="maximum length of expression of function to inline",
+    )
+    parser.add_argument(
+        '--minify',
+        dest='minify',
+        action='store_true',
+        help=(
+            "strip docstrings, comments and blank lines from output modules. "
+            "Docstrings are kept if extracted code reads '__doc__'"
+        ),
+    )
+    parser.add_argument(
+        '--keep_docstrings',
+        dest='keep_docstrings',
+        action='store_true',
+        help="keep docstrings when minifying output modules",
+    )
+    parser.add_argument(
+        '--strip_annotations',
+        dest='strip_annotations',
+        action='store_true',
+        help=(
+            "strip annotations of functions and local variables when "
+            "minifying output modules"
+        ),
+    )
+    parser.add_argument(
+        '--runtime_profile',
+        dest='runtime_profile',
+        type=str,
+        default=None,
+        help=(
+            "path to file listing distributions which target runtime "
+            "provides, one 'name==version' per line, or name of such file "
+            "in '$XDG_CONFIG_HOME/python-object-extractor/runtimes' without "
+            "'.txt' suffix. Provided requirements are left out of output "
+            "requirements and of bundles, and reported together with "
+            "version mismatches"
+        ),
+    )
+    parser.add_argument(
+        '--dependents_index_path',
+        dest='dependents_index_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to JSON index of project modules and objects which "
+            "extracted targets include. It is updated after extraction and "
+            "queried with 'python-object-extractor-dependents'"
+        ),
+    )
+    parser.add_argument(
+        '--project_index_path',
+        dest='project_index_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to project index built by 'python-object-extractor-index'. "
+            "Project modules which did not change since they were indexed "
+            "are neither parsed nor imported"
+        ),
+    )
+
+
+def check_extraction_arguments(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+) -> None:
+    if args.project_requirement:
+        return
+
+    # Objects left outside of boundaries without requirements would be
+    # imported by output, while nothing would require them.
+    for name in ['max_depth', 'max_objects', ]:
+        if getattr(args, name) is not None:
+            parser.error(
+                f"argument --{name}: requires argument --project_requirement"
+            )
+
+    for prefix, requirement in args.boundaries or ():
+        if not requirement:
+            parser.error(
+                f"argument --boundary: '{prefix}' has no requirement, give "
+                f"it as '{prefix}=REQUIREMENT' or give argument "
+                f"--project_requirement"
+            )
 
 
 def load_args() -> argparse.Namespace:
@@ -29,13 +216,7 @@ def load_args() -> argparse.Namespace:
             "Example: 'importable.module:object'"
         ),
     )
-    parser.add_argument(
-        '-p', '--project_path',
-        dest='project_path',
-        type=Path,
-        default='.',
-        help="path to local project directory",
-    )
+    add_extraction_arguments(parser)
     parser.add_argument(
         '-m', '--output_module_path',
         dest='output_module_path',
@@ -67,58 +248,400 @@ def load_args() -> argparse.Namespace:
             "'object' for object reference 'importable.module:object'"
         ),
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--output_package_path',
+        dest='output_package_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to directory to output package to instead of module. "
+            "Objects are grouped into submodules by their modules, and the "
+            "package loads submodules only when their objects are accessed"
+        ),
+    )
+    parser.add_argument(
+        '--dry_run', '--estimate',
+        dest='dry_run',
+        action='store_true',
+        help=(
+            "only discover dependencies of object and print JSON summary "
+            "with number of objects, requirements and estimated size of "
+            "output module to STDOUT. Nothing is written"
+        ),
+    )
+    parser.add_argument(
+        '--inlining_report_path',
+        dest='inlining_report_path',
+        type=str,
+        default='-',
+        help=(
+            "path to output JSON report on inlined calls, functions left out "
+            "and functions refused to be inlined. Use '-' to output to STDERR"
+        ),
+    )
+    parser.add_argument(
+        '--minification_report_path',
+        dest='minification_report_path',
+        type=str,
+        default='-',
+        help=(
+            "path to output JSON file with bytes and compile time saved by "
+            "minification. Use '-' to output to STDERR"
+        ),
+    )
+    parser.add_argument(
+        '--runtime_report_path',
+        dest='runtime_report_path',
+        type=str,
+        default='-',
+        help=(
+            "path to output JSON report on requirements provided by runtime "
+            "and on versions it provides which differ from required ones. "
+            "Use '-' to output to STDERR"
+        ),
+    )
+    parser.add_argument(
+        '--bundle_path',
+        dest='bundle_path',
+        type=str,
+        default=None,
+        help=(
+            "path to output deployable bundle with extracted module and its "
+            "installed requirements. Bundle is a zip archive if the path "
+            "ends with '.zip' and a directory otherwise"
+        ),
+    )
+    parser.add_argument(
+        '--wheelhouse_path',
+        dest='wheelhouse_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to local directory with wheels to install requirements of "
+            "bundle from. By default they are copied from current "
+            "environment"
+        ),
+    )
+    parser.add_argument(
+        '--bundle_prune',
+        dest='bundle_prune',
+        action='store_true',
+        help="skip tests and bytecode of requirements installed into bundle",
+    )
+    parser.add_argument(
+        '--bundle_cache_path',
+        dest='bundle_cache_path',
+        type=Path,
+        default=None,
+        help=(
+            "path to directory where installations of identical requirements "
+            "are cached. Defaults to a directory in user's cache"
+        ),
+    )
+    parser.add_argument(
+        '--isolate',
+        dest='isolate',
+        action='store_true',
+        help=(
+            "import project modules in a worker subprocess instead of the "
+            "current process"
+        ),
+    )
+    parser.add_argument(
+        '--worker_max_tasks',
+        dest='worker_max_tasks',
+        type=int,
+        default=None,
+        help=(
+            "number of tasks after which an isolated worker is replaced "
+            "with a fresh one"
+        ),
+    )
+    parser.add_argument(
+        '--worker_max_memory',
+        dest='worker_max_memory',
+        type=int,
+        default=None,
+        help=(
+            "peak memory usage in megabytes after which an isolated worker "
+            "is replaced with a fresh one"
+        ),
+    )
+    parser.add_argument(
+        '--cache_max_entries',
+        dest='cache_max_entries',
+        type=int,
+        default=None,
+        help=(
+            "maximum number of entries kept by each session cache. "
+            "Least recently used entries are evicted first"
+        ),
+    )
+    parser.add_argument(
+        '--cache_max_size',
+        dest='cache_max_size',
+        type=int,
+        default=None,
+        help=(
+            "maximum approximate size in bytes of values kept by each "
+            "session cache"
+        ),
+    )
+    parser.add_argument(
+        '--cache_stats_path',
+        dest='cache_stats_path',
+        type=str,
+        default=None,
+        help=(
+            "path to output JSON file with sizes, hits and evictions of "
+            "session caches. Use '-' to output to STDERR"
+        ),
+    )
+    parser.add_argument(
+        '--memory_profile_path',
+        dest='memory_profile_path',
+        type=str,
+        default=None,
+        help=(
+            "path to output JSON file with peak and retained memory "
+            "allocations of pipeline stages and of imported modules, traced "
+            "with 'tracemalloc'. Use '-' to output to STDERR"
+        ),
+    )
+    parser.add_argument(
+        '--memory_profile_top',
+        dest='memory_profile_top',
+        type=int,
+        default=20,
+        help=(
+            "number of imported modules and of source files which allocated "
+            "most memory to list in memory profile"
+        ),
+    )
+    args = parser.parse_args()
+    check_extraction_arguments(parser, args)
+
+    if args.output_package_path and args.bundle_path:
+        parser.error(
+            "argument --output_package_path: not allowed with argument "
+            "--bundle_path"
+        )
+
+    if args.output_package_path and args.inline_helpers:
+        parser.error(
+            "argument --output_package_path: not allowed with argument "
+            "--inline_helpers"
+        )
+
+    return args
 
 
 def main() -> None:
     args = load_args()
-    project_path = str(args.project_path.absolute())
 
-    if project_path not in sys.path:
-        sys.path.insert(0, project_path)
+    if args.memory_profile_path:
+        from python_object_extractor.profiling import configure_memory_profiler
 
-    module_name, object_name = args.object_reference.split(':')
-    output_object_name = args.output_object_name or object_name
-    object_reference = ObjectReference(
-        module_name=module_name,
-        object_name=object_name,
+        # Tracing starts before pipeline stages are imported, so that their
+        # own imports are accounted for.
+        configure_memory_profiler()
+
+    # Pipeline stages are imported only after arguments are parsed, so that
+    # '--help' and usage errors do not pay for loading them.
+    from python_object_extractor.caches import configure_caches
+    from python_object_extractor.modules import add_project_to_sys_path
+    from python_object_extractor.modules import get_importer
+    from python_object_extractor.modules import set_importer
+    from python_object_extractor.output import output_caches_stats
+    from python_object_extractor.output import output_minification_report
+    from python_object_extractor.resolution import close_requirements_resolver
+    from python_object_extractor.resolution import configure_requirements_resolver
+
+    configure_caches(
+        max_entries=args.cache_max_entries,
+        max_size=args.cache_max_size,
     )
-    descriptors = inspect_object_with_children(
-        object_reference=object_reference,
+    project_path = add_project_to_sys_path(args.project_path)
+
+    if args.isolate:
+        from python_object_extractor.isolation import IsolatedImporter
+
+        set_importer(IsolatedImporter(
+            project_path=project_path,
+            max_tasks=args.worker_max_tasks,
+            max_memory=(
+                args.worker_max_memory * 1024 * 1024
+                if args.worker_max_memory
+                else None
+            ),
+        ))
+
+    if args.project_index_path:
+        from python_object_extractor.project_index import IndexedImporter
+        from python_object_extractor.project_index import load_project_index
+
+        project_index = load_project_index(args.project_index_path)
+        if project_index is not None:
+            set_importer(IndexedImporter(project_index, get_importer()))
+
+    # Distributions of third-party modules are looked up while the rest of
+    # extraction runs.
+    configure_requirements_resolver()
+
+    try:
+        if args.dry_run:
+            estimate(args, project_path)
+            minification_report = None
+        else:
+            minification_report = extract(args, project_path)
+    finally:
+        close_requirements_resolver()
+        get_importer().close()
+
+    if minification_report:
+        output_minification_report(
+            args.minification_report_path,
+            minification_report,
+        )
+
+    if args.cache_stats_path:
+        output_caches_stats(args.cache_stats_path)
+
+    if args.memory_profile_path:
+        from python_object_extractor.profiling import output_memory_profile
+
+        output_memory_profile(
+            args.memory_profile_path,
+            args.memory_profile_top,
+        )
+
+
+def estimate(args: argparse.Namespace, project_path: str) -> None:
+    import json
+    import sys
+
+    from python_object_extractor.boundaries import make_traversal_boundaries
+    from python_object_extractor.extraction import estimate_object
+    from python_object_extractor.references import parse_object_reference
+    from python_object_extractor.shaking import make_methods_shaking
+
+    result = estimate_object(
+        object_reference=parse_object_reference(args.object_reference),
         project_path=project_path,
+        boundaries=make_traversal_boundaries(args),
+        shaking=make_methods_shaking(args),
+        constants=dict() if args.inline_constants else None,
+    )
+    json.dump(result.to_dict(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def extract(
+    args: argparse.Namespace,
+    project_path: str,
+) -> Optional['MinificationReport']:
+    from python_object_extractor.boundaries import make_traversal_boundaries
+    from python_object_extractor.extraction import extract_object
+    from python_object_extractor.inlining import make_helpers_inlining
+    from python_object_extractor.minification import MinificationOptions
+    from python_object_extractor.output import output
+    from python_object_extractor.profiling import measure_stage
+    from python_object_extractor.references import parse_object_reference
+    from python_object_extractor.shaking import make_methods_shaking
+
+    minification = (
+        MinificationOptions(
+            strip_docstrings=not args.keep_docstrings,
+            strip_annotations=args.strip_annotations,
+        )
+        if args.minify
+        else None
     )
-    project_references_to_aliases = {
-        x.object_reference: make_name_from_object_reference(x.object_reference)
-        for x in descriptors
-    }
-    imports = merge_sets([x.gather_imports() for x in descriptors])
-    imports = resolve_import_conflicts(imports)
-    imports = substitute_aliases_of_imports(imports, project_references_to_aliases)
-
-    all_references_to_aliases = {
-        x.object_reference: x.alias or x.object_reference.object_name
-        for x in imports
-    }
-    all_references_to_aliases[object_reference] = output_object_name
-
-    substitute_aliases_of_groupped_imports(
-        groupped_imports=[
-            x.global_imports
-            for x in descriptors
-            if x.global_imports
-        ],
-        references_to_aliases=all_references_to_aliases,
-    )
-
-    imports = group_imports_by_origin(imports, project_path)
-
-    output(
-        module_path=args.output_module_path,
-        requirements_path=args.output_requirements_path,
-        descriptors=descriptors,
-        imports=imports,
-        references_to_aliases=all_references_to_aliases,
+    inlining = make_helpers_inlining(args)
+    extraction = extract_object(
+        object_reference=parse_object_reference(args.object_reference),
+        project_path=project_path,
+        output_object_name=args.output_object_name,
+        minification=minification,
+        boundaries=make_traversal_boundaries(args),
+        split_package=bool(args.output_package_path),
+        shaking=make_methods_shaking(args),
+        constants=dict() if args.inline_constants else None,
+        inlining=inlining,
     )
+    module_source = extraction.module_source
+    requirements = extraction.requirements
+    provided = []
+
+    if inlining is not None:
+        from python_object_extractor.inlining import output_inlining_report
+
+        output_inlining_report(args.inlining_report_path, inlining)
+
+    if args.runtime_profile:
+        from python_object_extractor.runtimes import apply_runtime_profile
+        from python_object_extractor.runtimes import load_runtime_profile
+        from python_object_extractor.runtimes import output_runtime_report
+
+        runtime_profile = load_runtime_profile(args.runtime_profile)
+        runtime_requirements = apply_runtime_profile(requirements, runtime_profile)
+        requirements = runtime_requirements.requirements
+        provided = runtime_profile.get_provided_names()
+        output_runtime_report(args.runtime_report_path, runtime_requirements)
+
+    with measure_stage('output'):
+        if args.output_package_path:
+            from python_object_extractor.output import output_requirements_file
+            from python_object_extractor.packages import output_package
+
+            output_package(args.output_package_path, extraction.package_sources)
+            output_requirements_file(args.output_requirements_path, requirements)
+        else:
+            output(
+                module_path=args.output_module_path,
+                requirements_path=args.output_requirements_path,
+                module_source=module_source,
+                requirements=requirements,
+            )
+
+    if args.dependents_index_path:
+        from python_object_extractor.dependents import load_dependents_index
+        from python_object_extractor.dependents import make_target_record
+        from python_object_extractor.dependents import save_dependents_index
+
+        index = load_dependents_index(args.dependents_index_path)
+        index.update_target(
+            args.object_reference,
+            make_target_record(extraction.descriptors, project_path),
+        )
+        save_dependents_index(index, args.dependents_index_path)
+
+    if args.bundle_path:
+        from python_object_extractor.bundles import DistributionsFinder
+        from python_object_extractor.bundles import get_default_cache_path
+        from python_object_extractor.bundles import install_requirements
+        from python_object_extractor.bundles import output_bundle
+
+        staging_path = install_requirements(
+            requirements=requirements,
+            finder=DistributionsFinder(args.wheelhouse_path),
+            cache_path=args.bundle_cache_path or get_default_cache_path(),
+            prune=args.bundle_prune,
+            provided=provided,
+        )
+        output_bundle(
+            bundle_path=args.bundle_path,
+            staging_path=staging_path,
+            module_name=(
+                Path(args.output_module_path).name
+                if args.output_module_path != '-'
+                else 'main.py'
+            ),
+            module_source=module_source,
+        )
+
+    return extraction.minification_report
 
 
 if __name__ == '__main__':
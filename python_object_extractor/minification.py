@@ -0,0 +1,310 @@
+import ast
+import io
+import time
+import tokenize
+
+from typing import Dict, Iterable, List, Tuple
+
+from python_object_extractor.exceptions import PythonObjectExtractorException
+from python_object_extractor.sources import get_lines_offsets
+from python_object_extractor.sources import get_node_span
+from python_object_extractor.sources import get_offset
+
+
+class MinificationFailed(PythonObjectExtractorException):
+
+    def __init__(self, details: str):
+        super().__init__(f"minified module is not valid: {details}")
+
+
+class MinificationOptions:
+    __slots__ = ['strip_docstrings', 'strip_annotations', ]
+
+    def __init__(
+        self,
+        strip_docstrings: bool = True,
+        strip_annotations: bool = False,
+    ):
+        self.strip_docstrings = strip_docstrings
+        self.strip_annotations = strip_annotations
+
+    def __repr__(self) -> str:
+        return (
+            f"<MinificationOptions("
+            f"strip_docstrings={self.strip_docstrings}, "
+            f"strip_annotations={self.strip_annotations})>"
+        )
+
+
+class MinificationReport:
+    __slots__ = [
+        'original_size',
+        'minified_size',
+        'original_compile_time',
+        'minified_compile_time',
+        'docstrings_kept',
+    ]
+
+    def __init__(
+        self,
+        original_size: int,
+        minified_size: int,
+        original_compile_time: float,
+        minified_compile_time: float,
+        docstrings_kept: bool,
+    ):
+        self.original_size = original_size
+        self.minified_size = minified_size
+        self.original_compile_time = original_compile_time
+        self.minified_compile_time = minified_compile_time
+        self.docstrings_kept = docstrings_kept
+
+    def __repr__(self) -> str:
+        return (
+            f"<MinificationReport("
+            f"bytes_saved={self.original_size - self.minified_size})>"
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'original_size': self.original_size,
+            'minified_size': self.minified_size,
+            'bytes_saved': self.original_size - self.minified_size,
+            'original_compile_time': self.original_compile_time,
+            'minified_compile_time': self.minified_compile_time,
+            'compile_time_saved': (
+                self.original_compile_time - self.minified_compile_time
+            ),
+            'docstrings_kept': self.docstrings_kept,
+        }
+
+
+def uses_docstrings(sources: Iterable[str]) -> bool:
+    for source in sources:
+        if '__doc__' not in source:
+            continue
+
+        for node in ast.walk(ast.parse(source)):
+            if (
+                   (isinstance(node, ast.Attribute) and node.attr == '__doc__')
+                or (isinstance(node, ast.Name) and node.id == '__doc__')
+            ):
+                return True
+
+    return False
+
+
+# Annotations of module and class attributes are kept, since tools like
+# dataclasses read them at runtime.
+def minify_source(source: str, options: MinificationOptions) -> str:
+    lines = source.splitlines(keepends=True)
+    offsets = get_lines_offsets(lines)
+    replacements = []
+
+    tree = ast.parse(source)
+
+    if options.strip_docstrings:
+        replacements.extend(_get_docstrings_replacements(tree, lines, offsets))
+
+    if options.strip_annotations:
+        replacements.extend(_get_annotations_replacements(tree, source, lines, offsets))
+
+    for start, end, replacement in sorted(replacements, reverse=True):
+        source = source[:start] + replacement + source[end:]
+
+    source = _strip_comments_and_blank_lines(source)
+
+    try:
+        compile(source, "<minified>", "exec")
+    except SyntaxError as e:
+        raise MinificationFailed(str(e))
+
+    return source
+
+
+def _get_docstrings_replacements(
+    tree: ast.AST,
+    lines: List[str],
+    offsets: List[int],
+) -> List[Tuple[int, int, str]]:
+    source = "".join(lines)
+    results = []
+
+    for node in ast.walk(tree):
+        if not isinstance(node, (
+            ast.Module,
+            ast.ClassDef,
+            ast.FunctionDef,
+            ast.AsyncFunctionDef,
+        )):
+            continue
+
+        if not node.body:
+            continue
+
+        docstring = node.body[0]
+        if not (
+                isinstance(docstring, ast.Expr)
+            and isinstance(docstring.value, ast.Constant)
+            and isinstance(docstring.value.value, str)
+        ):
+            continue
+
+        start, end = get_node_span(lines, offsets, docstring)
+
+        if len(node.body) == 1:
+            results.append((start, end, "pass"))
+            continue
+
+        # Semicolon after docstring goes away with it, as well as the space
+        # before a statement sharing its line.
+        following = node.body[1]
+        if following.lineno == docstring.end_lineno:
+            end = get_offset(lines, offsets, following.lineno, following.col_offset)
+        else:
+            rest = source[end:offsets[docstring.end_lineno]]
+            if rest.lstrip(" \t").startswith(";"):
+                end += rest.index(";") + 1
+
+        results.append((start, end, ""))
+
+    return results
+
+
+def _get_annotations_replacements(
+    tree: ast.AST,
+    source: str,
+    lines: List[str],
+    offsets: List[int],
+) -> List[Tuple[int, int, str]]:
+    results = []
+
+    def get_span(node: ast.AST) -> Tuple[int, int]:
+        return get_node_span(lines, offsets, node)
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            args = node.args
+            for arg in [
+                *getattr(args, 'posonlyargs', []),
+                *args.args,
+                args.vararg,
+                *args.kwonlyargs,
+                args.kwarg,
+            ]:
+                if arg is None or arg.annotation is None:
+                    continue
+
+                start, _ = get_span(arg)
+                _, end = get_span(arg.annotation)
+                results.append((start + len(arg.arg), end, ""))
+
+            if node.returns is not None:
+                start, end = get_span(node.returns)
+                start = source.rindex('->', 0, start)
+                start = len(source[:start].rstrip())
+                results.append((start, end, ""))
+
+            for child in _iter_local_statements(node.body):
+                if (
+                        isinstance(child, ast.AnnAssign)
+                    and child.value is not None
+                    and child.simple
+                ):
+                    start, _ = get_span(child.target)
+                    _, end = get_span(child.value)
+                    value_start, _ = get_span(child.value)
+                    target = source[start:start + len(child.target.id)]
+                    value = source[value_start:end]
+                    results.append((start, end, f"{target} = {value}"))
+
+    return results
+
+
+def _iter_local_statements(body: List[ast.stmt]) -> Iterable[ast.stmt]:
+    for node in body:
+        yield node
+
+        if isinstance(node, (
+            ast.FunctionDef,
+            ast.AsyncFunctionDef,
+            ast.ClassDef,
+        )):
+            continue
+
+        for field in ['body', 'orelse', 'finalbody', ]:
+            yield from _iter_local_statements(getattr(node, field, None) or [])
+
+        for handler in getattr(node, 'handlers', None) or []:
+            yield from _iter_local_statements(handler.body)
+
+
+def _strip_comments_and_blank_lines(source: str) -> str:
+    lines = source.splitlines(keepends=True)
+    code_lines = set()
+    comments = dict()
+
+    tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+    for token in tokens:
+        if token.type == tokenize.COMMENT:
+            comments[token.start[0]] = token.start[1]
+        elif token.type not in (
+            tokenize.NL,
+            tokenize.NEWLINE,
+            tokenize.INDENT,
+            tokenize.DEDENT,
+            tokenize.ENDMARKER,
+        ):
+            code_lines.update(range(token.start[0], token.end[0] + 1))
+
+    results = []
+
+    for lineno, line in enumerate(lines, start=1):
+        if lineno not in code_lines:
+            continue
+
+        column = comments.get(lineno)
+        if column is not None:
+            line = line[:column].rstrip() + "\n"
+
+        results.append(line)
+
+    return "".join(results)
+
+
+def measure_compile_time(source: str, repeat: int = 5) -> float:
+    results = []
+
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        compile(source, "<extracted>", "exec")
+        results.append(time.perf_counter() - started_at)
+
+    return min(results)
+
+
+def make_minification_report(
+    original_source: str,
+    minified_source: str,
+    docstrings_kept: bool,
+) -> MinificationReport:
+    return MinificationReport(
+        original_size=len(original_source.encode()),
+        minified_size=len(minified_source.encode()),
+        original_compile_time=measure_compile_time(original_source),
+        minified_compile_time=measure_compile_time(minified_source),
+        docstrings_kept=docstrings_kept,
+    )
+
+
+def merge_minification_reports(
+    reports: Iterable[MinificationReport],
+) -> MinificationReport:
+    reports = list(reports)
+    return MinificationReport(
+        original_size=sum(x.original_size for x in reports),
+        minified_size=sum(x.minified_size for x in reports),
+        original_compile_time=sum(x.original_compile_time for x in reports),
+        minified_compile_time=sum(x.minified_compile_time for x in reports),
+        docstrings_kept=any(x.docstrings_kept for x in reports),
+    )
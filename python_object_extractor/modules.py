@@ -1,46 +1,216 @@
+import enum
+import functools
+import importlib.machinery
+import inspect
 import os
 import sys
+import sysconfig
 
-from distutils import sysconfig
 from importlib import import_module
+from pathlib import Path
 from types import ModuleType
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
 
-from pip._internal.commands.show import search_packages_info
-from pip._internal.utils.misc import get_installed_distributions
-from pip._vendor.pkg_resources import Requirement
+from python_object_extractor.caches import get_cache
+from python_object_extractor.profiling import measure_import
 
+if TYPE_CHECKING:
+    from python_object_extractor.imports import ObjectImport
+    from python_object_extractor.sources import ModuleDefinitions
 
-PYTHON_ROOT_DIR = sysconfig.get_python_lib(standard_lib=True)
-THIRD_PARTY_PACKAGES_ROOT_DIR = sysconfig.get_python_lib(standard_lib=False)
+
+def add_project_to_sys_path(project_path: Path) -> str:
+    project_path = str(Path(project_path).absolute())
+
+    if project_path not in sys.path:
+        sys.path.insert(0, project_path)
+
+    return project_path
 
 
 def get_module_by_name(module_name: str) -> ModuleType:
     module = sys.modules.get(module_name)
 
     if module is None:
-        module = import_module(module_name)
+        with measure_import(module_name):
+            module = import_module(module_name)
 
     return module
 
 
+class ModuleOrigin(enum.Enum):
+    STDLIB = 'stdlib'
+    THIRD_PARTY = 'third_party'
+    PROJECT = 'project'
+
+
+class ObjectKind(enum.Enum):
+    MODULE = 'module'
+    CLASS_OR_ROUTINE = 'class_or_routine'
+    OTHER = 'other'
+
+
+class DottedPathKind(enum.Enum):
+    MODULE = 'module'
+    ATTRIBUTE = 'attribute'
+    MISSING = 'missing'
+
+
+class DottedPathNode:
+    __slots__ = ['path', 'kind', 'children', ]
+
+    def __init__(
+        self,
+        path: str,
+        kind: DottedPathKind,
+    ):
+        self.path = path
+        self.kind = kind
+        self.children = dict()
+
+    def __repr__(self) -> str:
+        return (
+            f"<DottedPathNode("
+            f"path='{self.path}', "
+            f"kind={self.kind.value})>"
+        )
+
+    def _make_child_path(self, name: str) -> str:
+        return f"{self.path}.{name}"
+
+    def get_child(self, name: str) -> 'DottedPathNode':
+        child = self.children.get(name)
+
+        if child is None:
+            path = self._make_child_path(name)
+            child = DottedPathNode(path, self._resolve_child_kind(name, path))
+            _add_dotted_path_child(self, name, child)
+
+        if child.kind is DottedPathKind.MISSING:
+            raise ModuleNotFoundError(f"No module named '{child.path}'")
+
+        return child
+
+    def get_submodule(self, name: str) -> 'DottedPathNode':
+        child = self.children.get(name)
+
+        if child is None:
+            path = self._make_child_path(name)
+            child = DottedPathNode(path, _resolve_module_kind(path))
+            _add_dotted_path_child(self, name, child)
+
+        if child.kind is DottedPathKind.MISSING:
+            raise ModuleNotFoundError(f"No module named '{child.path}'")
+
+        return child
+
+    def _resolve_child_kind(self, name: str, path: str) -> DottedPathKind:
+        return get_importer().get_attribute_kind(self.path, name)
+
+
+def _resolve_module_kind(module_name: str) -> DottedPathKind:
+    return get_importer().get_module_kind(module_name)
+
+
+def _get_dotted_path_node_size(node: DottedPathNode) -> int:
+    return sys.getsizeof(node) + sys.getsizeof(node.children) + sum(
+        _get_dotted_path_node_size(x)
+        for x in node.children.values()
+    )
+
+
+__dotted_paths = get_cache(
+    name='dotted_paths',
+    get_size=_get_dotted_path_node_size,
+)
+
+
+def _add_dotted_path_child(
+    parent: DottedPathNode,
+    name: str,
+    child: DottedPathNode,
+) -> None:
+    previous_size = sys.getsizeof(parent.children)
+    parent.children[name] = child
+    __dotted_paths.grow(
+        parent.path.partition('.')[0],
+          sys.getsizeof(parent.children)
+        - previous_size
+        + _get_dotted_path_node_size(child),
+    )
+
+
+# Cached per top-level package, so that eviction drops whole subtrees.
+def get_dotted_path_node(module_name: str) -> DottedPathNode:
+    top_level_name, *names = module_name.split('.')
+    node = __dotted_paths.get(top_level_name)
+
+    if node is None:
+        node = DottedPathNode(
+            top_level_name,
+            _resolve_module_kind(top_level_name),
+        )
+        __dotted_paths.set(top_level_name, node)
+
+    if node.kind is DottedPathKind.MISSING:
+        raise ModuleNotFoundError(f"No module named '{node.path}'")
+
+    for name in names:
+        node = node.get_submodule(name)
+
+    return node
+
+
+# Directories of interpreter are a few paths fixed for the session, so they
+# are kept out of caches bounded by budget.
+@functools.lru_cache(maxsize=None)
+def get_stdlib_dirs() -> Tuple[str, ...]:
+    paths = sysconfig.get_paths()
+    return _get_unique_real_paths([
+        paths['stdlib'],
+        paths['platstdlib'],
+    ])
+
+
+@functools.lru_cache(maxsize=None)
+def get_third_party_packages_dirs() -> Tuple[str, ...]:
+    paths = sysconfig.get_paths()
+    return _get_unique_real_paths([
+        paths['purelib'],
+        paths['platlib'],
+    ])
+
+
+def _get_unique_real_paths(paths: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted({os.path.realpath(x) for x in paths}))
+
+
+def _is_path_in_dirs(path: str, dirs: Tuple[str, ...]) -> bool:
+    return any(
+        path == x or path.startswith(x + os.sep)
+        for x in dirs
+    )
+
+
 def is_builtin_module(module: ModuleType) -> bool:
     return module.__name__ in sys.builtin_module_names
 
 
 def is_stdlib_module(module: ModuleType) -> bool:
+    if is_builtin_module(module):
+        return True
+
+    path = os.path.realpath(module.__file__)
     return (
-           is_builtin_module(module)
-        or os.path.realpath(module.__file__).startswith(PYTHON_ROOT_DIR)
+            _is_path_in_dirs(path, get_stdlib_dirs())
+        and not _is_path_in_dirs(path, get_third_party_packages_dirs())
     )
 
 
 def is_third_party_module(module: ModuleType) -> bool:
-    return (
-        os
-        .path
-        .realpath(module.__file__)
-        .startswith(THIRD_PARTY_PACKAGES_ROOT_DIR)
+    return _is_path_in_dirs(
+        os.path.realpath(module.__file__),
+        get_third_party_packages_dirs(),
     )
 
 
@@ -48,22 +218,181 @@ def is_project_module(module: ModuleType, project_path: str) -> bool:
     return os.path.realpath(module.__file__).startswith(project_path)
 
 
-def get_module_requirement(module: ModuleType) -> Optional[Requirement]:
-    module_relative_location = os.path.relpath(
-        module.__file__,
-        THIRD_PARTY_PACKAGES_ROOT_DIR,
-    )
+# Built once from metadata of all installed distributions, which is costly,
+# so it is kept out of caches bounded by budget like directories above.
+@functools.lru_cache(maxsize=None)
+def get_sources_to_requirements() -> Dict[str, str]:
+    from importlib import metadata
+
+    results = dict()
+    locations = dict()
+
+    for distribution in metadata.distributions():
+        requirement = "{}=={}".format(
+            distribution.metadata['Name'],
+            distribution.version,
+        )
+        location = str(distribution.locate_file(''))
+        if location not in locations:
+            locations[location] = os.path.realpath(location)
+        location = locations[location]
+
+        for item in distribution.files or []:
+            if item.suffix != '.py':
+                continue
+
+            path = os.path.normpath(os.path.join(location, item))
+            results.setdefault(path, requirement)
+
+    return results
+
+
+def get_module_requirement(module: ModuleType) -> Optional[str]:
+    module_location = os.path.realpath(module.__file__)
+    return get_sources_to_requirements().get(module_location)
+
+
+def get_path_origin(path: str, project_path: str) -> Optional[ModuleOrigin]:
+    path = os.path.realpath(path)
+
+    if (
+            _is_path_in_dirs(path, get_stdlib_dirs())
+        and not _is_path_in_dirs(path, get_third_party_packages_dirs())
+    ):
+        return ModuleOrigin.STDLIB
+    if _is_path_in_dirs(path, get_third_party_packages_dirs()):
+        return ModuleOrigin.THIRD_PARTY
+    if path.startswith(project_path):
+        return ModuleOrigin.PROJECT
+
+
+def find_module_origin(
+    module_name: str,
+    project_path: str,
+) -> Optional[ModuleOrigin]:
+    top_level_name = module_name.split('.', 1)[0]
+
+    if top_level_name in sys.builtin_module_names:
+        return ModuleOrigin.STDLIB
+
+    spec = importlib.machinery.PathFinder.find_spec(top_level_name)
+    if spec is None:
+        return None
+
+    if spec.origin and spec.has_location:
+        return get_path_origin(spec.origin, project_path)
+
+    for location in spec.submodule_search_locations or []:
+        return get_path_origin(location, project_path)
+
+
+def find_module_path(module_name: str) -> Optional[str]:
+    names = module_name.split('.')
+    search_locations = None
+    spec = None
+
+    for i in range(len(names)):
+        if i and search_locations is None:
+            return None
+
+        spec = importlib.machinery.PathFinder.find_spec(
+            ".".join(names[:i + 1]),
+            search_locations,
+        )
+        if spec is None:
+            return None
+
+        search_locations = spec.submodule_search_locations
+
+    if spec.origin and spec.has_location:
+        return os.path.realpath(spec.origin)
+
+
+def get_module_origin(
+    module: ModuleType,
+    project_path: str,
+) -> Optional[ModuleOrigin]:
+    if is_stdlib_module(module):
+        return ModuleOrigin.STDLIB
+    if is_third_party_module(module):
+        return ModuleOrigin.THIRD_PARTY
+    if is_project_module(module, project_path):
+        return ModuleOrigin.PROJECT
+
+
+# Answers are plain data, so that an implementation is free to import
+# modules in another process.
+class Importer:
+
+    def get_module_source(self, module_name: str) -> str:
+        return inspect.getsource(get_module_by_name(module_name))
+
+    def get_object_kind(self, module_name: str, object_name: str) -> ObjectKind:
+        target = getattr(get_module_by_name(module_name), object_name)
+
+        if inspect.ismodule(target):
+            return ObjectKind.MODULE
+        if inspect.isclass(target) or inspect.isroutine(target):
+            return ObjectKind.CLASS_OR_ROUTINE
+
+        return ObjectKind.OTHER
+
+    def get_object_source(self, module_name: str, object_name: str) -> str:
+        target = getattr(get_module_by_name(module_name), object_name)
+        return inspect.getsource(target)
+
+    def get_module_origin(
+        self,
+        module_name: str,
+        project_path: str,
+    ) -> Optional[ModuleOrigin]:
+        return get_module_origin(get_module_by_name(module_name), project_path)
+
+    def get_module_kind(self, module_name: str) -> DottedPathKind:
+        try:
+            get_module_by_name(module_name)
+        except ModuleNotFoundError:
+            return DottedPathKind.MISSING
+        else:
+            return DottedPathKind.MODULE
+
+    def get_attribute_kind(self, module_name: str, name: str) -> DottedPathKind:
+        try:
+            value = getattr(get_module_by_name(module_name), name)
+        except AttributeError:
+            return self.get_module_kind(f"{module_name}.{name}")
+
+        return (
+            DottedPathKind.MODULE
+            if inspect.ismodule(value)
+            else DottedPathKind.ATTRIBUTE
+        )
+
+    def get_module_requirement(self, module_name: str) -> Optional[str]:
+        return get_module_requirement(get_module_by_name(module_name))
+
+    def get_module_path(self, module_name: str) -> Optional[str]:
+        path = getattr(get_module_by_name(module_name), '__file__', None)
+        return path and os.path.realpath(path)
+
+    def get_module_definitions(self, module_name: str) -> Optional['ModuleDefinitions']:
+        return None
+
+    def get_module_imports(self, module_name: str) -> Optional[List['ObjectImport']]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+__importer = Importer()
+
 
-    for distribution_info in get_installed_distributions():
-        key = distribution_info.project_name
+def get_importer() -> Importer:
+    return __importer
 
-        package_info = list(search_packages_info([key]))[0]
-        package_files = package_info['files']
-        package_sources = {
-            x
-            for x in package_files
-            if x.endswith('.py')
-        }
 
-        if module_relative_location in package_sources:
-            return distribution_info.as_requirement()
+def set_importer(importer: Importer) -> Importer:
+    global __importer
+    previous, __importer = __importer, importer
+    return previous
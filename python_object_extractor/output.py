@@ -1,65 +1,120 @@
 import io
+import json
 import sys
 
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from python_object_extractor.caches import get_caches_stats
 from python_object_extractor.descriptors import ObjectDescriptor
 from python_object_extractor.imports import ObjectImport
 from python_object_extractor.imports import ObjectImportsGroupped
-from python_object_extractor.modules import get_module_by_name
-from python_object_extractor.modules import get_module_requirement
+from python_object_extractor.inlining import HelpersInlining
+from python_object_extractor.inlining import inline_helpers
+from python_object_extractor.minification import make_minification_report
+from python_object_extractor.minification import MinificationOptions
+from python_object_extractor.minification import MinificationReport
+from python_object_extractor.minification import minify_source
+from python_object_extractor.minification import uses_docstrings
+from python_object_extractor.modules import get_importer
 from python_object_extractor.references import ObjectReference
+from python_object_extractor.resolution import get_requirements_resolver
 from python_object_extractor.sources import format_object_source
 
 
 def output(
     module_path: str,
     requirements_path: str,
-    descriptors: Iterable[ObjectDescriptor],
-    imports: ObjectImportsGroupped,
-    references_to_aliases: Dict[ObjectReference, str],
+    module_source: str,
+    requirements: Iterable[str],
 ) -> None:
     if module_path == '-':
-        output_module(sys.stdout, descriptors, imports, references_to_aliases)
+        output_module(sys.stdout, module_source)
     else:
         module_path = Path(module_path)
         module_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
         with module_path.open('wt') as f:
-            output_module(f, descriptors, imports, references_to_aliases)
+            output_module(f, module_source)
 
+    output_requirements_file(requirements_path, requirements)
+
+
+def output_requirements_file(
+    requirements_path: str,
+    requirements: Iterable[str],
+) -> None:
     if requirements_path == '-':
-        output_requirements(sys.stdout, imports)
+        output_requirements(sys.stdout, requirements)
     else:
         requirements_path = Path(requirements_path)
         requirements_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
         with requirements_path.open('wt') as f:
-            output_requirements(f, imports)
+            output_requirements(f, requirements)
 
 
-def output_module(
-    output_stream: io.TextIOBase,
+def output_module(output_stream: io.TextIOBase, module_source: str) -> None:
+    output_stream.write(module_source)
+    output_stream.flush()
+
+
+def format_module(
     descriptors: Iterable[ObjectDescriptor],
     imports: ObjectImportsGroupped,
     references_to_aliases: Dict[ObjectReference, str],
-) -> None:
+    minification: Optional[MinificationOptions] = None,
+    preamble: str = "",
+    inlining: Optional[HelpersInlining] = None,
+) -> Tuple[str, Optional[MinificationReport]]:
+    header = ""
+
     if imports.stdlib:
-        output_stream.write(format_imports(imports.stdlib))
-        output_stream.write("\n")
+        header += format_imports(imports.stdlib) + "\n"
 
     if imports.third_party:
-        output_stream.write(format_imports(imports.third_party))
-        output_stream.write("\n")
+        header += format_imports(imports.third_party) + "\n"
 
     if imports.stdlib or imports.third_party:
-        output_stream.write("\n")
-
-    for descriptor in descriptors:
-        source = format_object_source(descriptor, references_to_aliases)
-        output_stream.write(source)
-        output_stream.write("\n\n")
-
-    output_stream.flush()
+        header += "\n"
+
+    if preamble:
+        header += preamble + "\n\n"
+
+    descriptors = list(descriptors)
+    sources = [
+        format_object_source(descriptor, references_to_aliases)
+        for descriptor in descriptors
+    ]
+
+    if inlining is not None:
+        sources = inline_helpers(
+            descriptors=descriptors,
+            sources=sources,
+            references_to_names=references_to_aliases,
+            inlining=inlining,
+        )
+
+    module = header + "".join(f"{x}\n\n" for x in sources)
+
+    if not minification:
+        return (module, None)
+
+    docstrings_kept = (
+           not minification.strip_docstrings
+        or uses_docstrings(sources)
+    )
+    if docstrings_kept:
+        minification = MinificationOptions(
+            strip_docstrings=False,
+            strip_annotations=minification.strip_annotations,
+        )
+
+    minified_module = minify_source(module, minification)
+    report = make_minification_report(
+        original_source=module,
+        minified_source=minified_module,
+        docstrings_kept=docstrings_kept,
+    )
+    return (minified_module, report)
 
 
 def format_imports(imports: Iterable[ObjectImport]) -> str:
@@ -82,17 +137,69 @@ def format_imports(imports: Iterable[ObjectImport]) -> str:
     return "\n".join(lines)
 
 
-def output_requirements(
-    output_stream: io.TextIOBase,
+def get_requirements(
     imports: ObjectImportsGroupped,
-) -> None:
+    pinned_requirements: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    resolver = get_requirements_resolver() or get_importer()
+    pinned_requirements = pinned_requirements or {}
     requirements = {
-        get_module_requirement(get_module_by_name(
-            module_name=object_import.object_reference.module_name,
-        ))
-        for object_import in imports.third_party
+        (
+               pinned_requirements.get(object_import.object_reference.module_name)
+            or resolver.get_module_requirement(
+                object_import.object_reference.module_name,
+            )
+        )
+        for object_import in imports.third_party or []
     }
-    requirements = sorted(["{}\n".format(x) for x in requirements])
-    output_stream.writelines(requirements)
+    return sorted([x for x in requirements if x is not None])
+
+
+def output_requirements(
+    output_stream: io.TextIOBase,
+    requirements: Iterable[str],
+) -> None:
+    output_stream.writelines([
+        "{}\n".format(x)
+        for x in requirements
+    ])
+    output_stream.write("\n")
+    output_stream.flush()
+
+
+def output_caches_stats(stats_path: str) -> None:
+    if stats_path == '-':
+        write_caches_stats(sys.stderr)
+    else:
+        stats_path = Path(stats_path)
+        stats_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with stats_path.open('wt') as f:
+            write_caches_stats(f)
+
+
+def write_caches_stats(output_stream: io.TextIOBase) -> None:
+    json.dump(get_caches_stats(), output_stream, indent=2)
+    output_stream.write("\n")
+    output_stream.flush()
+
+
+def output_minification_report(
+    report_path: str,
+    report: MinificationReport,
+) -> None:
+    if report_path == '-':
+        write_minification_report(sys.stderr, report)
+    else:
+        report_path = Path(report_path)
+        report_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with report_path.open('wt') as f:
+            write_minification_report(f, report)
+
+
+def write_minification_report(
+    output_stream: io.TextIOBase,
+    report: MinificationReport,
+) -> None:
+    json.dump(report.to_dict(), output_stream, indent=2)
     output_stream.write("\n")
     output_stream.flush()
@@ -0,0 +1,227 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.graph import find_strongly_connected_components
+from python_object_extractor.imports import ObjectImport
+from python_object_extractor.imports import ObjectImportsGroupped
+from python_object_extractor.minification import merge_minification_reports
+from python_object_extractor.minification import MinificationOptions
+from python_object_extractor.minification import MinificationReport
+from python_object_extractor.minification import uses_docstrings
+from python_object_extractor.output import format_module
+from python_object_extractor.references import ObjectReference
+
+
+PACKAGE_ENTRY_MODULE_NAME = '__init__.py'
+PACKAGE_REFERENCE_NAME = '_package'
+
+PACKAGE_IMPORT = ObjectImport(
+    object_reference=ObjectReference(
+        module_name='importlib',
+        object_name='importlib',
+    ),
+    alias=None,
+)
+
+
+class PackageGroup:
+    __slots__ = ['name', 'descriptors', ]
+
+    def __init__(self, name: str, descriptors: List[ObjectDescriptor]):
+        self.name = name
+        self.descriptors = descriptors
+
+    def __repr__(self) -> str:
+        return (
+            f"<PackageGroup("
+            f"name='{self.name}', "
+            f"descriptors={len(self.descriptors)})>"
+        )
+
+
+# Modules which depend on each other are merged, so that groups never
+# depend on each other circularly.
+def group_descriptors(descriptors: List[ObjectDescriptor]) -> List[PackageGroup]:
+    modules_to_descriptors = dict()
+    for descriptor in descriptors:
+        modules_to_descriptors.setdefault(
+            descriptor.object_reference.module_name,
+            [],
+        ).append(descriptor)
+
+    modules_to_dependencies = {
+        module_name: {
+            x.object_reference.module_name
+            for descriptor in module_descriptors
+            for x in (
+                   (descriptor.global_imports and descriptor.global_imports.project)
+                or []
+            )
+            if x.object_reference.module_name in modules_to_descriptors
+        }
+        for module_name, module_descriptors in modules_to_descriptors.items()
+    }
+    components = find_strongly_connected_components(
+        sorted(modules_to_descriptors),
+        lambda x: sorted(modules_to_dependencies[x]),
+    )
+    results = []
+
+    for component in components:
+        component = set(component)
+        results.append(PackageGroup(
+            name="_" + min(component).replace('.', '_'),
+            descriptors=[
+                x
+                for x in descriptors
+                if x.object_reference.module_name in component
+            ],
+        ))
+
+    return results
+
+
+def format_package(
+    descriptors: List[ObjectDescriptor],
+    imports: ObjectImportsGroupped,
+    references_to_aliases: Dict[ObjectReference, str],
+    object_reference: ObjectReference,
+    minification: Optional[MinificationOptions] = None,
+) -> Tuple[Dict[str, str], Optional[MinificationReport]]:
+    groups = group_descriptors(descriptors)
+    references_to_groups = {
+        x.object_reference: group
+        for group in groups
+        for x in group.descriptors
+    }
+
+    if minification and minification.strip_docstrings:
+        # Any group may read docstrings of objects of other groups.
+        if uses_docstrings([str(x.source) for x in descriptors]):
+            minification = MinificationOptions(
+                strip_docstrings=False,
+                strip_annotations=minification.strip_annotations,
+            )
+
+    results = dict()
+    reports = []
+
+    for group in groups:
+        group_references_to_aliases = dict(references_to_aliases)
+        references = set()
+
+        for descriptor in group.descriptors:
+            references.update(
+                x.object_reference
+                for x in descriptor.gather_imports()
+            )
+
+        is_package_referenced = False
+        for reference in references:
+            other_group = references_to_groups.get(reference)
+            if other_group is None or other_group is group:
+                continue
+
+            is_package_referenced = True
+            group_references_to_aliases[reference] = (
+                f"{PACKAGE_REFERENCE_NAME}.{references_to_aliases[reference]}"
+            )
+
+        group_imports = ObjectImportsGroupped(
+            stdlib=[
+                x for x in imports.stdlib or []
+                if x.object_reference in references
+            ],
+            third_party=[
+                x for x in imports.third_party or []
+                if x.object_reference in references
+            ],
+        )
+        preamble = ""
+
+        if is_package_referenced:
+            if PACKAGE_IMPORT not in (group_imports.stdlib or []):
+                group_imports.stdlib = (group_imports.stdlib or []) + [PACKAGE_IMPORT]
+
+            preamble = (
+                f"{PACKAGE_REFERENCE_NAME} = "
+                f"importlib.import_module(__package__)\n"
+            )
+
+        source, report = format_module(
+            descriptors=group.descriptors,
+            imports=group_imports,
+            references_to_aliases=group_references_to_aliases,
+            minification=minification,
+            preamble=preamble,
+        )
+        results[f"{group.name}.py"] = source
+
+        if report:
+            reports.append(report)
+
+    results[PACKAGE_ENTRY_MODULE_NAME] = format_package_entry_module(
+        exported_name=references_to_aliases[object_reference],
+        names_to_submodules={
+            references_to_aliases[reference]: group.name
+            for reference, group in sorted(
+                references_to_groups.items(),
+                key=lambda x: x[0],
+            )
+        },
+    )
+    return (results, reports and merge_minification_reports(reports) or None)
+
+
+def format_package_entry_module(
+    exported_name: str,
+    names_to_submodules: Dict[str, str],
+) -> str:
+    lines = [
+        "import importlib",
+        "",
+        "",
+        f"__all__ = [{repr(exported_name)}]",
+        "",
+        "_SUBMODULES = {",
+    ]
+    lines.extend(
+        f"    {repr(name)}: {repr(submodule_name)},"
+        for name, submodule_name in names_to_submodules.items()
+    )
+    lines.extend([
+        "}",
+        "",
+        "",
+        "def __getattr__(name):",
+        "    submodule_name = _SUBMODULES.get(name)",
+        "",
+        "    if submodule_name is None:",
+        "        raise AttributeError(",
+        "            f\"module {__name__!r} has no attribute {name!r}\"",
+        "        )",
+        "",
+        "    submodule = importlib.import_module(f\".{submodule_name}\", __name__)",
+        "    value = getattr(submodule, name)",
+        "    globals()[name] = value",
+        "    return value",
+        "",
+        "",
+        "def __dir__():",
+        "    return sorted(set(globals()) | set(_SUBMODULES))",
+        "",
+    ])
+    return "\n".join(lines)
+
+
+def output_package(
+    package_path: Path,
+    package_sources: Dict[str, str],
+) -> None:
+    package_path = Path(package_path)
+    package_path.mkdir(mode=0o755, parents=True, exist_ok=True)
+
+    for file_name, source in package_sources.items():
+        with (package_path / file_name).open('wt') as f:
+            f.write(source)
@@ -0,0 +1,206 @@
+import contextlib
+import io
+import json
+import sys
+import tracemalloc
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class MemoryUsage:
+    __slots__ = ['name', 'calls', 'peak_size', 'retained_size', ]
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.peak_size = 0
+        self.retained_size = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<MemoryUsage("
+            f"name='{self.name}', "
+            f"calls={self.calls}, "
+            f"peak_size={self.peak_size}, "
+            f"retained_size={self.retained_size})>"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'peak_size': self.peak_size,
+            'retained_size': self.retained_size,
+        }
+
+
+# Measurements may nest, e.g. an import during inspection counts for both.
+class MemoryProfiler:
+    __slots__ = ['stages', 'imports', '_frames', ]
+
+    def __init__(self):
+        self.stages = dict()
+        self.imports = dict()
+        self._frames = []
+
+    def __repr__(self) -> str:
+        return (
+            f"<MemoryProfiler("
+            f"stages={len(self.stages)}, "
+            f"imports={len(self.imports)})>"
+        )
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def measure(
+        self,
+        usages: Dict[str, MemoryUsage],
+        name: str,
+    ) -> Iterator[None]:
+        current_size, peak_size = tracemalloc.get_traced_memory()
+        self._update_outer_peak(peak_size)
+        _reset_peak()
+
+        # Start size and peak size seen so far.
+        frame = [current_size, current_size]
+        self._frames.append(frame)
+
+        try:
+            yield
+        finally:
+            self._frames.pop()
+            current_size, peak_size = tracemalloc.get_traced_memory()
+            peak_size = max(peak_size, frame[1])
+            self._update_outer_peak(peak_size)
+
+            usage = usages.get(name)
+            if usage is None:
+                usage = usages[name] = MemoryUsage(name)
+
+            usage.calls += 1
+            usage.peak_size = max(usage.peak_size, peak_size - frame[0])
+            usage.retained_size += current_size - frame[0]
+
+    def pop_imports(self) -> List[MemoryUsage]:
+        results = list(self.imports.values())
+        self.imports = dict()
+        return results
+
+    def merge_imports(self, usages: Iterable[MemoryUsage]) -> None:
+        # Imports measured by isolated workers, which import modules instead
+        # of current process.
+        for x in usages:
+            usage = self.imports.get(x.name)
+            if usage is None:
+                usage = self.imports[x.name] = MemoryUsage(x.name)
+
+            usage.calls += x.calls
+            usage.peak_size = max(usage.peak_size, x.peak_size)
+            usage.retained_size += x.retained_size
+
+    def _update_outer_peak(self, peak_size: int) -> None:
+        if self._frames:
+            self._frames[-1][1] = max(self._frames[-1][1], peak_size)
+
+    def make_report(self, top: int = 20) -> dict:
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        current_size, peak_size = tracemalloc.get_traced_memory()
+        return {
+            'current_size': current_size,
+            'peak_size': peak_size,
+            'stages': [
+                x.to_dict()
+                for x in self.stages.values()
+            ],
+            'imports': [
+                x.to_dict()
+                for x in _get_top_usages(self.imports.values(), top)
+            ],
+            'allocations': [
+                {
+                    'filename': x.traceback[0].filename,
+                    'size': x.size,
+                    'count': x.count,
+                }
+                for x in snapshot.statistics('filename')[:top]
+            ],
+        }
+
+
+def _reset_peak() -> None:
+    # Python < 3.9 cannot reset peak, so peaks are measured since tracing
+    # started.
+    reset_peak = getattr(tracemalloc, 'reset_peak', None)
+    if reset_peak is not None:
+        reset_peak()
+
+
+def _get_top_usages(
+    usages: Iterable[MemoryUsage],
+    top: int,
+) -> List[MemoryUsage]:
+    return sorted(
+        usages,
+        key=lambda x: (x.retained_size, x.peak_size),
+        reverse=True,
+    )[:top]
+
+
+__memory_profiler = None
+
+
+def configure_memory_profiler() -> MemoryProfiler:
+    global __memory_profiler
+    __memory_profiler = MemoryProfiler()
+    __memory_profiler.start()
+    return __memory_profiler
+
+
+def get_memory_profiler() -> Optional[MemoryProfiler]:
+    return __memory_profiler
+
+
+@contextlib.contextmanager
+def measure_stage(name: str) -> Iterator[None]:
+    profiler = __memory_profiler
+
+    if profiler is None:
+        yield
+        return
+
+    with profiler.measure(profiler.stages, name):
+        yield
+
+
+@contextlib.contextmanager
+def measure_import(module_name: str) -> Iterator[None]:
+    profiler = __memory_profiler
+
+    if profiler is None:
+        yield
+        return
+
+    with profiler.measure(profiler.imports, module_name):
+        yield
+
+
+def output_memory_profile(profile_path: str, top: int) -> None:
+    if profile_path == '-':
+        write_memory_profile(sys.stderr, top)
+    else:
+        profile_path = Path(profile_path)
+        profile_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with profile_path.open('wt') as f:
+            write_memory_profile(f, top)
+
+
+def write_memory_profile(output_stream: io.TextIOBase, top: int) -> None:
+    json.dump(__memory_profiler.make_report(top), output_stream, indent=2)
+    output_stream.write("\n")
+    output_stream.flush()
@@ -0,0 +1,667 @@
+import argparse
+import hashlib
+import marshal
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import tempfile
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from python_object_extractor.caches import get_cache
+from python_object_extractor.imports import get_object_imports
+from python_object_extractor.imports import ObjectImport
+from python_object_extractor.modules import add_project_to_sys_path
+from python_object_extractor.modules import DottedPathKind
+from python_object_extractor.modules import find_module_origin
+from python_object_extractor.modules import Importer
+from python_object_extractor.modules import ModuleOrigin
+from python_object_extractor.modules import ObjectKind
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.sources import CLASS_OR_ROUTINE_NODE_TYPES
+from python_object_extractor.sources import DefinitionSpan
+from python_object_extractor.sources import make_module_definitions
+from python_object_extractor.sources import ModuleDefinitions
+
+
+INDEX_MAGIC = b"POXI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sIIQQ')
+
+SKIPPED_DIRECTORIES = {'__pycache__', 'node_modules', 'site-packages', }
+
+
+def load_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Index definitions and imports of all modules of local project, "
+            "so that extraction does not need to parse or import them."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        '-p', '--project_path',
+        dest='project_path',
+        type=Path,
+        default='.',
+        help="path to local project directory",
+    )
+    parser.add_argument(
+        '-o', '--output_path',
+        dest='output_path',
+        type=Path,
+        default='python-object-extractor.idx',
+        help=(
+            "path to index file. If it exists, only modules which changed "
+            "since it was built are indexed again"
+        ),
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes",
+    )
+    return parser.parse_args()
+
+
+# Plain tuples, so that entries can be stored with 'marshal'.
+class ModuleEntry:
+    __slots__ = [
+        'module_name',
+        'path',
+        'mtime',
+        'size',
+        'digest',
+        'definitions',
+        'imports',
+        'origins',
+    ]
+
+    def __init__(
+        self,
+        module_name: str,
+        path: str,
+        mtime: int,
+        size: int,
+        digest: str,
+        definitions: Dict[str, List[Tuple[str, int, int, str]]],
+        imports: List[Tuple[Optional[str], str, Optional[str]]],
+        origins: Dict[str, Optional[str]],
+    ):
+        self.module_name = module_name
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+        self.definitions = definitions
+        self.imports = imports
+        self.origins = origins
+
+    def __repr__(self) -> str:
+        return (
+            f"<ModuleEntry("
+            f"module_name='{self.module_name}', "
+            f"path='{self.path}')>"
+        )
+
+    def dump(self) -> bytes:
+        return marshal.dumps((
+            self.module_name,
+            self.path,
+            self.mtime,
+            self.size,
+            self.digest,
+            self.definitions,
+            self.imports,
+            self.origins,
+        ))
+
+    @classmethod
+    def load(cls, data: bytes) -> 'ModuleEntry':
+        return cls(*marshal.loads(data))
+
+
+def get_module_name(relative_path: Path) -> Optional[str]:
+    parts = list(relative_path.with_suffix('').parts)
+
+    if parts[-1] == '__init__':
+        parts.pop()
+
+    if not parts or not all(x.isidentifier() for x in parts):
+        return None
+
+    return '.'.join(parts)
+
+
+def iter_project_modules(project_path: Path) -> Iterator[Tuple[str, Path]]:
+    for directory, directories, files in os.walk(project_path):
+        directories[:] = sorted(
+            x
+            for x in directories
+            if not x.startswith('.') and x not in SKIPPED_DIRECTORIES
+        )
+
+        for name in sorted(files):
+            if not name.endswith('.py'):
+                continue
+
+            path = Path(directory) / name
+            module_name = get_module_name(path.relative_to(project_path))
+            if module_name:
+                yield (module_name, path)
+
+
+def make_module_entry(
+    module_name: str,
+    path: str,
+    project_path: str,
+    source: bytes,
+    stat: os.stat_result,
+) -> ModuleEntry:
+    text = source.decode()
+    definitions = make_module_definitions(text)
+    imports = get_object_imports(text)
+    origins = dict()
+
+    for object_import in imports:
+        imported_module_name = object_import.object_reference.module_name
+        if imported_module_name and imported_module_name not in origins:
+            origin = find_module_origin(imported_module_name, project_path)
+            origins[imported_module_name] = origin and origin.value
+
+    return ModuleEntry(
+        module_name=module_name,
+        path=path,
+        mtime=stat.st_mtime_ns,
+        size=stat.st_size,
+        digest=hashlib.sha256(source).hexdigest(),
+        definitions={
+            name: [
+                (x.node_type, x.start, x.end, x.prefix)
+                for x in spans
+            ]
+            for name, spans in definitions.definitions.items()
+        },
+        imports=[
+            (
+                x.object_reference.module_name,
+                x.object_reference.object_name,
+                x.alias,
+            )
+            for x in imports
+        ],
+        origins=origins,
+    )
+
+
+def _get_module_entry_size(entry: ModuleEntry) -> int:
+    return (
+          sys.getsizeof(entry)
+        + len(entry.definitions) * 300
+        + len(entry.imports) * 200
+    )
+
+
+# Only the directory is loaded eagerly, records and sources are read
+# on demand from a memory-mapped file.
+class ProjectIndex:
+    __slots__ = [
+        'path',
+        'project_path',
+        'origins',
+        '_file',
+        '_mmap',
+        '_directory',
+        '_packages',
+        '_entries',
+    ]
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = self.path.open('rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._entries = get_cache(
+            name='project_index_entries',
+            get_size=_get_module_entry_size,
+        )
+
+        magic, version, _, directory_offset, directory_size = (
+            INDEX_HEADER.unpack_from(self._mmap, 0)
+        )
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"'{self.path}' is not a project index")
+
+        project_path, directory, origins = marshal.loads(
+            self._mmap[directory_offset:directory_offset + directory_size]
+        )
+        self.project_path = project_path
+        self.origins = origins
+        self._directory = {
+            name: (record_offset, record_size, source_offset, source_size)
+            for name, record_offset, record_size, source_offset, source_size
+            in directory
+        }
+        self._packages = frozenset(
+            name.rsplit('.', i)[0]
+            for name in self._directory
+            for i in range(1, name.count('.') + 1)
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ProjectIndex("
+            f"path='{self.path}', "
+            f"modules={len(self._directory)})>"
+        )
+
+    def __contains__(self, module_name: str) -> bool:
+        return module_name in self._directory
+
+    def is_package(self, module_name: str) -> bool:
+        return module_name in self._packages
+
+    def get_entry(self, module_name: str) -> Optional[ModuleEntry]:
+        key = (self.path, module_name)
+        entry = self._entries.get(key)
+
+        if entry is None and module_name in self._directory:
+            offset, size, _, _ = self._directory[module_name]
+            entry = ModuleEntry.load(self._mmap[offset:offset + size])
+            self._entries.set(key, entry)
+
+        return entry
+
+    def get_source_bytes(self, module_name: str) -> bytes:
+        _, _, offset, size = self._directory[module_name]
+        return self._mmap[offset:offset + size]
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+def load_project_index(path: Path) -> Optional[ProjectIndex]:
+    try:
+        return ProjectIndex(path)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def write_project_index(
+    path: Path,
+    project_path: str,
+    modules: List[Tuple[ModuleEntry, bytes]],
+) -> None:
+    path = Path(path)
+    path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=path.parent)
+
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(b"\0" * INDEX_HEADER.size)
+            offset = INDEX_HEADER.size
+            directory = []
+            origins = dict()
+
+            for entry, source in sorted(modules, key=lambda x: x[0].module_name):
+                record = entry.dump()
+                f.write(record)
+                f.write(source)
+                directory.append((
+                    entry.module_name,
+                    offset,
+                    len(record),
+                    offset + len(record),
+                    len(source),
+                ))
+                offset += len(record) + len(source)
+                origins.update(entry.origins)
+
+            directory = marshal.dumps((project_path, directory, origins))
+            f.write(directory)
+            f.seek(0)
+            f.write(INDEX_HEADER.pack(
+                INDEX_MAGIC,
+                INDEX_VERSION,
+                len(modules),
+                offset,
+                len(directory),
+            ))
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def _index_module(
+    task: Tuple[str, str, str, Optional[str]],
+) -> Tuple[Optional[ModuleEntry], bytes]:
+    module_name, path, project_path, digest = task
+    stat = os.stat(path)
+    source = Path(path).read_bytes()
+
+    if digest == hashlib.sha256(source).hexdigest():
+        return (None, source)
+
+    add_project_to_sys_path(project_path)
+    entry = make_module_entry(module_name, path, project_path, source, stat)
+    return (entry, source)
+
+
+def build_project_index(
+    project_path: Path,
+    index_path: Path,
+    jobs: int,
+) -> Dict[str, int]:
+    project_path = add_project_to_sys_path(project_path)
+    previous = load_project_index(index_path)
+    if previous is not None and previous.project_path != project_path:
+        previous.close()
+        previous = None
+
+    modules = []
+    tasks = []
+    stats = {'reused': 0, 'rehashed': 0, 'indexed': 0, }
+    previous_entries = dict()
+
+    for module_name, path in iter_project_modules(Path(project_path)):
+        path = str(path)
+        entry = previous and previous.get_entry(module_name)
+
+        if entry is not None and entry.path == path:
+            stat = os.stat(path)
+            if entry.mtime == stat.st_mtime_ns and entry.size == stat.st_size:
+                modules.append((entry, previous.get_source_bytes(module_name)))
+                stats['reused'] += 1
+                continue
+
+            previous_entries[module_name] = entry
+            tasks.append((module_name, path, project_path, entry.digest))
+        else:
+            tasks.append((module_name, path, project_path, None))
+
+    if tasks:
+        if jobs > 1 and len(tasks) > 1:
+            context = multiprocessing.get_context('spawn')
+            with context.Pool(min(jobs, len(tasks))) as pool:
+                results = pool.map(_index_module, tasks, chunksize=8)
+        else:
+            results = [_index_module(x) for x in tasks]
+
+        for (module_name, path, _, _), (entry, source) in zip(tasks, results):
+            if entry is None:
+                entry = previous_entries[module_name]
+                stat = os.stat(path)
+                entry.mtime = stat.st_mtime_ns
+                entry.size = stat.st_size
+                stats['rehashed'] += 1
+            else:
+                stats['indexed'] += 1
+
+            modules.append((entry, source))
+
+    write_project_index(index_path, project_path, modules)
+
+    if previous is not None:
+        previous.close()
+
+    return stats
+
+
+class IndexedImporter(Importer):
+
+    def __init__(self, index: ProjectIndex, fallback: Importer):
+        self.index = index
+        self.fallback = fallback
+        self._valid = dict()
+        self._sources = get_cache(
+            name='indexed_sources',
+            get_size=sys.getsizeof,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<IndexedImporter("
+            f"index={repr(self.index)}, "
+            f"fallback={repr(self.fallback)})>"
+        )
+
+    def _get_entry(self, module_name: str) -> Optional[ModuleEntry]:
+        entry = self.index.get_entry(module_name)
+
+        if entry is None:
+            return None
+
+        is_valid = self._valid.get(module_name)
+
+        if is_valid is None:
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                is_valid = False
+            else:
+                is_valid = (
+                        entry.mtime == stat.st_mtime_ns
+                    and entry.size == stat.st_size
+                )
+            self._valid[module_name] = is_valid
+
+        return entry if is_valid else None
+
+    def get_module_source(self, module_name: str) -> str:
+        if self._get_entry(module_name) is None:
+            return self.fallback.get_module_source(module_name)
+
+        key = (self.index.path, module_name)
+        source = self._sources.get(key)
+
+        if source is None:
+            source = self.index.get_source_bytes(module_name).decode()
+            self._sources.set(key, source)
+
+        return source
+
+    def get_module_definitions(self, module_name: str) -> Optional[ModuleDefinitions]:
+        entry = self._get_entry(module_name)
+
+        if entry is None:
+            return self.fallback.get_module_definitions(module_name)
+
+        return ModuleDefinitions(
+            source=self.get_module_source(module_name),
+            definitions={
+                name: [
+                    DefinitionSpan(
+                        node_type=node_type,
+                        start=start,
+                        end=end,
+                        prefix=prefix,
+                    )
+                    for node_type, start, end, prefix in spans
+                ]
+                for name, spans in entry.definitions.items()
+            },
+        )
+
+    def get_module_imports(self, module_name: str) -> Optional[List[ObjectImport]]:
+        entry = self._get_entry(module_name)
+
+        if entry is None:
+            return self.fallback.get_module_imports(module_name)
+
+        return [
+            ObjectImport(
+                object_reference=ObjectReference(
+                    module_name=imported_module_name,
+                    object_name=object_name,
+                ),
+                alias=alias,
+            )
+            for imported_module_name, object_name, alias in entry.imports
+        ]
+
+    def _get_imported_reference(
+        self,
+        entry: ModuleEntry,
+        name: str,
+    ) -> Optional[ObjectReference]:
+        result = None
+
+        for module_name, object_name, alias in entry.imports:
+            if (alias or object_name.split('.', 1)[0]) != name:
+                continue
+
+            if module_name == object_name:
+                imported_module_name = module_name if alias else name
+                result = ObjectReference(
+                    module_name=imported_module_name,
+                    object_name=imported_module_name,
+                )
+            else:
+                result = ObjectReference(
+                    module_name=module_name,
+                    object_name=object_name,
+                )
+
+        return result
+
+    def _resolve_object_kind(
+        self,
+        module_name: str,
+        object_name: str,
+        depth: int = 0,
+    ) -> Optional[ObjectKind]:
+        entry = self._get_entry(module_name)
+
+        if entry is None or depth > 8:
+            return None
+
+        spans = entry.definitions.get(object_name)
+        if spans:
+            return (
+                ObjectKind.CLASS_OR_ROUTINE
+                if spans[-1][0] in CLASS_OR_ROUTINE_NODE_TYPES
+                else ObjectKind.OTHER
+            )
+
+        reference = self._get_imported_reference(entry, object_name)
+        if reference is None:
+            return None
+
+        if reference.module_name == reference.object_name:
+            return ObjectKind.MODULE
+
+        submodule_name = f"{reference.module_name}.{reference.object_name}"
+        if submodule_name in self.index:
+            return ObjectKind.MODULE
+
+        return self._resolve_object_kind(
+            reference.module_name,
+            reference.object_name,
+            depth + 1,
+        )
+
+    def get_object_kind(self, module_name: str, object_name: str) -> ObjectKind:
+        kind = self._resolve_object_kind(module_name, object_name)
+
+        if kind is None:
+            return self.fallback.get_object_kind(module_name, object_name)
+
+        return kind
+
+    def get_object_source(self, module_name: str, object_name: str) -> str:
+        submodule_name = f"{module_name}.{object_name}"
+
+        if self._get_entry(submodule_name) is not None:
+            return self.get_module_source(submodule_name)
+
+        return self.fallback.get_object_source(module_name, object_name)
+
+    def get_module_origin(
+        self,
+        module_name: str,
+        project_path: str,
+    ) -> Optional[ModuleOrigin]:
+        if (
+                project_path == self.index.project_path
+            and (
+                   module_name in self.index
+                or self.index.is_package(module_name)
+            )
+        ):
+            return ModuleOrigin.PROJECT
+
+        origin = self.index.origins.get(module_name)
+
+        if origin is not None and project_path == self.index.project_path:
+            return ModuleOrigin(origin)
+
+        return self.fallback.get_module_origin(module_name, project_path)
+
+    def get_module_kind(self, module_name: str) -> DottedPathKind:
+        if (
+               self._get_entry(module_name) is not None
+            or self.index.is_package(module_name)
+        ):
+            return DottedPathKind.MODULE
+
+        return self.fallback.get_module_kind(module_name)
+
+    def get_attribute_kind(self, module_name: str, name: str) -> DottedPathKind:
+        entry = self._get_entry(module_name)
+
+        if entry is not None:
+            if name in entry.definitions:
+                return DottedPathKind.ATTRIBUTE
+
+            if f"{module_name}.{name}" in self.index:
+                return DottedPathKind.MODULE
+
+            kind = self._resolve_object_kind(module_name, name)
+            if kind is ObjectKind.MODULE:
+                return DottedPathKind.MODULE
+            if kind is not None:
+                return DottedPathKind.ATTRIBUTE
+
+        return self.fallback.get_attribute_kind(module_name, name)
+
+    def get_module_requirement(self, module_name: str) -> Optional[str]:
+        return self.fallback.get_module_requirement(module_name)
+
+    def get_module_path(self, module_name: str) -> Optional[str]:
+        entry = self._get_entry(module_name)
+
+        if entry is None:
+            return self.fallback.get_module_path(module_name)
+
+        return os.path.realpath(entry.path)
+
+    def close(self) -> None:
+        self.index.close()
+        self.fallback.close()
+
+
+def main() -> None:
+    args = load_args()
+
+    stats = build_project_index(
+        project_path=args.project_path,
+        index_path=args.output_path,
+        jobs=args.jobs,
+    )
+    print(
+        f"indexed {stats['indexed']}, "
+        f"rehashed {stats['rehashed']}, "
+        f"reused {stats['reused']} modules"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import weakref
+
 from typing import Any, Optional, TypeVar
 
 
@@ -8,15 +10,42 @@ ObjectReference = TypeVar(
 
 
 class ObjectReference:
-    __slots__ = ['module_name', 'object_name', ]
+    __slots__ = [
+        'module_name',
+        'object_name',
+        '_key',
+        '_hash',
+        '__weakref__',
+    ]
+
+    __instances = weakref.WeakValueDictionary()
 
-    def __init__(
-        self,
+    def __new__(
+        cls,
         module_name: str,
         object_name: Optional[str] = None,
-    ):
-        self.module_name = module_name
-        self.object_name = object_name
+    ) -> ObjectReference:
+        cache_key = (module_name, object_name)
+        instance = cls.__instances.get(cache_key)
+
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, 'module_name', module_name)
+            object.__setattr__(instance, 'object_name', object_name)
+            object.__setattr__(instance, '_key', f"{module_name}:{object_name or '*'}")
+            object.__setattr__(instance, '_hash', hash(cache_key))
+            cls.__instances[cache_key] = instance
+
+        return instance
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __reduce__(self) -> tuple:
+        return (type(self), (self.module_name, self.object_name))
 
     def __repr__(self) -> str:
         object_name_repr = (
@@ -31,17 +60,15 @@ class ObjectReference:
         )
 
     def __str__(self) -> str:
-        object_name = (
-            self.object_name
-            if self.object_name
-            else "*"
-        )
-        return f"{self.module_name}:{object_name}"
+        return self._key
 
     def __hash__(self) -> int:
-        return hash(str(self))
+        return self._hash
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+
         return (
                 isinstance(other, ObjectReference)
             and self.module_name == other.module_name
@@ -52,7 +79,7 @@ class ObjectReference:
         if not isinstance(other, ObjectReference):
             return NotImplemented
 
-        return str(self) < str(other)
+        return self._key < other._key
 
 
 def make_name_from_object_reference(object_reference: ObjectReference) -> str:
@@ -63,3 +90,11 @@ def make_name_from_object_reference(object_reference: ObjectReference) -> str:
         f"_{object_reference.module_name}_{object_reference.object_name}"
         .replace(".", "_")
     )
+
+
+def parse_object_reference(value: str) -> ObjectReference:
+    module_name, object_name = value.split(':')
+    return ObjectReference(
+        module_name=module_name,
+        object_name=object_name,
+    )
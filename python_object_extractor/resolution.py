@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from python_object_extractor.modules import find_module_path
+from python_object_extractor.modules import get_importer
+from python_object_extractor.modules import get_sources_to_requirements
+
+
+def find_module_requirement(module_name: str) -> Optional[str]:
+    path = find_module_path(module_name)
+    return path and get_sources_to_requirements().get(path)
+
+
+# Lookups neither import modules nor use current importer, so they are
+# safe to run next to inspection.
+class RequirementsResolver:
+    __slots__ = ['_executor', '_futures', ]
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix='requirements-resolver',
+        )
+        self._futures = dict()
+        self._executor.submit(get_sources_to_requirements)
+
+    def __repr__(self) -> str:
+        return f"<RequirementsResolver(modules={len(self._futures)})>"
+
+    def submit(self, module_names: Iterable[str]) -> None:
+        for module_name in module_names:
+            if module_name not in self._futures:
+                self._futures[module_name] = self._executor.submit(
+                    find_module_requirement,
+                    module_name,
+                )
+
+    def get_module_requirement(self, module_name: str) -> Optional[str]:
+        future = self._futures.get(module_name)
+        requirement = None
+
+        if future is not None:
+            try:
+                requirement = future.result()
+            except Exception:
+                requirement = None
+
+        if requirement is None:
+            requirement = get_importer().get_module_requirement(module_name)
+
+        return requirement
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+__requirements_resolver = None
+
+
+def configure_requirements_resolver() -> RequirementsResolver:
+    global __requirements_resolver
+    __requirements_resolver = RequirementsResolver()
+    return __requirements_resolver
+
+
+def get_requirements_resolver() -> Optional[RequirementsResolver]:
+    return __requirements_resolver
+
+
+def submit_modules(module_names: Iterable[str]) -> None:
+    resolver = __requirements_resolver
+
+    if resolver is not None:
+        resolver.submit(module_names)
+
+
+def close_requirements_resolver() -> None:
+    global __requirements_resolver
+
+    if __requirements_resolver is not None:
+        __requirements_resolver.close()
+        __requirements_resolver = None
@@ -0,0 +1,174 @@
+import io
+import json
+import os
+import sys
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from python_object_extractor.bundles import normalize_distribution_name
+from python_object_extractor.bundles import parse_requirement
+from python_object_extractor.exceptions import PythonObjectExtractorException
+
+
+RUNTIME_PROFILE_SUFFIX = '.txt'
+
+
+class RuntimeProfileNotFound(PythonObjectExtractorException):
+
+    def __init__(self, value: str, path: Path):
+        super().__init__(
+            f"runtime profile '{value}' is neither a file nor a profile "
+            f"in '{path}'"
+        )
+
+
+class RuntimeProfile:
+    __slots__ = ['name', 'distributions', ]
+
+    def __init__(self, name: str, distributions: Dict[str, Tuple[str, str]]):
+        self.name = name
+        self.distributions = distributions
+
+    def __repr__(self) -> str:
+        return (
+            f"<RuntimeProfile("
+            f"name='{self.name}', "
+            f"distributions={len(self.distributions)})>"
+        )
+
+    def get_provided_names(self) -> List[str]:
+        return sorted(self.distributions)
+
+
+class RuntimeRequirements:
+    __slots__ = ['runtime', 'requirements', 'provided', 'mismatches', ]
+
+    def __init__(
+        self,
+        runtime: str,
+        requirements: List[str],
+        provided: List[str],
+        mismatches: List[Dict[str, str]],
+    ):
+        self.runtime = runtime
+        self.requirements = requirements
+        self.provided = provided
+        self.mismatches = mismatches
+
+    def __repr__(self) -> str:
+        return (
+            f"<RuntimeRequirements("
+            f"runtime='{self.runtime}', "
+            f"requirements={len(self.requirements)}, "
+            f"provided={len(self.provided)}, "
+            f"mismatches={len(self.mismatches)})>"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'runtime': self.runtime,
+            'provided': self.provided,
+            'mismatches': self.mismatches,
+        }
+
+
+def get_runtime_profiles_path() -> Path:
+    root = os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config'
+    return Path(root) / 'python-object-extractor' / 'runtimes'
+
+
+def parse_runtime_profile(name: str, lines: Iterable[str]) -> RuntimeProfile:
+    distributions = dict()
+
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+
+        if not line:
+            continue
+
+        distribution_name, version, _ = parse_requirement(line)
+        distributions[normalize_distribution_name(distribution_name)] = (
+            distribution_name,
+            version,
+        )
+
+    return RuntimeProfile(name=name, distributions=distributions)
+
+
+def load_runtime_profile(value: str) -> RuntimeProfile:
+    path = Path(value)
+
+    if not path.is_file():
+        profiles_path = get_runtime_profiles_path()
+        path = profiles_path / f"{value}{RUNTIME_PROFILE_SUFFIX}"
+
+        if not path.is_file():
+            raise RuntimeProfileNotFound(value, profiles_path)
+
+    name = path.name
+    if name.endswith(RUNTIME_PROFILE_SUFFIX):
+        name = name[:-len(RUNTIME_PROFILE_SUFFIX)]
+
+    with path.open('rt') as f:
+        return parse_runtime_profile(name, f)
+
+
+# Requirements provided in other versions are kept, so that required
+# versions shadow provided ones.
+def apply_runtime_profile(
+    requirements: Iterable[str],
+    profile: RuntimeProfile,
+) -> RuntimeRequirements:
+    results = []
+    provided = []
+    mismatches = []
+
+    for requirement in requirements:
+        name, version, _ = parse_requirement(requirement)
+        item = profile.distributions.get(normalize_distribution_name(name))
+
+        if item is None:
+            results.append(requirement)
+            continue
+
+        provided_name, provided_version = item
+
+        if version is None or provided_version is None or version == provided_version:
+            provided.append(requirement)
+        else:
+            results.append(requirement)
+            mismatches.append({
+                'name': provided_name,
+                'required_version': version,
+                'provided_version': provided_version,
+            })
+
+    return RuntimeRequirements(
+        runtime=profile.name,
+        requirements=results,
+        provided=provided,
+        mismatches=mismatches,
+    )
+
+
+def output_runtime_report(
+    report_path: str,
+    runtime_requirements: RuntimeRequirements,
+) -> None:
+    if report_path == '-':
+        write_runtime_report(sys.stderr, runtime_requirements)
+    else:
+        report_path = Path(report_path)
+        report_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with report_path.open('wt') as f:
+            write_runtime_report(f, runtime_requirements)
+
+
+def write_runtime_report(
+    output_stream: io.TextIOBase,
+    runtime_requirements: RuntimeRequirements,
+) -> None:
+    json.dump(runtime_requirements.to_dict(), output_stream, indent=2)
+    output_stream.write("\n")
+    output_stream.flush()
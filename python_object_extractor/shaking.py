@@ -0,0 +1,239 @@
+import argparse
+import ast
+import itertools
+
+from typing import FrozenSet, Iterable, List, Optional, Set, Union
+
+from python_object_extractor.caches import load_or_make
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.sources import get_lines_offsets
+from python_object_extractor.spans import Edit
+from python_object_extractor.spans import ObjectSource
+
+
+ATTRIBUTE_FUNCTIONS_NAMES = {'getattr', 'hasattr', 'setattr', 'delattr', }
+
+# Decorators which only change how a method is accessed. Methods decorated
+# otherwise may be registered somewhere by their decorators and are kept.
+TRANSPARENT_DECORATORS_NAMES = {'property', 'staticmethod', 'classmethod', }
+TRANSPARENT_DECORATORS_ATTRIBUTES = {'getter', 'setter', 'deleter', }
+
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+# Names accessed dynamically can't be told, so they are listed in
+# 'kept_names' as 'method' or 'Class.method'.
+class MethodsShaking:
+    __slots__ = ['kept_names', 'used_names', 'removed_names', ]
+
+    def __init__(self, kept_names: Iterable[str] = ()):
+        self.kept_names = frozenset(kept_names)
+        self.used_names = set()
+        self.removed_names = dict()
+
+    def __repr__(self) -> str:
+        return (
+            f"<MethodsShaking("
+            f"kept_names={sorted(self.kept_names)}, "
+            f"used_names={len(self.used_names)}, "
+            f"removed_names={sum(len(x) for x in self.removed_names.values())})>"
+        )
+
+    def reset(self) -> None:
+        self.removed_names = dict()
+
+    def is_stale(self) -> bool:
+        return any(
+            not names.isdisjoint(self.used_names)
+            for names in self.removed_names.values()
+        )
+
+    def use_source(self, source: str) -> None:
+        self.used_names.update(get_accessed_attributes(source))
+
+    def is_kept(
+        self,
+        class_name: str,
+        node: FunctionNode,
+        class_names: FrozenSet[str] = frozenset(),
+    ) -> bool:
+        return (
+               node.name in self.used_names
+            or node.name in class_names
+            or node.name in self.kept_names
+            or f"{class_name}.{node.name}" in self.kept_names
+        )
+
+
+def get_accessed_attributes(source: str) -> FrozenSet[str]:
+    return load_or_make('accessed_attributes', source, _get_accessed_attributes)
+
+
+def _get_accessed_attributes(source: str) -> FrozenSet[str]:
+    return frozenset(_iter_accessed_attributes(ast.parse(source)))
+
+
+def _iter_accessed_attributes(tree: ast.AST) -> Iterable[str]:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute):
+            yield node.attr
+        elif (
+                isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in ATTRIBUTE_FUNCTIONS_NAMES
+            and len(node.args) >= 2
+            and isinstance(node.args[1], ast.Constant)
+            and isinstance(node.args[1].value, str)
+        ):
+            yield node.args[1].value
+
+
+def _get_class_scope_names(class_node: ast.ClassDef) -> FrozenSet[str]:
+    nodes = []
+
+    for node in class_node.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            nodes.extend(node.decorator_list)
+            nodes.extend(node.args.defaults)
+            nodes.extend(x for x in node.args.kw_defaults if x is not None)
+        else:
+            nodes.append(node)
+
+    return frozenset(
+        x.id
+        for node in nodes
+        for x in ast.walk(node)
+        if isinstance(x, ast.Name) and isinstance(x.ctx, ast.Load)
+    )
+
+
+def _is_prunable(node: ast.stmt) -> bool:
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return False
+
+    if node.name.startswith('__') and node.name.endswith('__'):
+        return False
+
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name):
+            if decorator.id not in TRANSPARENT_DECORATORS_NAMES:
+                return False
+        elif isinstance(decorator, ast.Attribute):
+            if decorator.attr not in TRANSPARENT_DECORATORS_ATTRIBUTES:
+                return False
+        else:
+            return False
+
+    return True
+
+
+def shake_methods(
+    object_reference: ObjectReference,
+    source: ObjectSource,
+    shaking: MethodsShaking,
+) -> ObjectSource:
+    text = str(source)
+
+    if 'class' not in text:
+        return source
+
+    classes = [
+        x
+        for x in ast.parse(text).body
+        if isinstance(x, ast.ClassDef)
+    ]
+    if not classes:
+        return source
+
+    prunable = {
+        class_node.name: [x for x in class_node.body if _is_prunable(x)]
+        for class_node in classes
+    }
+    classes_scope_names = {
+        class_node.name: _get_class_scope_names(class_node)
+        for class_node in classes
+    }
+    kept = set()
+
+    while True:
+        is_changed = False
+
+        for class_name, nodes in prunable.items():
+            for node in nodes:
+                if node in kept or not shaking.is_kept(
+                    class_name,
+                    node,
+                    classes_scope_names[class_name],
+                ):
+                    continue
+
+                kept.add(node)
+                shaking.used_names.update(_iter_accessed_attributes(node))
+                is_changed = True
+
+        if not is_changed:
+            break
+
+    removed = [
+        node
+        for node in itertools.chain.from_iterable(prunable.values())
+        if node not in kept
+    ]
+    if not removed:
+        return source
+
+    shaking.removed_names[object_reference] = {x.name for x in removed}
+    return ObjectSource.from_text(source.render(_make_removal_edits(
+        text,
+        classes,
+        set(removed),
+    )))
+
+
+def _make_removal_edits(
+    text: str,
+    classes: List[ast.ClassDef],
+    removed: Set[ast.stmt],
+) -> List[Edit]:
+    lines = text.splitlines(keepends=True)
+    offsets = get_lines_offsets(lines)
+    results = []
+
+    for class_node in classes:
+        nodes = [x for x in class_node.body if x in removed]
+        is_emptied = len(nodes) == len(class_node.body)
+
+        for i, node in enumerate(nodes):
+            first_lineno = min([
+                node.lineno,
+                *[x.lineno for x in node.decorator_list],
+            ])
+
+            # Blank lines separating the method from preceding statement go
+            # away with it.
+            while (
+                    first_lineno - 1 > class_node.lineno
+                and not lines[first_lineno - 2].strip()
+            ):
+                first_lineno -= 1
+
+            replacement = (
+                f"{' ' * node.col_offset}pass\n"
+                if is_emptied and i == 0
+                else ""
+            )
+            results.append((
+                offsets[first_lineno - 1],
+                offsets[node.end_lineno],
+                replacement,
+            ))
+
+    return results
+
+
+def make_methods_shaking(args: argparse.Namespace) -> Optional[MethodsShaking]:
+    if not args.shake_methods:
+        return None
+
+    return MethodsShaking(kept_names=args.kept_methods or ())
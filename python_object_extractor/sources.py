@@ -1,57 +1,234 @@
 import ast
-import inspect
 import itertools
 import re
+import sys
 
-from types import ModuleType
-from typing import Dict, Set, Iterator, Iterable, Optional
-
-import astor
+from typing import Dict, List, Set, Iterable, Iterator, Optional, Tuple
 
+from python_object_extractor.caches import get_cache
+from python_object_extractor.caches import load_or_make
 from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.modules import get_importer
+from python_object_extractor.modules import ObjectKind
 from python_object_extractor.references import ObjectReference
+from python_object_extractor.spans import drop_overlapping_edits
+from python_object_extractor.spans import Edit
+from python_object_extractor.spans import ObjectSource
 
 
-def get_object_source(module: ModuleType, target: object, symbol: str) -> str:
-    if (
-           inspect.ismodule(target)
-        or inspect.isclass(target)
-        or inspect.isroutine(target)
+__modules_definitions = get_cache(
+    name='modules_definitions',
+    get_size=lambda definitions: (
+          sys.getsizeof(definitions.source)
+        + len(definitions.definitions) * 300
+    ),
+)
+
+
+CLASS_OR_ROUTINE_NODE_TYPES = {'ClassDef', 'FunctionDef', 'AsyncFunctionDef', }
+
+
+class DefinitionSpan:
+    __slots__ = ['node_type', 'start', 'end', 'prefix', ]
+
+    def __init__(
+        self,
+        node_type: str,
+        start: int,
+        end: int,
+        prefix: str = "",
+    ):
+        self.node_type = node_type
+        self.start = start
+        self.end = end
+        self.prefix = prefix
+
+    def __repr__(self) -> str:
+        return (
+            f"<DefinitionSpan("
+            f"node_type={self.node_type}, "
+            f"start={self.start}, "
+            f"end={self.end})>"
+        )
+
+    def is_class_or_routine(self) -> bool:
+        return self.node_type in CLASS_OR_ROUTINE_NODE_TYPES
+
+
+class ModuleDefinitions:
+    __slots__ = ['source', 'definitions', ]
+
+    def __init__(
+        self,
+        source: str,
+        definitions: Dict[str, List[DefinitionSpan]],
     ):
-        return inspect.getsource(target)
+        self.source = source
+        self.definitions = definitions
+
+    def __repr__(self) -> str:
+        return (
+            f"<ModuleDefinitions("
+            f"definitions={len(self.definitions)})>"
+        )
+
+    def get_object_source(self, symbol: str) -> Optional[ObjectSource]:
+        spans = self.definitions.get(symbol)
+
+        if not spans:
+            return
+
+        pieces = []
+
+        for span in spans:
+            if span.prefix:
+                pieces.append(span.prefix)
+            pieces.append((span.start, span.end))
+            if self.source[span.end - 1:span.end] != "\n":
+                pieces.append("\n")
+
+        return ObjectSource(self.source, pieces)
 
-    source = inspect.getsource(module)
-    return get_assignment_source(source, symbol)
+    def get_source(self, symbol: str) -> Optional[str]:
+        source = self.get_object_source(symbol)
+        return source and str(source)
 
 
-def get_assignment_source(source: str, symbol: str) -> str:
-    root = ast.parse(source)
+def get_module_definitions(module_name: str) -> ModuleDefinitions:
+    results = __modules_definitions.get(module_name)
 
-    for node in ast.iter_child_nodes(root):
-        if isinstance(node, ast.AugAssign) and node.target.id == symbol:
-            return astor.to_source(node)
+    if results is None:
+        importer = get_importer()
+        results = importer.get_module_definitions(module_name)
+
+        if results is None:
+            results = load_or_make(
+                'module_definitions',
+                importer.get_module_source(module_name),
+                make_module_definitions,
+            )
+
+        __modules_definitions.set(module_name, results)
+
+    return results
+
+
+def make_module_definitions(source: str) -> ModuleDefinitions:
+    lines = source.splitlines(keepends=True)
+    offsets = get_lines_offsets(lines)
+    definitions = dict()
+
+    def get_span(node: ast.AST) -> Tuple[int, int]:
+        return get_node_span(lines, offsets, node)
+
+    for node in ast.parse(source).body:
+        if isinstance(node, (
+            ast.ClassDef,
+            ast.FunctionDef,
+            ast.AsyncFunctionDef,
+        )):
+            lineno = min([node.lineno] + [
+                x.lineno
+                for x in node.decorator_list
+            ])
+            definitions[node.name] = [DefinitionSpan(
+                node_type=type(node).__name__,
+                start=offsets[lineno - 1],
+                end=offsets[node.end_lineno],
+            )]
         elif isinstance(node, ast.Assign):
             for target in node.targets:
-                if isinstance(target, ast.Name) and target.id == symbol:
-                    value = astor.to_source(node.value)
-                    return f"{symbol} = {value}"
-                elif hasattr(target, 'elts'):
-                    for i, name in enumerate(target.elts):
-                        if name.id == symbol:
-                            value = astor.to_source(node.value.elts[i])
-                            return f"{symbol} = {value}"
+                for name, value in _iter_assigned_values(target, node.value):
+                    if value is None:
+                        start, end = get_span(node)
+                        prefix = ""
+                    else:
+                        start, end = get_span(value)
+                        prefix = f"{name} = "
+                    definitions[name] = [DefinitionSpan(
+                        node_type=type(node).__name__,
+                        start=start,
+                        end=end,
+                        prefix=prefix,
+                    )]
+        elif (
+                isinstance(node, ast.AnnAssign)
+            and isinstance(node.target, ast.Name)
+            and node.value is not None
+        ):
+            start, end = get_span(node)
+            definitions[node.target.id] = [DefinitionSpan(
+                node_type=type(node).__name__,
+                start=start,
+                end=end,
+            )]
+        elif (
+                isinstance(node, ast.AugAssign)
+            and isinstance(node.target, ast.Name)
+        ):
+            start, end = get_span(node)
+            definitions.setdefault(node.target.id, []).append(DefinitionSpan(
+                node_type=type(node).__name__,
+                start=start,
+                end=end,
+            ))
+
+    return ModuleDefinitions(source=source, definitions=definitions)
+
+
+def _iter_assigned_values(
+    target: ast.expr,
+    value: Optional[ast.expr],
+) -> Iterator[Tuple[str, Optional[ast.expr]]]:
+    if isinstance(target, ast.Name):
+        yield target.id, value
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        values = (
+            value.elts
+            if (
+                    isinstance(value, (ast.Tuple, ast.List))
+                and len(value.elts) == len(target.elts)
+                and not any(isinstance(x, ast.Starred) for x in value.elts)
+            )
+            else [None] * len(target.elts)
+        )
+        for subtarget, subvalue in zip(target.elts, values):
+            yield from _iter_assigned_values(subtarget, subvalue)
+    elif isinstance(target, ast.Starred):
+        yield from _iter_assigned_values(target.value, None)
+
+
+def get_object_source(module_name: str, symbol: str) -> ObjectSource:
+    importer = get_importer()
+    kind = importer.get_object_kind(module_name, symbol)
+
+    if kind is ObjectKind.MODULE:
+        return ObjectSource.from_text(
+            importer.get_object_source(module_name, symbol),
+        )
+
+    definitions = get_module_definitions(module_name)
+    spans = definitions.definitions.get(symbol)
+    is_class_or_routine = kind is ObjectKind.CLASS_OR_ROUTINE
+
+    if spans and (
+           spans[-1].is_class_or_routine()
+        or not is_class_or_routine
+    ):
+        return definitions.get_object_source(symbol)
+
+    if is_class_or_routine:
+        return ObjectSource.from_text(
+            importer.get_object_source(module_name, symbol),
+        )
 
 
 def format_object_source(
     descriptor: ObjectDescriptor,
     references_to_names: Dict[ObjectReference, str],
 ) -> str:
-    source = descriptor.source
-    source = replace_access_chain_with_value(
-        source=source,
-        chain=[descriptor.object_reference.object_name, ],
-        value=references_to_names[descriptor.object_reference],
-    )
+    source = str(descriptor.source)
+    edits = []
 
     if (
             descriptor.global_imports
@@ -65,12 +242,31 @@ def format_object_source(
             module_names.add(item.object_reference.module_name)
 
         if module_names:
-            source = strip_imports(source, module_names)
+            edits.extend(make_imports_stripping_edits(
+                source,
+                module_names,
+                descriptor.analysis.import_nodes,
+            ))
 
-    for object_import in descriptor.gather_imports():
-        if not object_import.substituted:
-            continue
+    edits.extend(make_access_chain_edits(
+        source=source,
+        chain=[descriptor.object_reference.object_name, ],
+        value=references_to_names[descriptor.object_reference],
+    ))
+
+    # Local imports are left under their own names, as they stay in place.
+    for object_import in descriptor.iter_global_imports():
+        new_literal = (
+               object_import.alias
+            or object_import.object_reference.object_name
+        )
+        new_literal = references_to_names.get(
+            object_import.object_reference,
+            new_literal,
+        )
 
+        # Imports substituted for accesses to imported modules are renamed
+        # together with the accesses.
         substituted_import = object_import
         while substituted_import.substituted is not None:
             substituted_import = substituted_import.substituted
@@ -79,92 +275,92 @@ def format_object_source(
                substituted_import.alias
             or substituted_import.object_reference.object_name
         )
+        if substituted_import is object_import and substituted_literal == new_literal:
+            continue
 
         substituted_access_chain = [substituted_literal, ]
         if substituted_import.access_chain:
             substituted_access_chain.extend(substituted_import.access_chain)
 
-        new_literal = (
-               object_import.alias
-            or object_import.object_reference.object_name
-        )
-        new_literal = references_to_names.get(
-            object_import.object_reference,
-            new_literal,
-        )
-
-        source = replace_access_chain_with_value(
+        edits.extend(make_access_chain_edits(
             source=source,
             chain=substituted_access_chain,
             value=new_literal,
-        )
+        ))
 
-    return source
+    return descriptor.source.render(drop_overlapping_edits(edits))
 
 
-def replace_access_chain_with_value(
+def make_access_chain_edits(
     source: str,
     chain: Iterable[str],
     value: str,
-) -> str:
+) -> List[Edit]:
     identifier = r"\b\s*\.\s*\b".join(chain)
     pattern = r"(([^\s\._]|^)\s*){}\b".format(identifier)
-    substituted = r"\1{}".format(value)
-    return re.sub(pattern, substituted, source)
+    return [
+        (match.end(1), match.end(), value)
+        for match in re.finditer(pattern, source)
+        if match.group(0)[len(match.group(1)):] != value
+    ]
 
 
-def strip_imports(source: str, module_names: Set[str]) -> str:
-    offsets = [0]
-    offsets.extend(list(itertools.accumulate([
-        len(line)
-        for line in source.splitlines(keepends=True)
-    ])))
-
-    root = ast.parse(source)
-    generator = _traverse_containers(root)
-    previous = next(generator)
-    current = None
-    replacements = list()
-
-    for current in generator:
-        replacement = _maybe_get_import_replacement(previous, module_names)
-        if replacement is not None:
-            start = offsets[previous.lineno - 1] + previous.col_offset
-            if (current.lineno - previous.lineno) < 2:
-                end = offsets[current.lineno - 1] + current.col_offset
-            else:
-                end = offsets[current.lineno - 2] - 1
-            replacements.append((start, end, replacement))
-        previous = current
-
-    if current:
-        replacement = _maybe_get_import_replacement(current, module_names)
-        if replacement is not None:
-            replacements.append((
-                offsets[previous.lineno - 1] + previous.col_offset,
-                None,
-                replacement,
-            ))
+def make_imports_stripping_edits(
+    source: str,
+    module_names: Set[str],
+    import_nodes: Iterable[ast.stmt],
+) -> List[Edit]:
+    lines = source.splitlines(keepends=True)
+    offsets = get_lines_offsets(lines)
+    results = list()
+
+    for node in import_nodes:
+        replacement = _maybe_get_import_replacement(node, module_names)
+        if replacement is None:
+            continue
+
+        start, end = get_node_span(lines, offsets, node)
+
+        if not replacement:
+            line_start = offsets[node.lineno - 1]
+            line_end = offsets[node.end_lineno]
+            if (
+                    not source[line_start:start].strip()
+                and not source[end:line_end].strip()
+            ):
+                start, end = line_start, line_end
+
+        results.append((start, end, replacement))
+
+    return results
 
-    delta = 0
-    for start, end, replacement in replacements:
-        if end is None:
-            end = len(source) - 1
 
-        start -= delta
-        end -= delta
-        delta = (end - start) - len(replacement)
-        source = source[:start] + replacement + source[end:]
+def get_lines_offsets(lines: List[str]) -> List[int]:
+    offsets = [0]
+    offsets.extend(itertools.accumulate([len(line) for line in lines]))
+    return offsets
 
-    return source
 
+def get_offset(
+    lines: List[str],
+    offsets: List[int],
+    lineno: int,
+    col_offset: int,
+) -> int:
+    line = lines[lineno - 1]
+    column = len(line.encode()[:col_offset].decode())
+    return offsets[lineno - 1] + column
 
-def _traverse_containers(node: ast.AST) -> Iterator[ast.AST]:
-    if hasattr(node, 'body'):
-        for child in node.body:
-            yield from _traverse_containers(child)
-    else:
-        yield node
+
+def get_node_span(
+    lines: List[str],
+    offsets: List[int],
+    node: ast.AST,
+) -> Tuple[int, int]:
+    return (
+        get_offset(lines, offsets, node.lineno, node.col_offset),
+        get_offset(lines, offsets, node.end_lineno, node.end_col_offset),
+    )
 
 
 def _maybe_get_import_replacement(
@@ -192,4 +388,8 @@ def _maybe_get_import_replacement(
             remainders.append(remainder)
 
     if has_import_to_replace:
-        return "import " + ", ".join(remainders)
+        return (
+            "import " + ", ".join(remainders)
+            if remainders
+            else ""
+        )
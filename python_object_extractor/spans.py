@@ -0,0 +1,94 @@
+from typing import Iterable, Iterator, List, Tuple, Union
+
+
+Edit = Tuple[int, int, str]
+Piece = Union[str, Tuple[int, int]]
+
+
+# Offsets of edits refer to the source as rendered without edits.
+class ObjectSource:
+    __slots__ = ['buffer', 'pieces', '_length', '_text', ]
+
+    def __init__(self, buffer: str, pieces: Iterable[Piece]):
+        self.buffer = buffer
+        self.pieces = tuple(pieces)
+        self._length = sum(
+            len(x) if isinstance(x, str) else x[1] - x[0]
+            for x in self.pieces
+        )
+        self._text = None
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ObjectSource':
+        return cls(text, [(0, len(text)), ])
+
+    def __repr__(self) -> str:
+        return (
+            f"<ObjectSource("
+            f"pieces={len(self.pieces)}, "
+            f"length={self._length})>"
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        # Rendered once, as the text is used for analysis, shaking and output.
+        if self._text is None:
+            self._text = self.render()
+
+        return self._text
+
+    def get_size(self) -> int:
+        if self.buffer.isascii():
+            return self._length
+
+        return sum(len(x.encode()) for x in self._iter_range(0, self._length))
+
+    def _iter_range(self, start: int, end: int) -> Iterator[str]:
+        offset = 0
+
+        for piece in self.pieces:
+            if isinstance(piece, str):
+                length = len(piece)
+            else:
+                length = piece[1] - piece[0]
+
+            piece_start = max(start, offset)
+            piece_end = min(end, offset + length)
+
+            if piece_start < piece_end:
+                a, b = piece_start - offset, piece_end - offset
+                if isinstance(piece, str):
+                    yield piece[a:b]
+                else:
+                    yield self.buffer[piece[0] + a:piece[0] + b]
+
+            offset += length
+            if offset >= end:
+                break
+
+    def render(self, edits: Iterable[Edit] = ()) -> str:
+        chunks = []
+        cursor = 0
+
+        for start, end, replacement in sorted(edits):
+            chunks.extend(self._iter_range(cursor, start))
+            chunks.append(replacement)
+            cursor = end
+
+        chunks.extend(self._iter_range(cursor, self._length))
+        return "".join(chunks)
+
+
+# Of edits starting at the same offset the longest one is kept.
+def drop_overlapping_edits(edits: Iterable[Edit]) -> List[Edit]:
+    results = []
+    cursor = 0
+
+    for edit in sorted(edits, key=lambda x: (x[0], -x[1])):
+        if edit[0] >= cursor:
+            results.append(edit)
+            cursor = edit[1]
+
+    return results
@@ -1,13 +1,10 @@
-import inspect
-
-from typing import Dict, List, Set, Optional, Iterable
+from typing import List, Set, Optional, Tuple
 
 from python_object_extractor.attributes import AttributesAccessChain
-from python_object_extractor.attributes import extract_attributes_access_chains
 from python_object_extractor.exceptions import PythonObjectExtractorException
 from python_object_extractor.imports import ObjectImport
-from python_object_extractor.imports import ObjectImportsGroupped
-from python_object_extractor.modules import get_module_by_name
+from python_object_extractor.modules import DottedPathKind
+from python_object_extractor.modules import get_dotted_path_node
 from python_object_extractor.references import ObjectReference
 
 
@@ -25,11 +22,10 @@ class NoAccessedModuleObjects(PythonObjectExtractorException):
         )
 
 
-def _extract_imported_objects_access_chains(
-    source: str,
+def _filter_imported_objects_access_chains(
+    access_chains: List[AttributesAccessChain],
     imported_objects_names: Set[str],
 ) -> List[AttributesAccessChain]:
-    access_chains = extract_attributes_access_chains(source)
     return [
         x for x in access_chains
         if x.object_name in imported_objects_names
@@ -41,65 +37,62 @@ def _find_first_non_module_index(
     object_name: str,
     access_chain: List[str],
 ) -> Optional[int]:
+    node = get_dotted_path_node(module_name)
+
     if module_name == object_name:
-        object_full_name = module_name
+        names, start = access_chain, 1
     else:
-        object_full_name = f"{module_name}.{object_name}"
-        module = get_module_by_name(module_name)
+        names, start = [object_name, *access_chain], 0
 
-        try:
-            the_object = getattr(module, object_name)
-        except AttributeError:
-            the_object = get_module_by_name(object_full_name)
-
-        if not inspect.ismodule(the_object):
-            return 0
-
-    if not access_chain:
-        return
-
-    subindex = _find_first_non_module_index(
-        object_full_name,
-        access_chain[0],
-        access_chain[1:],
-    )
-
-    if subindex is not None:
-        return subindex + 1
+    for i, name in enumerate(names, start):
+        node = node.get_child(name)
+        if node.kind is DottedPathKind.ATTRIBUTE:
+            return i
 
 
 def substitute_accesses_to_imported_modules(
     source: str,
     imports: List[ObjectImport],
+    access_chains: List[AttributesAccessChain],
 ) -> List[ObjectImport]:
     alias_to_imports = {
         (x.alias or x.object_reference.object_name): x
         for x in imports
     }
-    access_chains = _extract_imported_objects_access_chains(
-        source=source,
+    access_chains = _filter_imported_objects_access_chains(
+        access_chains=access_chains,
         imported_objects_names=set(alias_to_imports.keys()),
     )
-    results = set(imports)
+    substituted = set()
+    substitutions = dict()
 
     for access_chain in access_chains:
         original_import = alias_to_imports[access_chain.object_name]
-        new_reference = maybe_make_import_substitution(
+        substitution = maybe_make_import_substitution(
             imported_module_name=original_import.object_reference.module_name,
             imported_object_name=original_import.object_reference.object_name,
             access_chain=access_chain.sequence,
             source=source,
         )
-        if new_reference:
-            original_import.access_chain = access_chain.sequence
-            results.remove(original_import)
-            results.add(ObjectImport(
-                object_reference=new_reference,
-                alias=None,
-                substituted=original_import,
-            ))
-
-    return list(results)
+        if substitution:
+            new_reference, accessed_chain = substitution
+            substituted.add(original_import)
+
+            key = (original_import, new_reference, tuple(accessed_chain))
+            if key not in substitutions:
+                substitutions[key] = ObjectImport(
+                    object_reference=new_reference,
+                    alias=None,
+                    substituted=ObjectImport(
+                        object_reference=original_import.object_reference,
+                        alias=original_import.alias,
+                        access_chain=accessed_chain,
+                    ),
+                )
+
+    results = [x for x in imports if x not in substituted]
+    results.extend(substitutions.values())
+    return results
 
 
 def maybe_make_import_substitution(
@@ -107,7 +100,7 @@ def maybe_make_import_substitution(
     imported_object_name: str,
     access_chain: List[str],
     source: str,
-) -> Optional[ObjectReference]:
+) -> Optional[Tuple[ObjectReference, List[str]]]:
     idx = _find_first_non_module_index(
         module_name=imported_module_name,
         object_name=imported_object_name,
@@ -136,54 +129,8 @@ def maybe_make_import_substitution(
     new_module_name = ".".join(new_module_name_path)
     new_object_name = access_chain[idx]
 
-    return ObjectReference(
+    new_reference = ObjectReference(
         module_name=new_module_name,
         object_name=new_object_name,
     )
-
-
-def substitute_aliases_of_imports(
-    imports: Iterable[ObjectImport],
-    references_to_aliases: Dict[ObjectReference, str],
-) -> List[ObjectImport]:
-    results = []
-
-    for imported_object in imports:
-        imported_alias = (
-               imported_object.alias
-            or imported_object.object_reference.object_name
-        )
-        substituted_alias = references_to_aliases.get(
-            imported_object.object_reference,
-        )
-        if substituted_alias and imported_alias != substituted_alias:
-            imported_object = ObjectImport(
-                object_reference=imported_object.object_reference,
-                alias=substituted_alias,
-                substituted=imported_object,
-            )
-        results.append(imported_object)
-
-    return results
-
-
-def substitute_aliases_of_groupped_imports(
-    groupped_imports: List[ObjectImportsGroupped],
-    references_to_aliases: Dict[ObjectReference, str],
-) -> None:
-    for item in groupped_imports:
-        if item.stdlib:
-            item.stdlib = substitute_aliases_of_imports(
-                item.stdlib,
-                references_to_aliases,
-            )
-        if item.third_party:
-            item.third_party = substitute_aliases_of_imports(
-                item.third_party,
-                references_to_aliases,
-            )
-        if item.project:
-            item.project = substitute_aliases_of_imports(
-                item.project,
-                references_to_aliases,
-            )
+    return (new_reference, access_chain[:idx + 1])
@@ -0,0 +1,342 @@
+import argparse
+import io
+import json
+import sys
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from python_object_extractor.descriptors import ObjectDescriptor
+from python_object_extractor.inspection import inspect_object_with_children
+from python_object_extractor.modules import add_project_to_sys_path
+from python_object_extractor.modules import get_importer
+from python_object_extractor.references import ObjectReference
+from python_object_extractor.references import parse_object_reference
+
+
+def load_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Explain which objects and requirements an extracted object pulls "
+            "in and rank the imports by the weight they add."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        'object_reference',
+        type=str,
+        help=(
+            "reference to object to analyze. "
+            "Example: 'importable.module:object'"
+        ),
+    )
+    parser.add_argument(
+        '-p', '--project_path',
+        dest='project_path',
+        type=Path,
+        default='.',
+        help="path to local project directory",
+    )
+    parser.add_argument(
+        '-f', '--format',
+        dest='format',
+        type=str,
+        choices=['json', 'dot', ],
+        default='json',
+        help="output format of dependency graph",
+    )
+    parser.add_argument(
+        '-o', '--output_path',
+        dest='output_path',
+        type=str,
+        default='-',
+        help="path to output file. Use '-' to output to STDOUT",
+    )
+    return parser.parse_args()
+
+
+class NodeWeight:
+    __slots__ = [
+        'object_reference',
+        'source_size',
+        'requirements',
+        'closure_size',
+        'closure_requirements',
+        'dependencies',
+    ]
+
+    def __init__(
+        self,
+        object_reference: ObjectReference,
+        source_size: int,
+        requirements: Set[str],
+        dependencies: List[ObjectReference],
+    ):
+        self.object_reference = object_reference
+        self.source_size = source_size
+        self.requirements = requirements
+        self.dependencies = dependencies
+        self.closure_size = source_size
+        self.closure_requirements = set(requirements)
+
+    def __repr__(self) -> str:
+        return (
+            f"<NodeWeight("
+            f"object_reference={repr(self.object_reference)}, "
+            f"source_size={self.source_size}, "
+            f"closure_size={self.closure_size})>"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'object_reference': str(self.object_reference),
+            'source_size': self.source_size,
+            'requirements': sorted(self.requirements),
+            'closure_size': self.closure_size,
+            'closure_requirements': sorted(self.closure_requirements),
+        }
+
+
+class EdgeWeight:
+    __slots__ = [
+        'source',
+        'target',
+        'removed_objects',
+        'removed_size',
+        'removed_requirements',
+    ]
+
+    def __init__(
+        self,
+        source: ObjectReference,
+        target: ObjectReference,
+        removed_objects: List[ObjectReference],
+        removed_size: int,
+        removed_requirements: Set[str],
+    ):
+        self.source = source
+        self.target = target
+        self.removed_objects = removed_objects
+        self.removed_size = removed_size
+        self.removed_requirements = removed_requirements
+
+    def __repr__(self) -> str:
+        return (
+            f"<EdgeWeight("
+            f"source={repr(self.source)}, "
+            f"target={repr(self.target)}, "
+            f"removed_size={self.removed_size})>"
+        )
+
+    def get_sorting_key(self) -> Tuple[int, int, str, str]:
+        return (
+            -len(self.removed_requirements),
+            -self.removed_size,
+            str(self.source),
+            str(self.target),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'source': str(self.source),
+            'target': str(self.target),
+            'removed_objects': sorted(str(x) for x in self.removed_objects),
+            'removed_size': self.removed_size,
+            'removed_requirements': sorted(self.removed_requirements),
+        }
+
+
+def get_descriptor_requirements(
+    descriptor: ObjectDescriptor,
+    modules_requirements: Dict[str, Optional[str]],
+) -> Set[str]:
+    results = set()
+
+    for imports_group in [descriptor.local_imports, descriptor.global_imports]:
+        if not imports_group or not imports_group.third_party:
+            continue
+
+        for object_import in imports_group.third_party:
+            module_name = object_import.object_reference.module_name
+
+            if module_name not in modules_requirements:
+                modules_requirements[module_name] = (
+                    get_importer().get_module_requirement(module_name)
+                )
+
+            requirement = modules_requirements[module_name]
+            if requirement:
+                results.add(requirement)
+
+    return results
+
+
+def make_nodes_weights(
+    descriptors: Iterable[ObjectDescriptor],
+) -> Dict[ObjectReference, NodeWeight]:
+    modules_requirements = dict()
+    results = dict()
+
+    for descriptor in descriptors:
+        dependencies = (
+            descriptor.global_imports
+            and descriptor.global_imports.project
+            and sorted({
+                x.object_reference
+                for x in descriptor.global_imports.project
+            })
+        ) or []
+        results[descriptor.object_reference] = NodeWeight(
+            object_reference=descriptor.object_reference,
+            source_size=descriptor.source.get_size(),
+            requirements=get_descriptor_requirements(
+                descriptor,
+                modules_requirements,
+            ),
+            dependencies=dependencies,
+        )
+
+    for node in results.values():
+        closure = get_reachable_references(results, node.object_reference)
+        node.closure_size = sum(results[x].source_size for x in closure)
+        node.closure_requirements = set().union(*[
+            results[x].requirements
+            for x in closure
+        ])
+
+    return results
+
+
+def get_reachable_references(
+    nodes: Dict[ObjectReference, NodeWeight],
+    root: ObjectReference,
+    skipped_edge: Optional[Tuple[ObjectReference, ObjectReference]] = None,
+) -> Set[ObjectReference]:
+    results = {root, }
+    stack = [root, ]
+
+    while stack:
+        reference = stack.pop()
+
+        for dependency in nodes[reference].dependencies:
+            if (reference, dependency) == skipped_edge:
+                continue
+
+            if dependency not in results:
+                results.add(dependency)
+                stack.append(dependency)
+
+    return results
+
+
+def make_edges_weights(
+    nodes: Dict[ObjectReference, NodeWeight],
+    root: ObjectReference,
+) -> List[EdgeWeight]:
+    reachable = get_reachable_references(nodes, root)
+    results = []
+
+    for reference in sorted(reachable):
+        for dependency in nodes[reference].dependencies:
+            edge = (reference, dependency)
+            remaining = get_reachable_references(nodes, root, edge)
+            removed = reachable - remaining
+            remaining_requirements = set().union(*[
+                nodes[x].requirements
+                for x in remaining
+            ])
+            removed_requirements = set().union(*[
+                nodes[x].requirements
+                for x in removed
+            ]) - remaining_requirements
+
+            results.append(EdgeWeight(
+                source=reference,
+                target=dependency,
+                removed_objects=list(removed),
+                removed_size=sum(nodes[x].source_size for x in removed),
+                removed_requirements=removed_requirements,
+            ))
+
+    return sorted(results, key=EdgeWeight.get_sorting_key)
+
+
+def output_json(
+    output_stream: io.TextIOBase,
+    root: ObjectReference,
+    nodes: Dict[ObjectReference, NodeWeight],
+    edges: List[EdgeWeight],
+) -> None:
+    json.dump(
+        {
+            'root': str(root),
+            'nodes': [nodes[x].to_dict() for x in sorted(nodes)],
+            'edges': [x.to_dict() for x in edges],
+        },
+        output_stream,
+        indent=2,
+    )
+    output_stream.write("\n")
+    output_stream.flush()
+
+
+def output_dot(
+    output_stream: io.TextIOBase,
+    root: ObjectReference,
+    nodes: Dict[ObjectReference, NodeWeight],
+    edges: List[EdgeWeight],
+) -> None:
+    output_stream.write("digraph dependencies {\n")
+    output_stream.write("  node [shape=box];\n")
+
+    for reference in sorted(nodes):
+        node = nodes[reference]
+        label = "\n".join([
+            str(reference),
+            f"{node.source_size} B, closure {node.closure_size} B",
+            *sorted(node.requirements),
+        ])
+        attributes = f"label={json.dumps(label)}"
+        if reference == root:
+            attributes += ", style=bold"
+        output_stream.write(f"  {json.dumps(str(reference))} [{attributes}];\n")
+
+    for edge in edges:
+        label = "\n".join([
+            f"-{edge.removed_size} B",
+            *[f"-{x}" for x in sorted(edge.removed_requirements)],
+        ])
+        output_stream.write(
+            f"  {json.dumps(str(edge.source))} -> "
+            f"{json.dumps(str(edge.target))} "
+            f"[label={json.dumps(label)}];\n"
+        )
+
+    output_stream.write("}\n")
+    output_stream.flush()
+
+
+def main() -> None:
+    args = load_args()
+
+    project_path = add_project_to_sys_path(args.project_path)
+    object_reference = parse_object_reference(args.object_reference)
+    descriptors = inspect_object_with_children(
+        object_reference=object_reference,
+        project_path=project_path,
+    )
+    nodes = make_nodes_weights(descriptors)
+    edges = make_edges_weights(nodes, object_reference)
+    output_function = output_dot if args.format == 'dot' else output_json
+
+    if args.output_path == '-':
+        output_function(sys.stdout, object_reference, nodes, edges)
+    else:
+        output_path = Path(args.output_path)
+        output_path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+        with output_path.open('wt') as f:
+            output_function(f, object_reference, nodes, edges)
+
+
+if __name__ == '__main__':
+    main()
@@ -54,11 +54,12 @@ setup(
     ],
     namespace_packages=[],
     include_package_data=True,
+    python_requires=">=3.8",
     install_requires=REQUIREMENTS,
     dependency_links=DEPENDENCIES,
     classifiers=[
         "Development Status :: 5 - Production/Stable",
-        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
         "License :: OSI Approved :: MIT License",
         "Environment :: Console",
         "Intended Audience :: System Administrators",
@@ -70,6 +71,11 @@ setup(
     entry_points={
         'console_scripts': [
             'python-object-extractor=python_object_extractor.main:main',
+            'python-object-extractor-weights=python_object_extractor.weights:main',
+            'python-object-extractor-batch=python_object_extractor.batch:main',
+            'python-object-extractor-dependents=python_object_extractor.dependents:main',
+            'python-object-extractor-index=python_object_extractor.project_index:main',
+            'python-object-extractor-benchmark=python_object_extractor.benchmark:main',
         ],
     }
 )